@@ -0,0 +1,122 @@
+"""
+CNPJ snapshot benchmark: build time, bytes per row and lookup latency.
+
+Generates synthetic dumps in the Receita Federal CSV layout, builds a
+snapshot from them and times lookups for present and absent CNPJs.
+
+Usage:
+    python -m benchmarks.bench_cnpj_snapshot [--rows 200000] [--lookups 100000] [--memory]
+
+--memory rebuilds the snapshot under tracemalloc (several times slower) and
+reports the peak Python heap per row.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import List
+from src.adapters.cnpj_snapshot import CNPJSnapshot, SnapshotCNPJAdapter, build_snapshot
+
+UFS = ["SP", "RJ", "MG", "PA", "BA", "RS", "PR", "SC", "PE", "CE"]
+STREETS = ["PAULISTA", "BRASIL", "URIBOCA VELHA", "SETE DE SETEMBRO", "GETULIO VARGAS"]
+
+
+def write_dumps(workdir: str, rows: int, seed: int = 42) -> tuple:
+    rng = random.Random(seed)
+    municipios = os.path.join(workdir, "MUNICCSV")
+    empresas = os.path.join(workdir, "EMPRECSV")
+    estabelecimentos = os.path.join(workdir, "ESTABELE")
+
+    with open(municipios, "w", encoding="latin-1") as handle:
+        for code in range(5570):
+            handle.write(f'"{code:04d}";"MUNICIPIO {code}"\n')
+
+    bases = rng.sample(range(10_000_000, 99_999_999), max(1, rows // 2))
+    with open(empresas, "w", encoding="latin-1") as handle:
+        for base in bases:
+            handle.write(f'"{base}";"EMPRESA {base} LTDA";"2062";"49";"1000,00";"01";""\n')
+
+    cnpjs = []
+    with open(estabelecimentos, "w", encoding="latin-1") as handle:
+        for index in range(rows):
+            base = bases[index % len(bases)]
+            ordem, dv = f"{index // len(bases) + 1:04d}", f"{rng.randrange(100):02d}"
+            cnpjs.append(f"{base}{ordem}{dv}")
+            fields = [
+                str(base), ordem, dv, "1", f"FANTASIA {index}", "02", "20200101", "00", "", "",
+                "20200101", "4930202", "", "RUA", rng.choice(STREETS), str(rng.randrange(1, 3000)),
+                "", "CENTRO", f"{rng.randrange(1000000, 99999999):08d}", rng.choice(UFS),
+                f"{rng.randrange(5570):04d}", "91", "12345678", "", "", "", "", "", "", ""
+            ]
+            handle.write(";".join(f'"{field}"' for field in fields) + "\n")
+
+    return municipios, empresas, estabelecimentos, cnpjs
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        municipios, empresas, estabelecimentos, cnpjs = write_dumps(workdir, args.rows)
+        dump_bytes = sum(os.path.getsize(path) for path in (municipios, empresas, estabelecimentos))
+
+        output = os.path.join(workdir, "cnpj.snapshot")
+        started = time.perf_counter()
+        stats = build_snapshot(output, [estabelecimentos], [empresas], [municipios])
+        build_seconds = time.perf_counter() - started
+
+        print(f"rows: {stats['rows']}  companies: {stats['companies']}")
+        print(f"build: {build_seconds:.2f} s ({stats['rows'] / build_seconds:,.0f} rows/s)")
+        print(f"size: {stats['bytes'] / 1e6:.1f} MB ({stats['bytes'] / stats['rows']:.1f} bytes/row, "
+              f"dumps {dump_bytes / stats['rows']:.1f} bytes/row)")
+
+        if args.memory:
+            tracemalloc.start()
+            build_snapshot(output, [estabelecimentos], [empresas], [municipios])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"build peak memory: {peak / 1e6:.1f} MB ({peak / stats['rows']:.1f} bytes/row)")
+
+        snapshot = CNPJSnapshot(output)
+        rng = random.Random(7)
+        hits = [rng.choice(cnpjs) for _ in range(args.lookups)]
+        misses = [f"{rng.randrange(10 ** 13, 10 ** 14)}" for _ in range(args.lookups)]
+
+        for label, sample in (("hit", hits), ("miss", misses)):
+            timings = []
+            for cnpj in sample:
+                started = time.perf_counter_ns()
+                snapshot.lookup(cnpj)
+                timings.append((time.perf_counter_ns() - started) / 1000)
+            print(f"lookup {label:4}: p50 {statistics.median(timings):6.1f} us  "
+                  f"p99 {percentile(timings, 0.99):6.1f} us  "
+                  f"throughput {len(timings) / (sum(timings) / 1e6):,.0f}/s")
+
+        adapter = SnapshotCNPJAdapter(path=output)
+
+        async def run_adapter():
+            started = time.perf_counter()
+            await asyncio.gather(*(adapter.get_company_data(cnpj) for cnpj in hits))
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(run_adapter())
+        print(f"adapter (asyncio.gather): {len(hits) / elapsed:,.0f} lookups/s")
+
+        adapter.snapshot.close()
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
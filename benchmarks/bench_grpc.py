@@ -0,0 +1,173 @@
+"""
+Per-call overhead of the gRPC entry point against POST /validate.
+
+Starts the application (`uvicorn main:app` with GRPC_PORT set) in a
+subprocess, replaying a synthetic upstream cassette with no delay, and warms
+the lookup cache so every measured call runs the full service path without
+upstream waits. Then, for each entry point, it reports client latency of
+sequential calls, throughput with concurrent callers and server CPU per
+call (from /proc, Linux only). HTTP calls send `Cache-Control: no-cache` so
+they skip the response cache, like the gRPC calls do.
+
+Requires grpcio. Usage:
+    python -m benchmarks.bench_grpc [--calls 2000] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+import grpc
+import httpx
+from benchmarks.bench_replay import cassette_pairs, synthesize_cassette
+from src.rpc.codec import (
+    ValidateCall,
+    decode_validate_response,
+    encode_validate_request,
+)
+from src.rpc.server import SERVICE_NAME
+
+
+def server_cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            fields = handle.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime and stime, fields 14 and 15 of /proc/<pid>/stat
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+async def measure(
+    name: str,
+    call: Callable[[Tuple[str, str]], Awaitable[None]],
+    pairs: List[Tuple[str, str]],
+    calls: int,
+    concurrency: int,
+    pid: int
+) -> None:
+    requests = [pairs[index % len(pairs)] for index in range(calls)]
+
+    latencies = []
+    cpu_before = server_cpu_seconds(pid)
+    for pair in requests:
+        started = time.perf_counter()
+        await call(pair)
+        latencies.append(time.perf_counter() - started)
+    cpu_after = server_cpu_seconds(pid)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(pair: Tuple[str, str]) -> None:
+        async with semaphore:
+            await call(pair)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(pair) for pair in requests))
+    throughput = calls / (time.perf_counter() - started)
+
+    latencies.sort()
+    cpu = f"{(cpu_after - cpu_before) / calls * 1e6:7.0f}" if cpu_before is not None else "    n/a"
+    print(f"{name:18}{latencies[len(latencies) // 2] * 1e6:9.0f}"
+          f"{latencies[int(len(latencies) * 0.99)] * 1e6:9.0f}{cpu:>12}{throughput:>12,.0f}")
+
+
+async def run(http_url: str, grpc_target: str, pairs: List[Tuple[str, str]], args, pid: int) -> None:
+    async with httpx.AsyncClient(base_url=http_url) as client, grpc.aio.insecure_channel(grpc_target) as channel:
+        validate = channel.unary_unary(
+            f"/{SERVICE_NAME}/Validate",
+            request_serializer=encode_validate_request,
+            response_deserializer=decode_validate_response
+        )
+        stream = channel.stream_stream(
+            f"/{SERVICE_NAME}/ValidateStream",
+            request_serializer=encode_validate_request,
+            response_deserializer=decode_validate_response
+        )
+
+        async def http_call(pair: Tuple[str, str], minimal: bool = False) -> None:
+            response = await client.post(
+                "/validate",
+                params={"minimal": "true"} if minimal else None,
+                json={"cnpj": pair[0], "cep": pair[1]},
+                headers={"Cache-Control": "no-cache"}
+            )
+            assert response.status_code in (200, 404), response.text
+
+        async def grpc_call(pair: Tuple[str, str], minimal: bool = False) -> None:
+            await validate(ValidateCall(pair[0], pair[1], minimal))
+
+        # Warm-up: fills the lookup cache shared by both entry points
+        for pair in pairs:
+            await grpc_call(pair)
+
+        print(f"{'entry point':18}{'p50 us':>9}{'p99 us':>9}{'cpu us/call':>12}{'calls/s':>12}")
+        await measure("http /validate", http_call, pairs, args.calls, args.concurrency, pid)
+        await measure("http minimal", lambda pair: http_call(pair, True), pairs, args.calls, args.concurrency, pid)
+        await measure("grpc Validate", grpc_call, pairs, args.calls, args.concurrency, pid)
+        await measure("grpc minimal", lambda pair: grpc_call(pair, True), pairs, args.calls, args.concurrency, pid)
+
+        requests = [pairs[index % len(pairs)] for index in range(args.calls)]
+        cpu_before = server_cpu_seconds(pid)
+        started = time.perf_counter()
+        received = 0
+        async for _ in stream(ValidateCall(cnpj, cep, True) for cnpj, cep in requests):
+            received += 1
+        elapsed = time.perf_counter() - started
+        cpu_after = server_cpu_seconds(pid)
+        cpu = f"{(cpu_after - cpu_before) / received * 1e6:7.0f}" if cpu_before is not None else "    n/a"
+        print(f"{'grpc stream':18}{'':>9}{'':>9}{cpu:>12}{received / elapsed:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--http-port", type=int, default=8765)
+    parser.add_argument("--grpc-port", type=int, default=50765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cassette = os.path.join(workdir, "upstream.jsonl.gz")
+        synthesize_cassette(cassette, args.companies)
+        env = {
+            **os.environ,
+            "UPSTREAM_REPLAY_PATH": cassette,
+            "UPSTREAM_REPLAY_LATENCY_SCALE": "0",
+            "GRPC_PORT": str(args.grpc_port),
+            "ADMISSION_ENABLED": "false",
+            "LOOP_MONITOR_ENABLED": "false",
+            "LOG_LEVEL": "ERROR",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.http_port), "--log-level", "warning"],
+            env=env
+        )
+        try:
+            http_url = f"http://127.0.0.1:{args.http_port}"
+            asyncio.run(wait_until_up(f"{http_url}/docs"))
+            asyncio.run(run(http_url, f"127.0.0.1:{args.grpc_port}", cassette_pairs(cassette), args, server.pid))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
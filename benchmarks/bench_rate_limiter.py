@@ -0,0 +1,91 @@
+"""
+Rate limiter storage benchmark: overhead per request at high key cardinality.
+
+Replays the read-filter-write cycle of `rate_limiter` over many client keys
+against the sharded `InMemoryStorage` and against the previous
+single-lock, task-per-write storage, reporting time per request, pending
+asyncio tasks and memory held at the end of the run.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--requests 200000] [--keys 50000]
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+from src.middleware.rate_limiter import InMemoryStorage
+
+
+class LockedTaskStorage:
+    """The previous storage: one global lock and one sleeping task per write"""
+
+    def __init__(self):
+        self.storage: Dict[str, List[float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        async with self._lock:
+            return self.storage.get(key)
+
+    async def set(self, key: str, value: List[float], expire: int) -> None:
+        async with self._lock:
+            self.storage[key] = value
+            asyncio.create_task(self._expire_after(key, expire))
+
+    async def _expire_after(self, key: str, seconds: int) -> None:
+        await asyncio.sleep(seconds)
+        async with self._lock:
+            self.storage.pop(key, None)
+
+
+async def replay(storage, keys: List[str], limit: int, window: int) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        now = time.time()
+        stored = await storage.get(key) or []
+        recent = [stamp for stamp in stored if stamp > now - window]
+        if len(recent) < limit:
+            recent.append(now)
+            await storage.set(key, recent, window)
+    return time.perf_counter() - started
+
+
+async def run(name: str, storage, keys: List[str], limit: int, window: int) -> None:
+    tracemalloc.start()
+    elapsed = await replay(storage, keys, limit, window)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pending = len(asyncio.all_tasks()) - 1
+    print(f"{name:12} {elapsed / len(keys) * 1e6:6.2f} us/request  "
+          f"{len(keys) / elapsed:>10,.0f} requests/s  "
+          f"pending tasks {pending:>7,}  memory {memory / 1e6:6.1f} MB")
+    for task in asyncio.all_tasks():
+        if task is not asyncio.current_task():
+            task.cancel()
+    await asyncio.sleep(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=50_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--window", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    clients = [f"rate_limit:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:validate" for i in range(args.keys)]
+    keys = [rng.choice(clients) for _ in range(args.requests)]
+    print(f"{args.requests:,} requests over {args.keys:,} keys, window {args.window}s")
+
+    asyncio.run(run("locked+tasks", LockedTaskStorage(), keys, args.limit, args.window))
+    storage = InMemoryStorage(max_keys=args.max_keys)
+    asyncio.run(run("sharded", storage, keys, args.limit, args.window))
+    print(f"sharded stats: {storage.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Offline end-to-end benchmark of AddressValidationService over a replayed cassette.
+
+Validates every company in an upstream cassette (recorded with
+UPSTREAM_RECORD_PATH, or synthesized with a seeded latency profile when
+none is given) through the full service (hedged CNPJ chain, CEP retries
+and fallback, planner), replaying the recorded latencies times `--scale`.
+Reports throughput and latency percentiles; with the same cassette and
+scale the numbers are reproducible, so CI can compare them between runs.
+
+Usage:
+    python -m benchmarks.bench_replay [--cassette upstream.jsonl.gz] [--scale 1.0] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from typing import List, Tuple
+from src.adapters.transports import read_cassette, upstream_transport
+from src.config.settings import Settings
+from src.services.validation_service import AddressValidationService
+from src.utils.logging import setup_logging
+
+CNPJ_URL = re.compile(r"/(?:api/cnpj/v1|v1/cnpj)/(\d{14})$")
+# UF, municipality and CEP range
+UFS = [
+    ("SP", "SAO PAULO", 1_000_000, 5_999_999),
+    ("RJ", "RIO DE JANEIRO", 20_000_000, 23_799_999),
+    ("PA", "ANANINDEUA", 67_000_000, 67_199_999),
+    ("MG", "BELO HORIZONTE", 30_000_000, 31_999_999),
+]
+
+# Median seconds and log-normal sigma per upstream endpoint, plus failure rate
+PROFILE = {
+    "brasilapi_cnpj": (0.30, 0.8, 0.02),
+    "receitaws_cnpj": (0.45, 0.6, 0.01),
+    "brasilapi_cep": (0.15, 0.7, 0.03),
+    "viacep": (0.12, 0.5, 0.01),
+}
+
+
+def cnpj_with_check_digits(base: str) -> str:
+    """Append the two CNPJ check digits to a 12-digit base"""
+    digits = [int(digit) for digit in base]
+    for weights in ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]):
+        remainder = sum(digit * weight for digit, weight in zip(digits, weights)) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+def synthesize_cassette(path: str, companies: int, seed: int = 42) -> None:
+    """Cassette for the default provider URLs with a seeded log-normal latency profile"""
+    rng = random.Random(seed)
+
+    def exchange(endpoint: str, url: str, body: dict) -> dict:
+        median, sigma, failure_rate = PROFILE[endpoint]
+        elapsed = round(median * rng.lognormvariate(0, sigma), 6)
+        if rng.random() < failure_rate:
+            return {"method": "GET", "url": url, "status": 503, "content_type": "application/json",
+                    "body": "{\"detail\":\"unavailable\"}", "elapsed": elapsed}
+        return {"method": "GET", "url": url, "status": 200, "content_type": "application/json",
+                "body": json.dumps(body, ensure_ascii=False), "elapsed": elapsed}
+
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for index in range(companies):
+            cnpj = cnpj_with_check_digits(f"{10_000_000 + index:08d}0001")
+            uf, city, first_cep, last_cep = rng.choice(UFS)
+            cep = f"{rng.randint(first_cep, last_cep):08d}"
+            street = f"RUA {index}"
+            company = {"cnpj": cnpj, "razao_social": f"EMPRESA {index} LTDA", "uf": uf,
+                       "municipio": city, "logradouro": street, "cep": cep}
+            receitaws = {"status": "OK", "cnpj": cnpj, "nome": company["razao_social"], "uf": uf,
+                         "municipio": city, "logradouro": street, "cep": cep}
+            address = {"cep": cep, "state": uf, "city": city.title(), "street": street.title()}
+            viacep = {"cep": cep, "uf": uf, "localidade": city.title(), "logradouro": street.title()}
+
+            for line in (
+                exchange("brasilapi_cnpj", f"https://brasilapi.com.br/api/cnpj/v1/{cnpj}", company),
+                exchange("receitaws_cnpj", f"https://receitaws.com.br/v1/cnpj/{cnpj}", receitaws),
+                exchange("brasilapi_cep", f"https://brasilapi.com.br/api/cep/v2/{cep}", address),
+                exchange("viacep", f"https://viacep.com.br/ws/{cep}/json/", viacep),
+            ):
+                handle.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def cassette_pairs(path: str) -> List[Tuple[str, str]]:
+    """(CNPJ, CEP) of every company answered successfully in the cassette"""
+    pairs = {}
+    for exchange in read_cassette(path):
+        match = CNPJ_URL.search(exchange["url"])
+        if match and exchange.get("status") == 200 and match.group(1) not in pairs:
+            body = json.loads(exchange["body"])
+            cep = re.sub(r"\D", "", body.get("cep") or "")
+            if cep:
+                pairs[match.group(1)] = cep
+    return list(pairs.items())
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def run(settings: Settings, pairs: List[Tuple[str, str]], concurrency: int) -> None:
+    service = AddressValidationService(settings=settings)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    valid = 0
+
+    async def validate(cnpj: str, cep: str) -> None:
+        nonlocal valid
+        async with semaphore:
+            started = time.perf_counter()
+            result = await service.validate_customer_address(cnpj, cep)
+            latencies.append(time.perf_counter() - started)
+            valid += result.valid
+
+    started = time.perf_counter()
+    await asyncio.gather(*(validate(cnpj, cep) for cnpj, cep in pairs))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    transport = upstream_transport(settings)
+    print(f"validations: {len(pairs)} ({valid} valid) in {elapsed:.2f} s -> {len(pairs) / elapsed:,.1f}/s")
+    print("latency ms: " + "  ".join(
+        f"{label} {percentile(latencies, fraction) * 1000:8.1f}"
+        for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+    ))
+    print(f"upstream: {transport.replayed} replayed, {transport.misses} without recording")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cassette", help="Recorded cassette; synthesized when omitted")
+    parser.add_argument("--companies", type=int, default=2000, help="Companies in the synthesized cassette")
+    parser.add_argument("--scale", type=float, default=1.0, help="Latency multiplier (0 = no delay)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    setup_logging("ERROR")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cassette = args.cassette
+        if cassette is None:
+            cassette = os.path.join(workdir, "upstream.jsonl.gz")
+            synthesize_cassette(cassette, args.companies, args.seed)
+
+        pairs = cassette_pairs(cassette)
+        random.Random(args.seed).shuffle(pairs)
+        settings = Settings(env={
+            "UPSTREAM_REPLAY_PATH": cassette,
+            "UPSTREAM_REPLAY_LATENCY_SCALE": str(args.scale)
+        })
+        print(f"cassette: {cassette} ({os.path.getsize(cassette) / 1e3:.0f} kB), scale {args.scale}, "
+              f"concurrency {args.concurrency}")
+        asyncio.run(run(settings, pairs, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+/validate payload benchmark: bytes on the wire and server CPU per response.
+
+Renders a representative validation result through `ValidationResponseCache`
+for each response shape (full, `?fields=match`, `?minimal=true`) and content
+encoding (identity, gzip, brotli when installed). "cold" renders a fresh
+entry every time (a cache miss: serialization, projection and compression);
+"cached" replays the representation kept with a cached entry.
+
+Usage:
+    python -m benchmarks.bench_response_size [--iterations 20000]
+"""
+import argparse
+import time
+from src.middleware import response_cache
+from src.middleware.response_cache import CachedResponse, ValidationResponseCache, parse_fields
+from src.models.schemas import AddressData, AddressMatch, CompanyData, ValidationResult
+
+
+def sample_result() -> ValidationResult:
+    return ValidationResult(
+        valid=True,
+        message="Endereço validado com sucesso",
+        company_data=CompanyData(
+            cnpj="11222333000181",
+            razao_social="EMPRESA EXEMPLO COMERCIO E SERVICOS LTDA",
+            nome_fantasia="EXEMPLO",
+            uf="SP",
+            municipio="SAO PAULO",
+            logradouro="AVENIDA PAULISTA",
+            bairro="BELA VISTA",
+            cep="01310100",
+            numero="1000",
+            complemento="ANDAR 10 CONJ 101"
+        ),
+        address_data=AddressData(
+            cep="01310-100",
+            state="SP",
+            city="São Paulo",
+            neighborhood="Bela Vista",
+            street="Avenida Paulista",
+            service="brasilapi"
+        ),
+        match=AddressMatch(state=True, city=True, street=True)
+    )
+
+
+def cpu_per_call(func, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--min-size", type=int, default=512)
+    args = parser.parse_args()
+
+    result = sample_result()
+    cache = ValidationResponseCache(compression_min_size=args.min_size)
+    encodings = ["identity", "gzip"] + (["br"] if response_cache.brotli is not None else [])
+    shapes = {"full": None, "fields=match": parse_fields("match"), "minimal": parse_fields(minimal=True)}
+
+    print(f"{'shape':14}{'encoding':10}{'bytes':>7}{'cold us':>10}{'cached us':>11}")
+    for shape, fields in shapes.items():
+        for encoding in encodings:
+            accept = None if encoding == "identity" else encoding
+            cached_entry = CachedResponse(result, cacheable=True)
+            response = cache.render(cached_entry, fields=fields, accept_encoding=accept)
+            sent = response.headers.get("content-encoding", "identity")
+            if sent != encoding:
+                # Below the compression threshold
+                continue
+
+            cold = cpu_per_call(
+                lambda: cache.render(CachedResponse(result, cacheable=True), fields=fields, accept_encoding=accept),
+                args.iterations
+            )
+            cached = cpu_per_call(
+                lambda: cache.render(cached_entry, fields=fields, accept_encoding=accept),
+                args.iterations
+            )
+            print(f"{shape:14}{encoding:10}{len(response.body):>7}{cold:>10.1f}{cached:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Startup benchmark: import-time profile and cold start to first served request.
+
+The first request is a well-formed validation answered from a synthetic
+upstream cassette replayed with no delay, so it times the full served path
+(cold caches, provider strategies, response rendering) without the network.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+from benchmarks.bench_replay import cassette_pairs, synthesize_cassette
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter: import the app and serve one request
+# in-process through the ASGI transport, so no port or network is needed.
+FIRST_REQUEST_SCRIPT = """
+import sys
+import time
+t0 = time.perf_counter()
+import asyncio
+import httpx
+from main import app
+t_import = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/validate", json={"cnpj": sys.argv[1], "cep": sys.argv[2]})
+        assert response.status_code == 200, (response.status_code, response.text)
+
+asyncio.run(first_request())
+t_served = time.perf_counter()
+print(f"{(t_import - t0) * 1000:.3f} {(t_served - t0) * 1000:.3f}")
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` output into (module, self_us, cumulative_us)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def top_level_costs(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Cumulative cost of the direct imports of `main` (one indent level deep)"""
+    # Children are printed before their parent, so collect the depth-2 rows
+    # seen since the previous top-level import and keep them once `main` shows up.
+    costs: Dict[str, int] = {}
+    for name, _, cumulative in rows:
+        depth = len(name) - len(name.lstrip()) - 1
+        if depth == 2:
+            costs[name.strip()] = cumulative
+        elif depth == 0:
+            if name.strip() == "main":
+                return costs
+            costs = {}
+    return costs
+
+
+def cold_start(runs: int) -> Tuple[List[float], List[float]]:
+    imports, served = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        cassette = os.path.join(workdir, "upstream.jsonl.gz")
+        synthesize_cassette(cassette, companies=1)
+        cnpj, cep = cassette_pairs(cassette)[0]
+        env = {
+            **os.environ,
+            "UPSTREAM_REPLAY_PATH": cassette,
+            "UPSTREAM_REPLAY_LATENCY_SCALE": "0",
+            "LOOP_MONITOR_ENABLED": "false",
+            "LOG_LEVEL": "ERROR",
+        }
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, "-c", FIRST_REQUEST_SCRIPT, cnpj, cep],
+                cwd=ROOT, env=env, capture_output=True, text=True, check=True
+            )
+            import_ms, served_ms = map(float, result.stdout.split()[-2:])
+            imports.append(import_ms)
+            served.append(served_ms)
+    return imports, served
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_profile()
+    total = next((cumulative for name, _, cumulative in rows if name.strip() == "main"), 0)
+    print(f"import main: {total / 1000:.1f} ms")
+
+    print("\nDirect imports of main (cumulative):")
+    for name, cumulative in sorted(top_level_costs(rows).items(), key=lambda item: -item[1]):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    print(f"\nTop {args.top} modules by self time:")
+    for name, self_us, _ in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name.strip()}")
+
+    imports, served = cold_start(args.runs)
+    print(f"\nCold start over {args.runs} runs (median / max):")
+    print(f"  import app:           {statistics.median(imports):8.1f} / {max(imports):8.1f} ms")
+    print(f"  first request served: {statistics.median(served):8.1f} / {max(served):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
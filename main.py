@@ -1,39 +1,171 @@
-from fastapi import FastAPI, HTTPException, status, Request
-from pydantic import BaseModel
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Annotated, Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Response, status, Request
+from fastapi.responses import PlainTextResponse
+from src.adapters.transports import RecordingTransport, upstream_transport
+from src.config.settings import get_settings
+from src.services.audit_sink import AuditSink
+from src.services.cache_refresher import CacheRefresher
 from src.services.validation_service import AddressValidationService
-from src.models.schemas import ValidationResult, ValidationRequest
+from src.models.schemas import ValidationResult, ValidationRequest, ValidationQuery
+from src.utils.health import HealthChecker
 from src.utils.logging import setup_logging
+from src.utils.loop_monitor import EventLoopMonitor
+from src.utils.provider_stats import provider_stats
+from src.utils.tracing import OTLPJsonExporter, tracer
+from src.middleware.admin import admin_guard
+from src.middleware.admission import AdaptiveConcurrencyLimiter, AdmissionControlMiddleware, record_admission_sample
+from src.middleware.response_cache import ValidationResponseCache, parse_fields
 from src.middleware.rate_limiter import rate_limiter
 
-setup_logging()
+settings = get_settings()
+setup_logging(settings.LOG_LEVEL)
+
+audit_sink = None
+if settings.AUDIT_LOG_DIR:
+    audit_sink = AuditSink(
+        settings.AUDIT_LOG_DIR,
+        max_queue=settings.AUDIT_QUEUE_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+        segment_max_rows=settings.AUDIT_SEGMENT_MAX_ROWS,
+        enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT,
+        synchronous=settings.AUDIT_SYNCHRONOUS
+    )
+validation_service = AddressValidationService(settings=settings, audit_sink=audit_sink)
+loop_monitor = EventLoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    slow_callback_threshold=settings.SLOW_CALLBACK_THRESHOLD
+)
+response_cache = ValidationResponseCache(
+    ttl=settings.RESULT_CACHE_TTL,
+    max_size=settings.RESULT_CACHE_MAX_SIZE,
+    compression_min_size=settings.COMPRESSION_MIN_SIZE,
+    audit_sink=audit_sink
+)
+admission_limiter = None
+if settings.ADMISSION_ENABLED:
+    admission_limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_limit=settings.ADMISSION_MAX_LIMIT,
+        batch_share=settings.ADMISSION_BATCH_SHARE
+    )
+cache_refresher = None
+if settings.CACHE_REFRESH_ENABLED:
+    cache_refresher = CacheRefresher(
+        validation_service,
+        interval=settings.CACHE_REFRESH_INTERVAL,
+        refresh_ahead=settings.CACHE_REFRESH_AHEAD,
+        min_reads=settings.CACHE_REFRESH_MIN_READS,
+        rate=settings.CACHE_REFRESH_RATE,
+        admission_limiter=admission_limiter
+    )
+health_checker = HealthChecker(
+    settings=settings,
+    validation_service=validation_service,
+    loop_monitor=loop_monitor,
+    response_cache=response_cache,
+    admission_limiter=admission_limiter,
+    cache_refresher=cache_refresher
+)
+require_admin = admin_guard(settings)
+
+trace_exporter = None
+if settings.TRACE_EXPORT_PATH or settings.TRACE_EXPORT_ENDPOINT:
+    trace_exporter = OTLPJsonExporter(
+        path=settings.TRACE_EXPORT_PATH or None,
+        endpoint=settings.TRACE_EXPORT_ENDPOINT or None,
+        service_name=settings.SERVICE_NAME
+    )
+tracer.configure(settings.TRACE_SAMPLE_RATE, trace_exporter)
+provider_stats.configure(settings.PROVIDER_STATS_ENABLED)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    if trace_exporter:
+        await trace_exporter.start()
+    if audit_sink:
+        await audit_sink.start()
+    if cache_refresher:
+        await cache_refresher.start()
+    grpc_server = None
+    if settings.GRPC_PORT:
+        # Imported here so HTTP-only deployments don't pay for loading grpc
+        from src.rpc.server import create_server as create_grpc_server
+
+        # Same service instance, result cache and admission limit as the HTTP API
+        grpc_server = create_grpc_server(
+            validation_service,
+            f"[::]:{settings.GRPC_PORT}",
+            settings.GRPC_MAX_IN_FLIGHT,
+            admission_limiter=admission_limiter,
+            response_cache=response_cache
+        )
+        await grpc_server.start()
+    yield
+    if grpc_server:
+        await grpc_server.stop(grace=5)
+    if cache_refresher:
+        await cache_refresher.stop()
+    if validation_service.cep_prefetcher:
+        await validation_service.cep_prefetcher.stop()
+    if audit_sink:
+        # After the gRPC server: in-flight validations are recorded before the flush
+        await audit_sink.stop()
+    if trace_exporter:
+        await trace_exporter.stop()
+    await loop_monitor.stop()
+    transport = upstream_transport(settings)
+    if isinstance(transport, RecordingTransport):
+        await transport.close()
+
 
 app = FastAPI(
     title="Validação de Cadastro de Clientes",
     description="Microsserviço para validação de endereço de clientes usando CNPJ e CEP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-validation_service = AddressValidationService()
+if admission_limiter:
+    app.add_middleware(AdmissionControlMiddleware, limiter=admission_limiter)
 
 
-@app.post("/validate", response_model=ValidationResult, status_code=status.HTTP_200_OK)
-async def validate_customer_address(request: ValidationRequest):
+async def _validate(
+    request: ValidationRequest,
+    http_request: Request,
+    fields: Optional[str] = None,
+    minimal: bool = False
+) -> Response:
     try:
-        result = await validation_service.validate_customer_address(
-            cnpj=request.cnpj,
-            cep=request.cep
+        selected_fields = parse_fields(fields, minimal)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def run_service(cnpj: str, cep: str) -> ValidationResult:
+        # Cache hits are not upstream latency samples for admission control
+        record_admission_sample(http_request.scope)
+        return await validation_service.validate_customer_address(cnpj, cep)
+
+    try:
+        entry = await response_cache.resolve(
+            request.cnpj,
+            request.cep,
+            run_service,
+            bypass="no-cache" in http_request.headers.get("cache-control", "")
+        )
+        return response_cache.render(
+            entry,
+            http_request.headers.get("if-none-match"),
+            fields=selected_fields,
+            accept_encoding=http_request.headers.get("accept-encoding"),
+            method=http_request.method
         )
-        
-        if result.valid:
-            return result
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=result.message
-            )
-            
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,8 +173,60 @@ async def validate_customer_address(request: ValidationRequest):
         )
 
 
+FIELDS_QUERY = Query(default=None, description=ValidationQuery.model_fields["fields"].description)
+MINIMAL_QUERY = Query(default=False, description=ValidationQuery.model_fields["minimal"].description)
+
+
+VALIDATE_RESPONSES = {
+    304: {"description": "Resultado inalterado (If-None-Match)"},
+    404: {"description": "Endereço não corresponde ou dados não encontrados"}
+}
+
+
+@app.post("/validate", response_model=ValidationResult, status_code=status.HTTP_200_OK, responses=VALIDATE_RESPONSES)
+async def validate_customer_address(
+    request: ValidationRequest,
+    http_request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    minimal: bool = MINIMAL_QUERY
+):
+    return await _validate(request, http_request, fields, minimal)
+
+
+@app.get("/validate", response_model=ValidationResult, status_code=status.HTTP_200_OK, responses=VALIDATE_RESPONSES)
+async def validate_customer_address_query(request: Annotated[ValidationQuery, Query()], http_request: Request):
+    """Cacheable variant of POST /validate for clients and proxies that cache GETs"""
+    return await _validate(request, http_request, request.fields, request.minimal)
+
+
 @app.get("/health")
 async def health_check():
     """Comprehensive health check including dependencies"""
-    from src.utils.health import health_checker
-    return await health_checker.comprehensive_health_check()
\ No newline at end of file
+    return await health_checker.comprehensive_health_check()
+
+
+@app.get("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def sample_profile(
+    seconds: float = Query(default=5.0, gt=0, le=60),
+    interval: float = Query(default=0.005, gt=0, le=1),
+    all_threads: bool = False
+):
+    """Sample stacks for a while and return them in flamegraph collapsed format"""
+    return await asyncio.to_thread(loop_monitor.profile, seconds, interval, all_threads)
+
+
+@app.get("/debug/stats", dependencies=[Depends(require_admin)])
+async def debug_stats():
+    """Per-provider outcomes, latency quantiles, retries and fallbacks over the last 1m/5m/1h"""
+    return provider_stats.snapshot()
+
+
+@app.get("/admin/audit", dependencies=[Depends(require_admin)])
+async def audit_log(
+    cnpj: str = Query(..., min_length=14, max_length=18),
+    limit: int = Query(default=100, gt=0, le=1000)
+):
+    """Most recent validation outcomes recorded for a CNPJ, newest first"""
+    if audit_sink is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Log de auditoria desativado")
+    return await audit_sink.query(cnpj, limit)
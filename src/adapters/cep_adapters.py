@@ -1,22 +1,31 @@
 import httpx
 from typing import Optional, Dict, Any
 from src.adapters.interfaces import CEPAdapterInterface
+from src.adapters.transports import upstream_transport
+from src.config.settings import Settings, get_settings
 from src.models.schemas import AddressData
 
 
 class BrasilAPICEPAdapter(CEPAdapterInterface):
-    def __init__(self, base_url: Optional[str] = None):
-        from src.config.settings import settings
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        settings: Optional[Settings] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        settings = settings or get_settings()
+        self.timeout = settings.HTTP_TIMEOUT
+        self.transport = transport or upstream_transport(settings)
+        self.headers = {"User-Agent": settings.USER_AGENT}
         self.base_url = base_url or settings.BRASILAPI_BASE_URL
 
     async def get_address_data(self, cep: str) -> Optional[AddressData]:
-        from src.config.settings import settings
         clean_cep = cep.replace("-", "").replace(".", "")
         url = f"{self.base_url}/api/cep/v2/{clean_cep}"
         
-        async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
             try:
-                response = await client.get(url, headers={"User-Agent": settings.USER_AGENT})
+                response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -41,18 +50,25 @@ class BrasilAPICEPAdapter(CEPAdapterInterface):
 
 
 class ViaCEPAdapter(CEPAdapterInterface):
-    def __init__(self, base_url: Optional[str] = None):
-        from src.config.settings import settings
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        settings: Optional[Settings] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        settings = settings or get_settings()
+        self.timeout = settings.HTTP_TIMEOUT
+        self.transport = transport or upstream_transport(settings)
+        self.headers = {"User-Agent": settings.USER_AGENT}
         self.base_url = base_url or settings.VIACEP_BASE_URL
 
     async def get_address_data(self, cep: str) -> Optional[AddressData]:
-        from src.config.settings import settings
         clean_cep = cep.replace("-", "").replace(".", "")
         url = f"{self.base_url}/ws/{clean_cep}/json/"
         
-        async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
             try:
-                response = await client.get(url, headers={"User-Agent": settings.USER_AGENT})
+                response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 data = response.json()
                 
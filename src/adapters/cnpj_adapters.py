@@ -1,21 +1,30 @@
 import httpx
 from typing import Optional, Dict, Any
 from src.adapters.interfaces import CNPJAdapterInterface
+from src.adapters.transports import upstream_transport
+from src.config.settings import Settings, get_settings
 from src.models.schemas import CompanyData
 
 
 class BrasilAPICNPJAdapter(CNPJAdapterInterface):
-    def __init__(self, base_url: Optional[str] = None):
-        from src.config.settings import settings
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        settings: Optional[Settings] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        settings = settings or get_settings()
+        self.timeout = settings.HTTP_TIMEOUT
+        self.transport = transport or upstream_transport(settings)
+        self.headers = {"User-Agent": settings.USER_AGENT}
         self.base_url = base_url or settings.BRASILAPI_BASE_URL
 
     async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
-        from src.config.settings import settings
         url = f"{self.base_url}/api/cnpj/v1/{cnpj}"
         
-        async with httpx.AsyncClient(timeout=settings.HTTP_TIMEOUT) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
             try:
-                response = await client.get(url, headers={"User-Agent": settings.USER_AGENT})
+                response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -40,4 +49,60 @@ class BrasilAPICNPJAdapter(CNPJAdapterInterface):
             except httpx.HTTPError:
                 return None
             except Exception:
-                return None
\ No newline at end of file
+                return None
+
+
+class ReceitaWSCNPJAdapter(CNPJAdapterInterface):
+    """ReceitaWS-compatible provider (`/v1/cnpj/{cnpj}`)"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        settings: Optional[Settings] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        settings = settings or get_settings()
+        self.timeout = settings.HTTP_TIMEOUT
+        self.transport = transport or upstream_transport(settings)
+        self.headers = {"User-Agent": settings.USER_AGENT}
+        self.base_url = base_url or settings.RECEITAWS_BASE_URL
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        url = f"{self.base_url}/v1/cnpj/{cnpj}"
+        
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            try:
+                response = await client.get(url, headers=self.headers)
+                response.raise_for_status()
+                data = response.json()
+                
+                # ReceitaWS answers 200 with {"status": "ERROR"} for unknown CNPJs
+                if data.get("status") != "OK":
+                    return None
+                
+                return CompanyData(
+                    cnpj=_digits(data.get("cnpj", "")),
+                    razao_social=data.get("nome", ""),
+                    nome_fantasia=data.get("fantasia") or None,
+                    uf=data.get("uf", ""),
+                    municipio=data.get("municipio", ""),
+                    logradouro=data.get("logradouro", ""),
+                    bairro=data.get("bairro") or None,
+                    cep=_digits(data.get("cep", "")),
+                    numero=data.get("numero") or None,
+                    complemento=data.get("complemento") or None
+                )
+            except httpx.TimeoutException:
+                return None
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return None
+                raise
+            except httpx.HTTPError:
+                return None
+            except Exception:
+                return None
+
+
+def _digits(value: str) -> str:
+    return "".join(char for char in value if char.isdigit())
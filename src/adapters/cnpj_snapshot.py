@@ -0,0 +1,322 @@
+"""
+Offline CNPJ lookups backed by a compact snapshot of the Receita Federal dumps.
+
+The snapshot is a single memory-mapped file. Establishments are sorted by
+CNPJ and stored column by column: the 14-digit CNPJ as uint64, the UF and
+municipio as indexes into small dictionaries, the CEP as uint32 and the
+remaining free-text fields as one record per row in a byte heap addressed
+by an offsets column. Company
+names (razão social) live in a second table keyed by the 8-digit CNPJ base,
+so branches of the same company share a single copy. A lookup is a binary
+search over the mmapped key column plus a handful of slice reads.
+
+Build a snapshot from the public dumps (Estabelecimentos, Empresas and
+Municipios CSV files, latin-1, `;`-separated):
+
+    python -m src.adapters.cnpj_snapshot build --output cnpj.snapshot \\
+        --estabelecimentos dumps/*ESTABELE* --empresas dumps/*EMPRECSV* \\
+        --municipios dumps/*MUNICCSV*
+
+Building keeps the fixed-width columns and one sort permutation in memory
+and streams the text fields through temporary files. The permutation is
+built by sorting bounded runs and merging them, so the peak is about 40
+bytes per establishment plus a fixed ~10 MB sort buffer (44 bytes/row at
+1.5M rows, measured with `benchmarks.bench_cnpj_snapshot --memory`): ~2.5 GB
+for the full Receita dump.
+"""
+import argparse
+import csv
+import heapq
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.adapters.interfaces import CNPJAdapterInterface
+from src.config.settings import Settings, get_settings
+from src.models.schemas import CompanyData
+
+
+MAGIC = b"CNPJSNP1"
+# Rows sorted at once while building; bounds the sort's Python objects
+SORT_RUN_ROWS = 1 << 17
+WRITE_CHUNK_ROWS = 1 << 16
+SECTIONS = (
+    "keys", "uf", "municipio", "cep", "row_offsets", "row_heap",
+    "company_keys", "company_offsets", "company_heap", "dictionaries",
+)
+HEADER = struct.Struct("<8sQQ" + "QQ" * len(SECTIONS))
+FIELD_SEPARATOR = "\x1f"
+ROW_FIELDS = ("nome_fantasia", "logradouro", "numero", "complemento", "bairro")
+
+# Column positions in the Receita Federal CSV layouts
+ESTAB_CNPJ_BASICO, ESTAB_CNPJ_ORDEM, ESTAB_CNPJ_DV = 0, 1, 2
+ESTAB_NOME_FANTASIA = 4
+ESTAB_LOGRADOURO, ESTAB_NUMERO, ESTAB_COMPLEMENTO, ESTAB_BAIRRO = 14, 15, 16, 17
+ESTAB_CEP, ESTAB_UF, ESTAB_MUNICIPIO = 18, 19, 20
+EMPRESA_CNPJ_BASICO, EMPRESA_RAZAO_SOCIAL = 0, 1
+
+
+class CNPJSnapshot:
+    """Read-only view over a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, self.rows, self.companies, *bounds = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a CNPJ snapshot")
+        section = {
+            name: view[bounds[2 * i]:bounds[2 * i] + bounds[2 * i + 1]]
+            for i, name in enumerate(SECTIONS)
+        }
+
+        self._keys = section["keys"].cast("Q")
+        self._uf = section["uf"].cast("B")
+        self._municipio = section["municipio"].cast("H")
+        self._cep = section["cep"].cast("I")
+        self._row_offsets = section["row_offsets"].cast("Q")
+        self._row_heap = section["row_heap"]
+        self._company_keys = section["company_keys"].cast("I")
+        self._company_offsets = section["company_offsets"].cast("Q")
+        self._company_heap = section["company_heap"]
+
+        dictionaries = json.loads(bytes(section["dictionaries"]))
+        self._uf_names: List[str] = dictionaries["uf"]
+        self._municipio_names: List[str] = dictionaries["municipio"]
+
+    def lookup(self, cnpj: str) -> Optional[CompanyData]:
+        if len(cnpj) != 14 or not cnpj.isdigit():
+            return None
+        key = int(cnpj)
+        index = bisect_left(self._keys, key)
+        if index == self.rows or self._keys[index] != key:
+            return None
+
+        start, end = self._row_offsets[index], self._row_offsets[index + 1]
+        fields = dict(zip(ROW_FIELDS, str(self._row_heap[start:end], "utf-8").split(FIELD_SEPARATOR)))
+        cep = self._cep[index]
+
+        return CompanyData(
+            cnpj=cnpj,
+            razao_social=self._razao_social(key // 1_000_000),
+            nome_fantasia=fields["nome_fantasia"] or None,
+            uf=self._uf_names[self._uf[index]],
+            municipio=self._municipio_names[self._municipio[index]],
+            logradouro=fields["logradouro"],
+            bairro=fields["bairro"] or None,
+            cep=f"{cep:08d}" if cep else "",
+            numero=fields["numero"] or None,
+            complemento=fields["complemento"] or None
+        )
+
+    def _razao_social(self, cnpj_basico: int) -> str:
+        index = bisect_left(self._company_keys, cnpj_basico)
+        if index == self.companies or self._company_keys[index] != cnpj_basico:
+            return ""
+        start, end = self._company_offsets[index], self._company_offsets[index + 1]
+        return str(self._company_heap[start:end], "utf-8")
+
+    def close(self) -> None:
+        # Views must be released before the mmap can be closed
+        for name in list(vars(self)):
+            if isinstance(getattr(self, name), memoryview):
+                getattr(self, name).release()
+        self._mmap.close()
+        self._file.close()
+
+
+class SnapshotCNPJAdapter(CNPJAdapterInterface):
+    """CNPJ provider answered from a local snapshot, with no network access"""
+
+    def __init__(self, path: Optional[str] = None, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.snapshot = CNPJSnapshot(path or settings.CNPJ_SNAPSHOT_PATH)
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        return self.snapshot.lookup(cnpj)
+
+
+def _read_csv(paths: Iterable[str]) -> Iterator[List[str]]:
+    for path in paths:
+        with open(path, encoding="latin-1", newline="") as handle:
+            yield from csv.reader(handle, delimiter=";", quotechar='"')
+
+
+def _digits(value: str) -> str:
+    return "".join(char for char in value if char.isdigit())
+
+
+def _write_section(output, payload) -> tuple:
+    output.write(b"\0" * (-output.tell() % 8))
+    offset = output.tell()
+    output.write(payload)
+    return offset, output.tell() - offset
+
+
+def _write_permuted(output, column: array, order: array) -> tuple:
+    """Write `column` in `order` as a section, a chunk at a time"""
+    output.write(b"\0" * (-output.tell() % 8))
+    offset = output.tell()
+    for start in range(0, len(order), WRITE_CHUNK_ROWS):
+        output.write(array(column.typecode, (column[i] for i in order[start:start + WRITE_CHUNK_ROWS])))
+    return offset, output.tell() - offset
+
+
+def _write_sorted_heap(output, order: Iterable[int], offsets: array, heap_path: str) -> tuple:
+    """Copy heap records into `output` in `order`, returning the sections and new offsets"""
+    output.write(b"\0" * (-output.tell() % 8))
+    heap_start = output.tell()
+    sorted_offsets = array("Q", [0])
+
+    if offsets[-1]:
+        with open(heap_path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as heap:
+            for index in order:
+                record = heap[offsets[index]:offsets[index + 1]]
+                output.write(record)
+                sorted_offsets.append(sorted_offsets[-1] + len(record))
+    else:
+        sorted_offsets.extend(0 for _ in order)
+
+    return (heap_start, sorted_offsets[-1]), sorted_offsets
+
+
+def build_snapshot(
+    output_path: str,
+    estabelecimentos: List[str],
+    empresas: List[str],
+    municipios: List[str]
+) -> Dict[str, int]:
+    municipio_names = {row[0]: row[1] for row in _read_csv(municipios) if len(row) >= 2}
+
+    uf_index: Dict[str, int] = {}
+    municipio_index: Dict[str, int] = {}
+    keys, uf_codes, municipio_codes, ceps = array("Q"), array("B"), array("H"), array("I")
+    row_offsets = array("Q", [0])
+    company_keys, company_offsets = array("I"), array("Q", [0])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        row_heap_path = os.path.join(workdir, "rows")
+        company_heap_path = os.path.join(workdir, "companies")
+
+        with open(row_heap_path, "wb") as heap:
+            for row in _read_csv(estabelecimentos):
+                if len(row) <= ESTAB_MUNICIPIO:
+                    continue
+                cnpj = row[ESTAB_CNPJ_BASICO] + row[ESTAB_CNPJ_ORDEM] + row[ESTAB_CNPJ_DV]
+                if len(cnpj) != 14 or not cnpj.isdigit():
+                    continue
+
+                municipio = municipio_names.get(row[ESTAB_MUNICIPIO], row[ESTAB_MUNICIPIO])
+                cep = _digits(row[ESTAB_CEP])
+                record = FIELD_SEPARATOR.join((
+                    row[ESTAB_NOME_FANTASIA], row[ESTAB_LOGRADOURO], row[ESTAB_NUMERO],
+                    row[ESTAB_COMPLEMENTO], row[ESTAB_BAIRRO]
+                )).encode("utf-8")
+
+                keys.append(int(cnpj))
+                uf_codes.append(uf_index.setdefault(row[ESTAB_UF], len(uf_index)))
+                municipio_codes.append(municipio_index.setdefault(municipio, len(municipio_index)))
+                ceps.append(int(cep) if len(cep) == 8 else 0)
+                heap.write(record)
+                row_offsets.append(row_offsets[-1] + len(record))
+
+        with open(company_heap_path, "wb") as heap:
+            for row in _read_csv(empresas):
+                if len(row) <= EMPRESA_RAZAO_SOCIAL or not row[EMPRESA_CNPJ_BASICO].isdigit():
+                    continue
+                record = row[EMPRESA_RAZAO_SOCIAL].encode("utf-8")
+                company_keys.append(int(row[EMPRESA_CNPJ_BASICO]))
+                heap.write(record)
+                company_offsets.append(company_offsets[-1] + len(record))
+
+        order = _unique_sorted_order(keys)
+        company_order = _unique_sorted_order(company_keys)
+
+        with open(output_path, "wb") as output:
+            output.write(b"\0" * HEADER.size)
+            bounds = {}
+            for name, column in (("keys", keys), ("uf", uf_codes), ("municipio", municipio_codes), ("cep", ceps)):
+                bounds[name] = _write_permuted(output, column, order)
+            # Free the unsorted columns before the sorted offsets are built
+            del keys, uf_codes, municipio_codes, ceps, column
+            bounds["row_heap"], sorted_row_offsets = _write_sorted_heap(output, order, row_offsets, row_heap_path)
+            bounds["row_offsets"] = _write_section(output, sorted_row_offsets)
+            bounds["company_keys"] = _write_permuted(output, company_keys, company_order)
+            bounds["company_heap"], sorted_company_offsets = _write_sorted_heap(
+                output, company_order, company_offsets, company_heap_path
+            )
+            bounds["company_offsets"] = _write_section(output, sorted_company_offsets)
+            bounds["dictionaries"] = _write_section(output, json.dumps({
+                "uf": list(uf_index),
+                "municipio": list(municipio_index)
+            }, ensure_ascii=False).encode("utf-8"))
+
+            output.seek(0)
+            output.write(HEADER.pack(
+                MAGIC, len(order), len(company_order),
+                *(value for name in SECTIONS for value in bounds[name])
+            ))
+            size = output.seek(0, os.SEEK_END)
+
+    return {"rows": len(order), "companies": len(company_order), "bytes": size}
+
+
+def _unique_sorted_order(keys: array, run_rows: int = SORT_RUN_ROWS) -> array:
+    """
+    Indexes of `keys` in ascending key order, keeping the last row of each
+    duplicate key.
+
+    Sorting all indexes at once would hold a Python int per row; instead
+    runs of `run_rows` are sorted into compact arrays and merged. Equal keys
+    come out in row order (stable sort, runs merged in input order).
+    """
+    runs = [
+        array("I", sorted(range(start, min(start + run_rows, len(keys))), key=keys.__getitem__))
+        for start in range(0, len(keys), run_rows)
+    ]
+    order = array("I")
+    previous = None
+    for index in heapq.merge(*runs, key=keys.__getitem__):
+        key = keys[index]
+        if key == previous:
+            order[-1] = index
+        else:
+            order.append(index)
+            previous = key
+    return order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CNPJ snapshot tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build a snapshot from the Receita Federal dumps")
+    build.add_argument("--output", required=True)
+    build.add_argument("--estabelecimentos", nargs="+", required=True)
+    build.add_argument("--empresas", nargs="+", required=True)
+    build.add_argument("--municipios", nargs="+", required=True)
+
+    lookup = commands.add_parser("lookup", help="Look up CNPJs in a snapshot")
+    lookup.add_argument("snapshot")
+    lookup.add_argument("cnpj", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        stats = build_snapshot(args.output, args.estabelecimentos, args.empresas, args.municipios)
+        print(json.dumps(stats))
+    else:
+        snapshot = CNPJSnapshot(args.snapshot)
+        for cnpj in args.cnpj:
+            company = snapshot.lookup(_digits(cnpj))
+            print(company.model_dump_json() if company else f"{cnpj}: não encontrado")
+
+
+if __name__ == "__main__":
+    main()
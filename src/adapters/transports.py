@@ -0,0 +1,172 @@
+"""
+Record and replay of upstream HTTP exchanges.
+
+`RecordingTransport` sits under the adapters' `httpx` clients and appends
+every request/response pair (or transport error) with its wall-clock
+duration to a cassette. `ReplayTransport` serves a cassette back without
+network access, sleeping for the recorded duration times `latency_scale`,
+so the service can be benchmarked offline against a real latency profile.
+
+A cassette is one JSON object per line, gzip-compressed when the path ends
+in `.gz`:
+
+    {"method": "GET", "url": "https://brasilapi.com.br/api/cep/v2/01310100",
+     "status": 200, "content_type": "application/json", "body": "{...}", "elapsed": 0.183}
+    {"method": "GET", "url": "...", "error": "ReadTimeout", "elapsed": 10.0}
+
+The adapters pick the transport from settings: UPSTREAM_RECORD_PATH records
+the live providers, UPSTREAM_REPLAY_PATH replays (with
+UPSTREAM_REPLAY_LATENCY_SCALE, 0 for no delay).
+"""
+import asyncio
+import gzip
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import httpx
+from src.config.settings import Settings
+
+
+def _open_cassette(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    with _open_cassette(path, "r") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests to `inner` (real network by default) and appends each
+    exchange to the cassette at `path`. Shared by all adapters, so closing a
+    client does not close it; call `close()` when done.
+    """
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+        self._handle = _open_cassette(path, "a")
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+            body = await response.aread()
+            await response.aclose()
+        except httpx.TransportError as e:
+            self._write({
+                "method": request.method,
+                "url": str(request.url),
+                "error": type(e).__name__,
+                "elapsed": round(time.perf_counter() - started, 6)
+            })
+            raise
+
+        content_type = response.headers.get("content-type", "")
+        self._write({
+            "method": request.method,
+            "url": str(request.url),
+            "status": response.status_code,
+            "content_type": content_type,
+            "body": body.decode("utf-8", errors="replace"),
+            "elapsed": round(time.perf_counter() - started, 6)
+        })
+        # Body is already decoded: drop content-encoding/length from the replayed headers
+        headers = {"content-type": content_type} if content_type else {}
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def _write(self, exchange: Dict[str, Any]) -> None:
+        line = json.dumps(exchange, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._handle.write(line)
+            self._handle.flush()
+            self.recorded += 1
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        await self.inner.aclose()
+        with self._lock:
+            self._handle.close()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded exchanges by (method, URL). Repeated requests cycle
+    through the recordings of that URL in order; unknown requests raise
+    `httpx.ConnectError`. Delays longer than the request's read timeout end
+    in `httpx.ReadTimeout`, as they would against the real provider.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.replayed = 0
+        self.misses = 0
+        recordings: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for exchange in read_cassette(path):
+            recordings[(exchange["method"], exchange["url"])].append(exchange)
+        self._recordings = {key: itertools.cycle(exchanges) for key, exchanges in recordings.items()}
+        self.urls = len(recordings)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        exchanges = self._recordings.get((request.method, str(request.url)))
+        if exchanges is None:
+            self.misses += 1
+            raise httpx.ConnectError(f"Sem gravação para {request.method} {request.url}", request=request)
+        exchange = next(exchanges)
+        self.replayed += 1
+
+        delay = exchange["elapsed"] * self.latency_scale
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        if read_timeout is not None and delay > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout("Tempo de leitura esgotado (replay)", request=request)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if "error" in exchange:
+            error = getattr(httpx, exchange["error"], httpx.TransportError)
+            raise error(f"{exchange['error']} (replay)", request=request)
+
+        headers = {"content-type": exchange["content_type"]} if exchange.get("content_type") else {}
+        return httpx.Response(
+            exchange["status"],
+            headers=headers,
+            content=exchange["body"].encode("utf-8"),
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        pass
+
+
+@lru_cache()
+def _recording_transport(path: str) -> RecordingTransport:
+    return RecordingTransport(path)
+
+
+@lru_cache()
+def _replay_transport(path: str, latency_scale: float) -> ReplayTransport:
+    return ReplayTransport(path, latency_scale)
+
+
+def upstream_transport(settings: Settings) -> Optional[httpx.AsyncBaseTransport]:
+    """Transport shared by the upstream adapters, or None for direct network access"""
+    if settings.UPSTREAM_REPLAY_PATH:
+        return _replay_transport(settings.UPSTREAM_REPLAY_PATH, settings.UPSTREAM_REPLAY_LATENCY_SCALE)
+    if settings.UPSTREAM_RECORD_PATH:
+        return _recording_transport(settings.UPSTREAM_RECORD_PATH)
+    return None
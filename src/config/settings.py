@@ -1,37 +1,134 @@
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from dotenv import load_dotenv
 
-load_dotenv()
-
 
 class Settings:
-    # API URLs
-    BRASILAPI_BASE_URL: str = os.getenv("BRASILAPI_BASE_URL", "https://brasilapi.com.br")
-    VIACEP_BASE_URL: str = os.getenv("VIACEP_BASE_URL", "https://viacep.com.br")
-    
-    # Timeouts
-    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "10.0"))
-    
-    # Retry Configuration
-    MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
-    RETRY_DELAY: float = float(os.getenv("RETRY_DELAY", "1.0"))
-    
-    # Circuit Breaker Configuration
-    FAILURE_THRESHOLD: int = int(os.getenv("FAILURE_THRESHOLD", "5"))
-    RECOVERY_TIMEOUT: int = int(os.getenv("RECOVERY_TIMEOUT", "60"))
-    
-    # Service Configuration
-    CEP_MAX_RETRIES: int = int(os.getenv("CEP_MAX_RETRIES", "3"))
-    
-    # User Agent
-    USER_AGENT: str = os.getenv("USER_AGENT", "address-validation-service/1.0")
-    
-    # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
+    """Service configuration, resolved once from the environment"""
+
+    def __init__(self, env: Optional[dict] = None):
+        env = os.environ if env is None else env
+
+        # API URLs
+        self.BRASILAPI_BASE_URL: str = env.get("BRASILAPI_BASE_URL", "https://brasilapi.com.br")
+        self.VIACEP_BASE_URL: str = env.get("VIACEP_BASE_URL", "https://viacep.com.br")
+        self.RECEITAWS_BASE_URL: str = env.get("RECEITAWS_BASE_URL", "https://receitaws.com.br")
+
+        # Timeouts
+        self.HTTP_TIMEOUT: float = float(env.get("HTTP_TIMEOUT", "10.0"))
+
+        # Retry Configuration
+        self.MAX_RETRIES: int = int(env.get("MAX_RETRIES", "3"))
+        self.RETRY_DELAY: float = float(env.get("RETRY_DELAY", "1.0"))
+
+        # Circuit Breaker Configuration
+        self.FAILURE_THRESHOLD: int = int(env.get("FAILURE_THRESHOLD", "5"))
+        self.RECOVERY_TIMEOUT: int = int(env.get("RECOVERY_TIMEOUT", "60"))
+
+        # Service Configuration
+        self.CEP_MAX_RETRIES: int = int(env.get("CEP_MAX_RETRIES", "3"))
+
+        # CNPJ provider chain (ordered by preference) and hedging delay in seconds.
+        # ReceitaWS is opt-in: the public instance is heavily rate-limited, so
+        # hedging every slow BrasilAPI call to it mostly yields 429s.
+        self.CNPJ_PROVIDERS: List[str] = [
+            name.strip() for name in env.get("CNPJ_PROVIDERS", "brasilapi").split(",") if name.strip()
+        ]
+        self.CNPJ_HEDGE_DELAY: float = float(env.get("CNPJ_HEDGE_DELAY", "0.5"))
+        self.CNPJ_SNAPSHOT_PATH: str = env.get("CNPJ_SNAPSHOT_PATH", "data/cnpj.snapshot")
+
+        # Cache
+        self.CACHE_TTL: float = float(env.get("CACHE_TTL", "3600"))
+        self.CACHE_MAX_SIZE: int = int(env.get("CACHE_MAX_SIZE", "10000"))
+        self.RESULT_CACHE_TTL: float = float(env.get("RESULT_CACHE_TTL", "300"))
+        self.RESULT_CACHE_MAX_SIZE: int = int(env.get("RESULT_CACHE_MAX_SIZE", "10000"))
+        # Background refresh of hot CNPJ/CEP entries shortly before they expire
+        self.CACHE_REFRESH_ENABLED: bool = env.get("CACHE_REFRESH_ENABLED", "true").lower() == "true"
+        self.CACHE_REFRESH_INTERVAL: float = float(env.get("CACHE_REFRESH_INTERVAL", "5.0"))
+        self.CACHE_REFRESH_AHEAD: float = float(env.get("CACHE_REFRESH_AHEAD", "60.0"))
+        self.CACHE_REFRESH_MIN_READS: int = int(env.get("CACHE_REFRESH_MIN_READS", "3"))
+        self.CACHE_REFRESH_RATE: float = float(env.get("CACHE_REFRESH_RATE", "5.0"))
+        # Background prefetch of the company's registered CEP when a request used another one
+        self.CEP_PREFETCH_ENABLED: bool = env.get("CEP_PREFETCH_ENABLED", "true").lower() == "true"
+        self.CEP_PREFETCH_CONCURRENCY: int = int(env.get("CEP_PREFETCH_CONCURRENCY", "4"))
+        self.CEP_PREFETCH_MAX_PENDING: int = int(env.get("CEP_PREFETCH_MAX_PENDING", "256"))
+        self.COMPRESSION_MIN_SIZE: int = int(env.get("COMPRESSION_MIN_SIZE", "512"))
+
+        # Upstream record/replay (src/adapters/transports.py)
+        self.UPSTREAM_RECORD_PATH: str = env.get("UPSTREAM_RECORD_PATH", "")
+        self.UPSTREAM_REPLAY_PATH: str = env.get("UPSTREAM_REPLAY_PATH", "")
+        self.UPSTREAM_REPLAY_LATENCY_SCALE: float = float(env.get("UPSTREAM_REPLAY_LATENCY_SCALE", "1.0"))
+
+        # User Agent
+        self.USER_AGENT: str = env.get("USER_AGENT", "address-validation-service/1.0")
+
+        # Admission control (adaptive concurrency limit on /validate)
+        self.ADMISSION_ENABLED: bool = env.get("ADMISSION_ENABLED", "true").lower() == "true"
+        self.ADMISSION_INITIAL_LIMIT: int = int(env.get("ADMISSION_INITIAL_LIMIT", "50"))
+        self.ADMISSION_MIN_LIMIT: int = int(env.get("ADMISSION_MIN_LIMIT", "5"))
+        self.ADMISSION_MAX_LIMIT: int = int(env.get("ADMISSION_MAX_LIMIT", "1000"))
+        self.ADMISSION_BATCH_SHARE: float = float(env.get("ADMISSION_BATCH_SHARE", "0.5"))
+
+        # Logging
+        self.LOG_LEVEL: str = env.get("LOG_LEVEL", "INFO")
+
+        # Event loop monitoring
+        self.LOOP_MONITOR_ENABLED: bool = env.get("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.LOOP_MONITOR_INTERVAL: float = float(env.get("LOOP_MONITOR_INTERVAL", "0.1"))
+        self.SLOW_CALLBACK_THRESHOLD: float = float(env.get("SLOW_CALLBACK_THRESHOLD", "0.1"))
+
+        # Tracing (OTLP/JSON); spans are only recorded when an export target is set
+        self.SERVICE_NAME: str = env.get("SERVICE_NAME", "address-validation-service")
+        self.TRACE_SAMPLE_RATE: float = float(env.get("TRACE_SAMPLE_RATE", "0.0"))
+        self.TRACE_EXPORT_PATH: str = env.get("TRACE_EXPORT_PATH", "")
+        self.TRACE_EXPORT_ENDPOINT: str = env.get("TRACE_EXPORT_ENDPOINT", "")
+
+        # Rolling per-provider outcome/latency stats served on /debug/stats
+        self.PROVIDER_STATS_ENABLED: bool = env.get("PROVIDER_STATS_ENABLED", "true").lower() == "true"
+
+        # gRPC entry point (src/rpc/server.py, requires grpcio); 0 disables it
+        self.GRPC_PORT: int = int(env.get("GRPC_PORT", "0"))
+        self.GRPC_MAX_IN_FLIGHT: int = int(env.get("GRPC_MAX_IN_FLIGHT", "64"))
+
+        # Append-only audit log of validation outcomes (src/services/audit_sink.py); empty disables it
+        self.AUDIT_LOG_DIR: str = env.get("AUDIT_LOG_DIR", "")
+        self.AUDIT_QUEUE_SIZE: int = int(env.get("AUDIT_QUEUE_SIZE", "10000"))
+        self.AUDIT_BATCH_SIZE: int = int(env.get("AUDIT_BATCH_SIZE", "500"))
+        self.AUDIT_FLUSH_INTERVAL: float = float(env.get("AUDIT_FLUSH_INTERVAL", "1.0"))
+        self.AUDIT_SEGMENT_MAX_ROWS: int = int(env.get("AUDIT_SEGMENT_MAX_ROWS", "1000000"))
+        self.AUDIT_ENQUEUE_TIMEOUT: float = float(env.get("AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+        # FULL survives power loss; NORMAL is cheaper but can lose the last batches
+        self.AUDIT_SYNCHRONOUS: str = env.get("AUDIT_SYNCHRONOUS", "FULL")
+
+        # Admin endpoints are disabled while no token is configured
+        self.ADMIN_TOKEN: str = env.get("ADMIN_TOKEN", "")
+
+        self._validate()
+
+    def _validate(self) -> None:
+        # Zero would make the loop watchdog spin and report every tick, and
+        # the cache refresher divide by zero or spin between passes
+        for name in (
+            "LOOP_MONITOR_INTERVAL", "SLOW_CALLBACK_THRESHOLD", "CACHE_REFRESH_INTERVAL", "CACHE_REFRESH_RATE"
+        ):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} deve ser maior que zero (recebido {getattr(self, name)})")
+
     class Config:
         case_sensitive = True
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env and build the settings singleton on first use"""
+    load_dotenv()
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep `from src.config.settings import settings` working without
+    # reading the environment at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
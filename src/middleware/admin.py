@@ -0,0 +1,19 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from src.config.settings import Settings
+
+
+def admin_guard(settings: Settings):
+    """
+    FastAPI dependency protecting admin endpoints
+
+    Endpoints answer 404 while ADMIN_TOKEN is unset and 403 on a wrong token.
+    """
+    async def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+        if not settings.ADMIN_TOKEN:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de administração inválido")
+
+    return require_admin_token
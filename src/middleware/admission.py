@@ -0,0 +1,166 @@
+import json
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# ASGI scope flag: only requests that actually ran the service (not response
+# cache hits or rejected requests) feed the latency baseline
+SAMPLE_SCOPE_KEY = "admission.sample"
+
+
+def record_admission_sample(scope) -> None:
+    """Mark the current request's latency as an upstream sample for the limiter"""
+    if SAMPLE_SCOPE_KEY in scope:
+        scope[SAMPLE_SCOPE_KEY] = True
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gradient-style adaptive concurrency limit.
+
+    The limit follows the ratio between the long-term (no-load) latency and
+    the latest one: while latency stays near its baseline the limit grows by
+    `queue_size`, and once requests start queueing upstream the gradient
+    drops below 1 and shrinks it. Batch traffic only gets `batch_share` of
+    the limit, so interactive requests keep headroom during spikes.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 50,
+        min_limit: int = 5,
+        max_limit: int = 1000,
+        batch_share: float = 0.5,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        queue_size: int = 4,
+        long_window: int = 600
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.batch_share = batch_share
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.queue_size = queue_size
+        self.long_window = long_window
+        self.in_flight = 0
+        self.long_rtt = 0.0
+        self.last_rtt = 0.0
+        self.admitted: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self.shed: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+
+    def capacity(self, priority: str) -> int:
+        share = self.batch_share if priority == BATCH else 1.0
+        return max(1, int(self.limit * share))
+
+    def try_acquire(self, priority: str) -> bool:
+        if self.in_flight >= self.capacity(priority):
+            self.shed[priority] += 1
+            return False
+        self.in_flight += 1
+        self.admitted[priority] += 1
+        return True
+
+    def release(self, rtt: Optional[float] = None) -> None:
+        """Free a slot; `rtt` is None when the request's latency says nothing about upstream load"""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if rtt is not None:
+            self._update(rtt, in_flight)
+
+    def _update(self, rtt: float, in_flight: int) -> None:
+        self.last_rtt = rtt
+        if self.long_rtt == 0.0:
+            self.long_rtt = rtt
+            return
+
+        # Exponential average over roughly `long_window` samples
+        self.long_rtt += (rtt - self.long_rtt) / self.long_window
+        # Let the baseline recover quickly after a sustained latency increase
+        if self.long_rtt / rtt > 2:
+            self.long_rtt *= 0.95
+
+        # Don't grow the limit while it isn't being used
+        if in_flight < self.limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / rtt))
+        new_limit = self.limit * gradient + self.queue_size
+        new_limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+    def retry_after(self, priority: str) -> int:
+        """Seconds a shed client should wait: about one baseline round trip, longer for batch"""
+        base = max(1, math.ceil(self.long_rtt or 1.0))
+        return base * 2 if priority == BATCH else base
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "capacity": {priority: self.capacity(priority) for priority in PRIORITIES},
+            "rtt_ms": {"long": round(self.long_rtt * 1000, 2), "last": round(self.last_rtt * 1000, 2)},
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed)
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that sheds load on the guarded paths with a fast 503.
+
+    The priority class comes from the `X-Priority` header (`interactive`,
+    the default, or `batch`). Every admitted request holds a slot, but only
+    those marked with `record_admission_sample` update the latency baseline:
+    ~1 ms cache hits would otherwise drag it down and shrink the limit under
+    healthy load.
+    """
+
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter, paths: Tuple[str, ...] = ("/validate",)):
+        self.app = app
+        self.limiter = limiter
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        priority = INTERACTIVE
+        for name, value in scope["headers"]:
+            if name == b"x-priority":
+                priority = BATCH if value.strip().lower() == b"batch" else INTERACTIVE
+                break
+
+        if not self.limiter.try_acquire(priority):
+            await self._reject(send, priority)
+            return
+
+        scope[SAMPLE_SCOPE_KEY] = False
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(time.perf_counter() - started if scope[SAMPLE_SCOPE_KEY] else None)
+
+    async def _reject(self, send, priority: str) -> None:
+        body = json.dumps(
+            {"detail": "Serviço sobrecarregado, tente novamente em instantes"},
+            ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.limiter.retry_after(priority)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,29 +1,105 @@
 import time
 import asyncio
-from typing import Dict, Optional, List
+import heapq
+from collections import OrderedDict
+from typing import Any, Dict, Optional, List, Tuple
 from fastapi import Request, HTTPException
 
 # Rate limiting storage (in-memory for production)
 class InMemoryStorage:
-    def __init__(self):
-        self.storage: Dict[str, List[float]] = {}
-        self._lock = asyncio.Lock()
-    
-    async def get(self, key: str) -> Optional[List[float]]:
-        async with self._lock:
-            return self.storage.get(key)
-    
-    async def set(self, key: str, value: List[float], expire: int) -> None:
-        async with self._lock:
-            self.storage[key] = value
-            # Simple expiration
-            asyncio.create_task(self._expire_after(key, expire))
-    
-    async def _expire_after(self, key: str, seconds: int) -> None:
-        await asyncio.sleep(seconds)
-        async with self._lock:
-            if key in self.storage:
-                del self.storage[key]
+    """
+    Sharded LRU storage with expiring keys.
+
+    Keys are spread over `shards` independent LRU dicts, each with a heap of
+    expiry deadlines. Expired keys are dropped by a single background sweeper
+    task (and ignored by `get` in between), and a full shard evicts its least
+    recently used key. Every operation completes without awaiting, so no lock
+    is needed on the event loop.
+    """
+
+    def __init__(self, max_keys: int = 100_000, shards: int = 16, sweep_interval: float = 1.0):
+        self.shards = shards
+        self.shard_size = max(1, max_keys // shards)
+        self.sweep_interval = sweep_interval
+        # key -> [value, expires_at, scheduled expiry in the heap]
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(shards)]
+        self._heaps: List[List[Tuple[float, str]]] = [[] for _ in range(shards)]
+        self._sweeper: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.expirations = 0
+
+    def _shard(self, key: str) -> int:
+        return hash(key) % self.shards
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._shards[self._shard(key)].get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: Any, expire: float) -> None:
+        index = self._shard(key)
+        shard = self._shards[index]
+        expires_at = time.monotonic() + expire
+
+        entry = shard.get(key)
+        if entry is not None:
+            # The heap keeps the earlier deadline; the sweeper reschedules it
+            entry[0], entry[1] = value, expires_at
+            shard.move_to_end(key)
+        else:
+            shard[key] = [value, expires_at, expires_at]
+            heap = self._heaps[index]
+            heapq.heappush(heap, (expires_at, key))
+            if len(shard) > self.shard_size:
+                shard.popitem(last=False)
+                self.evictions += 1
+                # Evicted keys leave stale deadlines behind; rebuild once they dominate
+                if len(heap) > 2 * self.shard_size:
+                    heap[:] = [(entry[2], shard_key) for shard_key, entry in shard.items()]
+                    heapq.heapify(heap)
+
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+
+    async def delete(self, key: str) -> None:
+        self._shards[self._shard(key)].pop(key, None)
+
+    async def _sweep_forever(self) -> None:
+        while any(self._shards):
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop expired keys; returns how many were removed"""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        for shard, heap in zip(self._shards, self._heaps):
+            while heap and heap[0][0] <= now:
+                scheduled, key = heapq.heappop(heap)
+                entry = shard.get(key)
+                if entry is None or entry[2] != scheduled:
+                    # Evicted, deleted or re-added since it was scheduled
+                    continue
+                if entry[1] > now:
+                    entry[2] = entry[1]
+                    heapq.heappush(heap, (entry[1], key))
+                    continue
+                del shard[key]
+                removed += 1
+        self.expirations += removed
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self),
+            "scheduled": sum(len(heap) for heap in self._heaps),
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
 
 def get_remote_address(request: Request) -> str:
     """Get client IP address"""
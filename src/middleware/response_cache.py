@@ -0,0 +1,267 @@
+import gzip
+import hashlib
+import json
+import re
+import time
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple, TYPE_CHECKING
+from fastapi import Response, status
+from src.models.schemas import ValidationResult
+from src.utils.cache import ThreadSafeCache
+from src.utils.singleflight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+if TYPE_CHECKING:
+    from src.services.audit_sink import AuditSink
+
+
+NON_DIGITS = re.compile(r'[^\d]')
+JSON_MEDIA_TYPE = "application/json"
+RESULT_FIELDS = frozenset(ValidationResult.model_fields)
+MINIMAL_FIELDS = frozenset({"valid", "message"})
+# Projections and encodings kept per cached response
+MAX_REPRESENTATIONS = 8
+PRECONDITION_FAILED_BODY = json.dumps(
+    {"detail": "If-None-Match corresponde ao resultado atual"}, ensure_ascii=False, separators=(",", ":")
+).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str] = None, minimal: bool = False) -> Optional[FrozenSet[str]]:
+    """
+    Fields to render from `?fields=a,b` / `?minimal=true`; None means the
+    full result. `valid` and `message` are always included.
+    """
+    if not fields:
+        return MINIMAL_FIELDS if minimal else None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - RESULT_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Campos desconhecidos: {', '.join(sorted(unknown))} "
+            f"(disponíveis: {', '.join(sorted(RESULT_FIELDS))})"
+        )
+    return requested | MINIMAL_FIELDS
+
+
+class CachedResponse:
+    """A fully rendered /validate response, ready to be replayed"""
+
+    def __init__(self, result: ValidationResult, cacheable: bool):
+        self.result = result
+        self.cacheable = cacheable
+        if result.valid:
+            self.status_code = status.HTTP_200_OK
+            self.body = result.model_dump_json().encode("utf-8")
+        else:
+            self.status_code = status.HTTP_404_NOT_FOUND
+            self.body = self._error_body(RESULT_FIELDS)
+        self.etag = '"%s"' % hashlib.blake2b(self.body, digest_size=12).hexdigest()
+        self.stored_at = time.monotonic()
+        self._representations: Dict[Tuple[Optional[FrozenSet[str]], Optional[str]], Tuple[bytes, str]] = {}
+
+    def representation(
+        self, fields: Optional[FrozenSet[str]], encoding: Optional[str]
+    ) -> Tuple[bytes, str]:
+        """(body, ETag) for a field projection and content encoding, rendered once per entry"""
+        key = (fields, encoding)
+        cached = self._representations.get(key)
+        if cached is not None:
+            return cached
+
+        if encoding is not None:
+            body, etag = self.representation(fields, None)
+            body = brotli.compress(body, quality=5) if encoding == "br" else gzip.compress(body, 6, mtime=0)
+            representation = (body, f'{etag[:-1]}-{encoding}"')
+        elif fields is None or fields == RESULT_FIELDS:
+            representation = (self.body, self.etag)
+        else:
+            body = self._project(fields)
+            representation = (body, '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest())
+
+        if len(self._representations) < MAX_REPRESENTATIONS:
+            self._representations[key] = representation
+        return representation
+
+    def _project(self, fields: FrozenSet[str]) -> bytes:
+        if self.result.valid:
+            return self.result.model_dump_json(include=set(fields)).encode("utf-8")
+        return self._error_body(fields)
+
+    def _error_body(self, fields: FrozenSet[str]) -> bytes:
+        # The payload FastAPI renders for HTTPException(404, detail=message),
+        # plus the per-part comparison when there is one. Projections only
+        # drop `match`, so they are never larger than the full body.
+        payload = {"detail": self.result.message}
+        if "match" in fields and self.result.match is not None:
+            payload["match"] = self.result.match.model_dump()
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ValidationResponseCache:
+    """
+    Response-level cache for /validate keyed by the normalized (CNPJ, CEP) pair.
+
+    Concurrent identical requests share a single computation, and cached
+    responses carry an ETag and Cache-Control so clients and proxies can
+    revalidate a 200 with a GET If-None-Match and get a 304 (a matching POST
+    gets a 412). Field projections and gzip/brotli bodies (for responses of
+    at least `compression_min_size` bytes) are rendered once and kept with
+    the cached response.
+
+    The service records the outcomes it computes in the audit log; with
+    `audit_sink` set, callers answered without running it (cache hits and
+    shared in-flight calls) are recorded here, one row per call.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_size: int = 10000,
+        compression_min_size: int = 512,
+        audit_sink: Optional["AuditSink"] = None
+    ):
+        self.ttl = ttl
+        self.compression_min_size = compression_min_size
+        self.audit_sink = audit_sink
+        self.cache = ThreadSafeCache(max_size=max_size, ttl=ttl)
+        self.single_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(cnpj: str, cep: str) -> str:
+        return f"{NON_DIGITS.sub('', cnpj)}:{NON_DIGITS.sub('', cep)}"
+
+    @staticmethod
+    def is_cacheable(result: ValidationResult) -> bool:
+        # Lookups that found nothing may be upstream outages, so only
+        # definitive verdicts are cached.
+        return result.company_data is not None and result.message != "Endereço não encontrado"
+
+    async def resolve(
+        self,
+        cnpj: str,
+        cep: str,
+        compute: Callable[[str, str], Awaitable[ValidationResult]],
+        bypass: bool = False
+    ) -> CachedResponse:
+        key = self.key(cnpj, cep)
+        if not bypass:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                await self._audit(cnpj, cep, cached)
+                return cached
+        self.misses += 1
+        computed = False
+
+        async def compute_and_store() -> CachedResponse:
+            nonlocal computed
+            computed = True
+            result = await compute(cnpj, cep)
+            entry = CachedResponse(result, self.is_cacheable(result))
+            if entry.cacheable:
+                await self.cache.set(key, entry)
+            return entry
+
+        entry = await self.single_flight.do(key, compute_and_store)
+        if not computed:
+            await self._audit(cnpj, cep, entry)
+        return entry
+
+    async def _audit(self, cnpj: str, cep: str, entry: CachedResponse) -> None:
+        if self.audit_sink is not None:
+            await self.audit_sink.record(cnpj, cep, entry.result)
+
+    def render(
+        self,
+        entry: CachedResponse,
+        if_none_match: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        accept_encoding: Optional[str] = None,
+        method: str = "GET"
+    ) -> Response:
+        body, etag = entry.representation(fields, None)
+        headers = {}
+        if len(body) >= self.compression_min_size:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = _negotiate_encoding(accept_encoding or "")
+            if encoding is not None:
+                body, etag = entry.representation(fields, encoding)
+                headers["Content-Encoding"] = encoding
+
+        if not entry.cacheable:
+            headers["Cache-Control"] = "no-store"
+            return Response(
+                content=body,
+                status_code=entry.status_code,
+                media_type=JSON_MEDIA_TYPE,
+                headers=headers
+            )
+
+        max_age = max(0, int(self.ttl - (time.monotonic() - entry.stored_at)))
+        headers.update({"ETag": etag, "Cache-Control": f"max-age={max_age}"})
+        # A 304 stands in for a 200 the client already holds, never for a cached 404
+        if if_none_match and entry.status_code == status.HTTP_200_OK and _etag_matches(if_none_match, etag):
+            headers.pop("Content-Encoding", None)
+            if method in ("GET", "HEAD"):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            # RFC 9110 13.1.2: other methods fail the precondition instead
+            return Response(
+                content=PRECONDITION_FAILED_BODY,
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                media_type=JSON_MEDIA_TYPE,
+                headers={"ETag": etag}
+            )
+        return Response(
+            content=body,
+            status_code=entry.status_code,
+            media_type=JSON_MEDIA_TYPE,
+            headers=headers
+        )
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": self.cache.size(),
+            "max_size": self.cache.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "in_flight": self.single_flight.in_flight()
+        }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag
+        for candidate in candidates
+    )
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported coding in an Accept-Encoding header (br over gzip on ties)"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip()] = quality
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = weights.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
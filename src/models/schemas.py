@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from src.utils.validators import validate_cnpj, validate_cep
 
 
@@ -25,11 +25,18 @@ class AddressData(BaseModel):
     service: Optional[str] = None
 
 
+class AddressMatch(BaseModel):
+    state: bool
+    city: bool
+    street: bool
+
+
 class ValidationResult(BaseModel):
     valid: bool
     message: str
     company_data: Optional[CompanyData]
     address_data: Optional[AddressData]
+    match: Optional[AddressMatch] = None
 
 
 class ValidationRequest(BaseModel):
@@ -50,4 +57,13 @@ class ValidationRequest(BaseModel):
         is_valid, error_msg = validate_cep(v)
         if not is_valid:
             raise ValueError(error_msg)
-        return v
\ No newline at end of file
+        return v
+
+
+class ValidationQuery(ValidationRequest):
+    """Query string of GET /validate: the request plus response shaping options"""
+    fields: Optional[str] = Field(
+        default=None,
+        description="Campos do resultado separados por vírgula (ex.: valid,match); valid e message sempre vêm"
+    )
+    minimal: bool = Field(default=False, description="Retorna apenas valid e message")
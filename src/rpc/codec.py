@@ -0,0 +1,185 @@
+"""
+Protocol Buffers wire codec for the messages in address_validation.proto.
+
+The messages are flat (strings, bools, one uint32 and nested messages), so
+encoding is written out by hand: no generated code and no protobuf runtime
+dependency. Responses are encoded straight from the pydantic models, and
+unknown fields are skipped when decoding, as protobuf requires.
+"""
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from src.models.schemas import ValidationResult
+
+VARINT, FIXED64, LENGTH_DELIMITED, FIXED32 = 0, 1, 2, 5
+
+COMPANY_FIELDS = (
+    (1, "cnpj"), (2, "razao_social"), (3, "nome_fantasia"), (4, "uf"), (5, "municipio"),
+    (6, "logradouro"), (7, "bairro"), (8, "cep"), (9, "numero"), (10, "complemento"),
+)
+ADDRESS_FIELDS = ((1, "cep"), (2, "state"), (3, "city"), (4, "neighborhood"), (5, "street"), (6, "service"))
+MATCH_FIELDS = ((1, "state"), (2, "city"), (3, "street"))
+
+
+class ValidateCall(NamedTuple):
+    cnpj: str
+    cep: str
+    minimal: bool = False
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _put_bytes(out: bytearray, number: int, value: bytes) -> None:
+    out.append(number << 3 | LENGTH_DELIMITED)
+    _put_varint(out, len(value))
+    out += value
+
+
+def _put_string(out: bytearray, number: int, value: Optional[str]) -> None:
+    # proto3 leaves default values (empty string, False, 0) off the wire
+    if value:
+        _put_bytes(out, number, value.encode("utf-8"))
+
+
+def _put_bool(out: bytearray, number: int, value: bool) -> None:
+    if value:
+        out.append(number << 3 | VARINT)
+        out.append(1)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _fields(data: bytes) -> Iterator[Tuple[int, Any]]:
+    """(field number, value) pairs; length-delimited values are bytes, varints ints"""
+    position, end = 0, len(data)
+    while position < end:
+        key, position = _read_varint(data, position)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == VARINT:
+            value, position = _read_varint(data, position)
+        elif wire_type == LENGTH_DELIMITED:
+            length, position = _read_varint(data, position)
+            value = data[position:position + length]
+            position += length
+        elif wire_type == FIXED64:
+            value, position = data[position:position + 8], position + 8
+        elif wire_type == FIXED32:
+            value, position = data[position:position + 4], position + 4
+        else:
+            raise ValueError(f"Tipo de campo protobuf não suportado: {wire_type}")
+        yield number, value
+
+
+def _encode_strings(model: Any, fields: Tuple[Tuple[int, str], ...]) -> bytes:
+    out = bytearray()
+    for number, name in fields:
+        _put_string(out, number, getattr(model, name))
+    return bytes(out)
+
+
+def _decode_strings(data: bytes, fields: Tuple[Tuple[int, str], ...]) -> Dict[str, Any]:
+    names = dict(fields)
+    return {names[number]: value.decode("utf-8") for number, value in _fields(data) if number in names}
+
+
+# Requests
+
+def encode_validate_request(call: ValidateCall) -> bytes:
+    out = bytearray()
+    _put_string(out, 1, call.cnpj)
+    _put_string(out, 2, call.cep)
+    _put_bool(out, 3, call.minimal)
+    return bytes(out)
+
+
+def decode_validate_request(data: bytes) -> ValidateCall:
+    cnpj = cep = ""
+    minimal = False
+    for number, value in _fields(data):
+        if number == 1:
+            cnpj = value.decode("utf-8")
+        elif number == 2:
+            cep = value.decode("utf-8")
+        elif number == 3:
+            minimal = bool(value)
+    return ValidateCall(cnpj, cep, minimal)
+
+
+def encode_validate_batch_request(calls: List[ValidateCall]) -> bytes:
+    out = bytearray()
+    for call in calls:
+        _put_bytes(out, 1, encode_validate_request(call))
+    return bytes(out)
+
+
+def decode_validate_batch_request(data: bytes) -> List[ValidateCall]:
+    return [decode_validate_request(value) for number, value in _fields(data) if number == 1]
+
+
+# Responses
+
+def encode_validate_response(result: ValidationResult, index: int = 0, minimal: bool = False) -> bytes:
+    out = bytearray()
+    _put_bool(out, 1, result.valid)
+    _put_string(out, 2, result.message)
+    if not minimal:
+        if result.company_data is not None:
+            _put_bytes(out, 3, _encode_strings(result.company_data, COMPANY_FIELDS))
+        if result.address_data is not None:
+            _put_bytes(out, 4, _encode_strings(result.address_data, ADDRESS_FIELDS))
+    if result.match is not None:
+        match = bytearray()
+        for number, name in MATCH_FIELDS:
+            _put_bool(match, number, getattr(result.match, name))
+        _put_bytes(out, 5, bytes(match))
+    if index:
+        out.append(6 << 3 | VARINT)
+        _put_varint(out, index)
+    return bytes(out)
+
+
+def decode_validate_response(data: bytes) -> Dict[str, Any]:
+    """Response as a dict shaped like the /validate JSON, plus `index`"""
+    response: Dict[str, Any] = {
+        "valid": False, "message": "", "company_data": None, "address_data": None, "match": None, "index": 0
+    }
+    for number, value in _fields(data):
+        if number == 1:
+            response["valid"] = bool(value)
+        elif number == 2:
+            response["message"] = value.decode("utf-8")
+        elif number == 3:
+            response["company_data"] = _decode_strings(value, COMPANY_FIELDS)
+        elif number == 4:
+            response["address_data"] = _decode_strings(value, ADDRESS_FIELDS)
+        elif number == 5:
+            names = dict(MATCH_FIELDS)
+            match = {name: False for name in names.values()}
+            match.update({names[field]: bool(flag) for field, flag in _fields(value) if field in names})
+            response["match"] = match
+        elif number == 6:
+            response["index"] = value
+    return response
+
+
+def encode_validate_batch_response(responses: List[bytes]) -> bytes:
+    out = bytearray()
+    for response in responses:
+        _put_bytes(out, 1, response)
+    return bytes(out)
+
+
+def decode_validate_batch_response(data: bytes) -> List[Dict[str, Any]]:
+    return [decode_validate_response(value) for number, value in _fields(data) if number == 1]
@@ -0,0 +1,266 @@
+"""
+gRPC entry point of AddressValidationService.
+
+Serves the `address_validation.v1.AddressValidation` service defined in
+address_validation.proto (unary, batch and bidirectional streaming) over
+the same service instance as the HTTP API when started from `main.py`
+(GRPC_PORT), so both share the lookup and result caches, in-flight
+deduplication, circuit breakers and provider strategies. Given the result
+cache, every validation goes through it like POST /validate: repeated
+(CNPJ, CEP) pairs are answered from it and recorded in the audit log the
+same way. Messages go through the hand-written codec in `src.rpc.codec`
+and skip JSON and pydantic request validation entirely.
+
+When given the HTTP API's admission limiter, calls take a slot from the
+same adaptive limit: `Validate` is interactive unless the `x-priority`
+metadata says `batch`, while `ValidateBatch` and `ValidateStream` always
+hold one batch slot for their whole duration. Calls over capacity fail
+fast with RESOURCE_EXHAUSTED. Only unary calls feed the latency baseline.
+
+Requires the optional `grpcio` package. Standalone:
+
+    python -m src.rpc.server --port 50051
+"""
+import argparse
+import asyncio
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from src.middleware.admission import BATCH, INTERACTIVE, AdaptiveConcurrencyLimiter
+from src.middleware.response_cache import ValidationResponseCache
+from src.models.schemas import ValidationResult
+from src.rpc.codec import (
+    ValidateCall,
+    decode_validate_batch_request,
+    decode_validate_request,
+    encode_validate_batch_response,
+    encode_validate_response,
+)
+from src.services.validation_service import AddressValidationService
+from src.utils.logging import get_logger
+from src.utils.validators import validate_cep, validate_cnpj
+
+try:
+    import grpc
+except ImportError:  # optional: the gRPC entry point is disabled without it
+    grpc = None
+
+
+SERVICE_NAME = "address_validation.v1.AddressValidation"
+OVERLOADED_MESSAGE = "Serviço sobrecarregado, tente novamente em instantes"
+_DONE = object()
+
+
+def _format_error(call: ValidateCall) -> Optional[str]:
+    for is_valid, message in (validate_cnpj(call.cnpj), validate_cep(call.cep)):
+        if not is_valid:
+            return message
+    return None
+
+
+def _rejected(message: str) -> ValidationResult:
+    return ValidationResult(valid=False, message=message, company_data=None, address_data=None)
+
+
+def _priority(context) -> str:
+    for key, value in context.invocation_metadata() or ():
+        if key == "x-priority":
+            return BATCH if value.strip().lower() == "batch" else INTERACTIVE
+    return INTERACTIVE
+
+
+class AddressValidationServicer:
+    """RPC handlers; requests arrive decoded and responses leave as encoded bytes"""
+
+    def __init__(
+        self,
+        validation_service: AddressValidationService,
+        max_in_flight: int = 64,
+        admission_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        response_cache: Optional[ValidationResponseCache] = None
+    ):
+        self.validation_service = validation_service
+        self.max_in_flight = max_in_flight
+        self.admission_limiter = admission_limiter
+        self.response_cache = response_cache
+        self.logger = get_logger("AddressValidationServicer")
+
+    async def _resolve(
+        self,
+        cnpj: str,
+        cep: str,
+        compute: Optional[Callable[[str, str], Awaitable[ValidationResult]]] = None
+    ) -> ValidationResult:
+        """Result of one validation, through the result cache when there is one"""
+        compute = compute or self.validation_service.validate_customer_address
+        if self.response_cache is None:
+            return await compute(cnpj, cep)
+        return (await self.response_cache.resolve(cnpj, cep, compute)).result
+
+    async def _admit(self, priority: str, context) -> bool:
+        """Take an admission slot (aborting when over capacity); False when there is no limiter"""
+        if self.admission_limiter is None:
+            return False
+        if not self.admission_limiter.try_acquire(priority):
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, OVERLOADED_MESSAGE)
+        return True
+
+    async def validate(self, call: ValidateCall, context) -> bytes:
+        error = _format_error(call)
+        if error:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, error)
+        admitted = await self._admit(_priority(context), context)
+        ran_service = False
+
+        async def run_service(cnpj: str, cep: str) -> ValidationResult:
+            nonlocal ran_service
+            ran_service = True
+            return await self.validation_service.validate_customer_address(cnpj, cep)
+
+        started = time.perf_counter()
+        rtt = None
+        try:
+            result = await self._resolve(call.cnpj, call.cep, run_service)
+            # Cache hits are not upstream latency samples for admission control
+            if ran_service:
+                rtt = time.perf_counter() - started
+        finally:
+            if admitted:
+                self.admission_limiter.release(rtt)
+        return encode_validate_response(result, minimal=call.minimal)
+
+    async def validate_batch(self, calls: List[ValidateCall], context) -> bytes:
+        admitted = await self._admit(BATCH, context)
+        try:
+            return await self._validate_batch(calls)
+        finally:
+            if admitted:
+                # A whole batch's duration is not a per-request latency sample
+                self.admission_limiter.release()
+
+    async def _validate_batch(self, calls: List[ValidateCall]) -> bytes:
+        responses: List[bytes] = [b""] * len(calls)
+        accepted = []
+        for index, call in enumerate(calls):
+            error = _format_error(call)
+            if error:
+                responses[index] = encode_validate_response(_rejected(error), index, call.minimal)
+            else:
+                accepted.append((call.cnpj, call.cep, index, call.minimal))
+
+        async for (_, _, index, minimal), result in self.validation_service.validate_many(
+            accepted, max_in_flight=self.max_in_flight, with_input=True, validate=self._resolve
+        ):
+            responses[index] = encode_validate_response(result, index, minimal)
+        return encode_validate_batch_response(responses)
+
+    async def validate_stream(self, calls: AsyncIterator[ValidateCall], context) -> AsyncIterator[bytes]:
+        admitted = await self._admit(BATCH, context)
+        # Results and format rejections share one bounded queue, so a slow
+        # client stops validate_many from pulling more requests.
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+
+        async def accepted_calls():
+            index = 0
+            async for call in calls:
+                error = _format_error(call)
+                if error:
+                    await outbox.put(encode_validate_response(_rejected(error), index, call.minimal))
+                else:
+                    yield call.cnpj, call.cep, index, call.minimal
+                index += 1
+
+        async def pump() -> None:
+            try:
+                await forward_results()
+            except asyncio.CancelledError:
+                # The handler is gone and nobody reads the outbox: putting
+                # the sentinel could block forever on a full queue
+                raise
+            except Exception:
+                await outbox.put(_DONE)
+                raise
+            await outbox.put(_DONE)
+
+        async def forward_results() -> None:
+            results = self.validation_service.validate_many(
+                accepted_calls(), max_in_flight=self.max_in_flight, with_input=True, validate=self._resolve
+            )
+            try:
+                async for (_, _, index, minimal), result in results:
+                    await outbox.put(encode_validate_response(result, index, minimal))
+            finally:
+                # Cancels the validations still in flight
+                await results.aclose()
+
+        pumping = asyncio.ensure_future(pump())
+        try:
+            while True:
+                response = await outbox.get()
+                if response is _DONE:
+                    break
+                yield response
+            # Surface errors from reading the request stream
+            await pumping
+        finally:
+            pumping.cancel()
+            if admitted:
+                self.admission_limiter.release()
+
+
+def generic_handler(servicer: AddressValidationServicer):
+    return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        "Validate": grpc.unary_unary_rpc_method_handler(
+            servicer.validate, request_deserializer=decode_validate_request
+        ),
+        "ValidateBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.validate_batch, request_deserializer=decode_validate_batch_request
+        ),
+        "ValidateStream": grpc.stream_stream_rpc_method_handler(
+            servicer.validate_stream, request_deserializer=decode_validate_request
+        ),
+    })
+
+
+def create_server(
+    validation_service: AddressValidationService,
+    address: str,
+    max_in_flight: int = 64,
+    admission_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    response_cache: Optional[ValidationResponseCache] = None
+):
+    """grpc.aio server bound to `address` (e.g. "[::]:50051"); start it with `await server.start()`"""
+    if grpc is None:
+        raise RuntimeError("Entrada gRPC requer o pacote opcional grpcio (pip install grpcio)")
+    servicer = AddressValidationServicer(validation_service, max_in_flight, admission_limiter, response_cache)
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((generic_handler(servicer),))
+    server.add_insecure_port(address)
+    return server
+
+
+async def serve(host: str, port: int, max_in_flight: int) -> None:
+    from src.config.settings import get_settings
+    from src.utils.logging import setup_logging
+
+    settings = get_settings()
+    setup_logging(settings.LOG_LEVEL)
+    response_cache = ValidationResponseCache(ttl=settings.RESULT_CACHE_TTL, max_size=settings.RESULT_CACHE_MAX_SIZE)
+    server = create_server(
+        AddressValidationService(settings=settings), f"{host}:{port}", max_in_flight, response_cache=response_cache
+    )
+    await server.start()
+    get_logger("AddressValidationServicer").info(f"gRPC escutando em {host}:{port}")
+    await server.wait_for_termination()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gRPC address validation server")
+    parser.add_argument("--host", default="[::]")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.max_in_flight))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Append-only audit log of validation outcomes.
+
+`record()` only enqueues: results are buffered in a bounded queue and a
+single writer task flushes them in batches to SQLite (WAL mode) through
+`asyncio.to_thread`, so the event loop never waits on disk. When the queue
+is full, `record()` waits at most `enqueue_timeout` seconds for room
+(bounded back-pressure) and then drops the entry, counting it in `dropped`:
+under sustained load the log is incomplete, which is reported as an error
+log (at most every `DROP_REPORT_INTERVAL` seconds) and in `/health`.
+
+Segments are written with `PRAGMA synchronous=FULL` by default, so a
+committed batch survives a power loss. `synchronous="NORMAL"` syncs less
+often in WAL mode and can lose the last batches on an OS crash or power
+loss (not on a process crash), in exchange for cheaper commits.
+
+The log is split into segments (`audit-000001.sqlite3`, ...), rotated
+after `segment_max_rows` rows. Every segment has an index on (cnpj, ts) for
+`query()`, and triggers that reject UPDATE and DELETE.
+"""
+import asyncio
+import glob
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.schemas import ValidationResult
+from src.utils.logging import get_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    cnpj TEXT NOT NULL,
+    cep TEXT NOT NULL,
+    valid INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_cnpj_ts ON audit (cnpj, ts);
+CREATE TRIGGER IF NOT EXISTS audit_no_update BEFORE UPDATE ON audit
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_no_delete BEFORE DELETE ON audit
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+"""
+
+NON_DIGITS = re.compile(r'[^\d]')
+SYNCHRONOUS_MODES = ("FULL", "NORMAL")
+# Seconds between error logs about dropped entries
+DROP_REPORT_INTERVAL = 10.0
+
+# (timestamp, cnpj, cep, result); documents are stored as digits only
+AuditEntry = Tuple[float, str, str, ValidationResult]
+
+
+class AuditSink:
+    def __init__(
+        self,
+        directory: str,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        segment_max_rows: int = 1_000_000,
+        enqueue_timeout: float = 0.05,
+        synchronous: str = "FULL"
+    ):
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous deve ser um de {', '.join(SYNCHRONOUS_MODES)} (recebido {synchronous})")
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_rows = segment_max_rows
+        self.enqueue_timeout = enqueue_timeout
+        self.synchronous = synchronous
+        self.logger = get_logger("AuditSink")
+        self.written = 0
+        self.dropped = 0
+        self.last_dropped_at: Optional[float] = None
+        self.batches = 0
+        self._dropped_reported = 0
+        self._drop_reported_at: Optional[float] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._segment_rows = 0
+        self._segment_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Listed once here; rotations keep the count in memory
+        segments = await asyncio.to_thread(self._segments)
+        self._segment_count = len(segments)
+        await asyncio.to_thread(self._open_segment, segments[-1] if segments else None)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and close the current segment"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        await asyncio.to_thread(self._connection.close)
+        self._connection = None
+
+    async def record(self, cnpj: str, cep: str, result: ValidationResult) -> bool:
+        """Enqueue an outcome; False when it had to be dropped"""
+        if not self.running:
+            return False
+        entry = (time.time(), NON_DIGITS.sub('', cnpj), NON_DIGITS.sub('', cep), result)
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(entry), timeout=self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._count_dropped(1, "fila de auditoria cheia")
+            return False
+
+    def _count_dropped(self, count: int, reason: str) -> None:
+        self.dropped += count
+        self.last_dropped_at = time.time()
+        now = time.monotonic()
+        if self._drop_reported_at is None or now - self._drop_reported_at >= DROP_REPORT_INTERVAL:
+            self.logger.error(
+                f"Log de auditoria incompleto ({reason}): {self.dropped - self._dropped_reported} registros "
+                f"descartados desde o último aviso, {self.dropped} no total"
+            )
+            self._dropped_reported = self.dropped
+            self._drop_reported_at = now
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[AuditEntry] = []
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+            while not stopping and len(batch) < self.batch_size and not self._queue.empty():
+                entry = self._queue.get_nowait()
+                if entry is None:
+                    stopping = True
+                else:
+                    batch.append(entry)
+
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write, batch)
+                except Exception as e:
+                    self._count_dropped(len(batch), f"falha ao gravar: {str(e)}")
+
+    # Writer thread (one batch at a time)
+
+    def _segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "audit-*.sqlite3")))
+
+    def _open_segment(self, path: Optional[str]) -> None:
+        if path is None:
+            segments = self._segments()
+            number = int(os.path.basename(segments[-1])[6:12]) + 1 if segments else 1
+            path = os.path.join(self.directory, f"audit-{number:06d}.sqlite3")
+            self._segment_count += 1
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        connection.executescript(SCHEMA)
+        self._segment_rows = connection.execute("SELECT COUNT(*) FROM audit").fetchone()[0]
+        self._connection = connection
+
+    def _write(self, batch: List[AuditEntry]) -> None:
+        if self._segment_rows >= self.segment_max_rows:
+            self._connection.close()
+            self._open_segment(None)
+
+        rows = [
+            (timestamp, cnpj, cep, int(result.valid), result.message, result.model_dump_json())
+            for timestamp, cnpj, cep, result in batch
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO audit (ts, cnpj, cep, valid, message, result) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self._segment_rows += len(rows)
+        self.written += len(rows)
+        self.batches += 1
+
+    # Queries
+
+    async def query(self, cnpj: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent outcomes recorded for `cnpj`, newest first"""
+        return await asyncio.to_thread(self._query, NON_DIGITS.sub('', cnpj), limit)
+
+    def _query(self, cnpj: str, limit: int) -> List[Dict[str, Any]]:
+        found: List[Dict[str, Any]] = []
+        for path in reversed(self._segments()):
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                rows = connection.execute(
+                    "SELECT ts, cnpj, cep, valid, message, result FROM audit "
+                    "WHERE cnpj = ? ORDER BY ts DESC LIMIT ?",
+                    (cnpj, limit - len(found))
+                ).fetchall()
+            finally:
+                connection.close()
+            found.extend(
+                {"ts": ts, "cnpj": row_cnpj, "cep": cep, "valid": bool(valid), "message": message, "result": result}
+                for ts, row_cnpj, cep, valid, message, result in rows
+            )
+            if len(found) >= limit:
+                break
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "last_dropped_at": self.last_dropped_at,
+            "batches": self.batches,
+            "segments": self._segment_count
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, TYPE_CHECKING
+from src.middleware.admission import BATCH
+from src.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from src.middleware.admission import AdaptiveConcurrencyLimiter
+    from src.services.validation_service import AddressValidationService
+
+
+class CacheRefresher:
+    """
+    Refresh-ahead for hot CNPJ/CEP cache entries.
+
+    Every `interval` seconds, entries read at least `min_reads` times since
+    they were stored and expiring within `refresh_ahead` seconds are
+    re-fetched in the background, soonest first. This keeps popular
+    merchants in the cache, so live requests never wait on the refetch.
+    Refreshes run one at a time, at most `rate` per second. A pass stops
+    early while live traffic already uses the batch share of the
+    admission limit.
+    """
+
+    def __init__(
+        self,
+        service: "AddressValidationService",
+        interval: float = 5.0,
+        refresh_ahead: float = 60.0,
+        min_reads: int = 3,
+        rate: float = 5.0,
+        admission_limiter: Optional["AdaptiveConcurrencyLimiter"] = None
+    ):
+        if interval <= 0 or rate <= 0:
+            raise ValueError(f"interval e rate devem ser maiores que zero (recebidos {interval} e {rate})")
+        self.service = service
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.min_reads = min_reads
+        self.rate = rate
+        self.admission_limiter = admission_limiter
+        self.logger = get_logger("CacheRefresher")
+        self.refreshed = 0
+        self.failed = 0
+        self.deferred = 0
+        self.last_pass_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                self.logger.error(f"Erro na atualização do cache: {str(e)}")
+
+    def _live_traffic_busy(self) -> bool:
+        limiter = self.admission_limiter
+        return limiter is not None and limiter.in_flight >= limiter.capacity(BATCH)
+
+    async def refresh_due(self) -> int:
+        """Refresh the entries due in this pass; returns how many were refreshed"""
+        self.last_pass_at = time.time()
+        budget = max(1, int(self.rate * self.interval))
+        keys = self.service.cache.hot_keys(self.min_reads, self.refresh_ahead, prefixes=("cnpj:", "cep:"))
+
+        due = keys[:budget]
+        refreshed = 0
+        for position, key in enumerate(due):
+            if position:
+                # Pace refreshes, but don't hold the pass after the last one
+                await asyncio.sleep(1 / self.rate)
+            if self._live_traffic_busy():
+                self.deferred += len(due) - position
+                break
+            if await self.service.refresh(key):
+                refreshed += 1
+            else:
+                self.failed += 1
+
+        self.refreshed += refreshed
+        if refreshed:
+            self.logger.debug(f"{refreshed} entradas quentes do cache atualizadas")
+        return refreshed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "last_pass_at": self.last_pass_at
+        }
@@ -0,0 +1,82 @@
+import asyncio
+import re
+from typing import Any, Dict, Set, TYPE_CHECKING
+from src.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from src.services.validation_service import AddressValidationService
+
+
+NON_DIGITS = re.compile(r'[^\d]')
+
+
+class CEPPrefetcher:
+    """
+    Speculative lookups of a company's registered CEP.
+
+    When a validation learns the company's CEP and it differs from the one
+    requested, the service submits it here and the address is fetched into
+    the `cep:` cache in the background. A follow-up validation with the
+    corrected CEP is then planned as REUSE and answered without waiting on
+    the CEP providers. At most `max_concurrency` prefetches run at once and
+    at most `max_pending` wait; beyond that, submissions are dropped.
+    """
+
+    def __init__(self, service: "AddressValidationService", max_concurrency: int = 4, max_pending: int = 256):
+        self.service = service
+        self.max_pending = max_pending
+        self.logger = get_logger("CEPPrefetcher")
+        self.submitted = 0
+        self.fetched = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, cep: str) -> bool:
+        """Schedule a prefetch of `cep`; False when dropped, already cached or already queued"""
+        clean_cep = NON_DIGITS.sub('', cep or "")
+        if len(clean_cep) != 8 or clean_cep in self._pending:
+            return False
+        if self.service.cache.expires_in(f"cep:{clean_cep}") is not None:
+            self.skipped += 1
+            return False
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        self.submitted += 1
+        self._pending.add(clean_cep)
+        task = asyncio.ensure_future(self._prefetch(clean_cep))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _prefetch(self, cep: str) -> None:
+        try:
+            async with self._slots:
+                # get_address_data shares the call with any live lookup of the same CEP
+                if await self.service.get_address_data(cep) is not None:
+                    self.fetched += 1
+        except Exception as e:
+            self.failed += 1
+            self.logger.debug(f"Pré-busca do CEP {cep} falhou: {str(e)}")
+        finally:
+            self._pending.discard(cep)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._pending),
+            "submitted": self.submitted,
+            "fetched": self.fetched,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
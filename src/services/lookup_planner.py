@@ -0,0 +1,65 @@
+from enum import Enum
+from typing import Dict, Optional
+from src.models.schemas import CompanyData, AddressData
+from src.utils.validators import cep_to_uf
+
+
+class CEPLookupDecision(str, Enum):
+    FETCH = "fetch"    # call the CEP providers
+    REUSE = "reuse"    # address already cached, no upstream call
+    SKIP = "skip"      # outcome already known from the company data, no upstream call
+    CANCEL = "cancel"  # lookup was in flight when the company data made it unnecessary
+
+
+class CEPLookupPlan:
+    def __init__(
+        self,
+        decision: CEPLookupDecision,
+        address_data: Optional[AddressData] = None,
+        reason: str = ""
+    ):
+        self.decision = decision
+        self.address_data = address_data
+        self.reason = reason
+
+
+class CEPLookupPlanner:
+    """Decides how to resolve the CEP side of a validation from data already in hand"""
+
+    def __init__(self):
+        self.decisions: Dict[CEPLookupDecision, int] = {decision: 0 for decision in CEPLookupDecision}
+
+    def plan(
+        self,
+        cep: str,
+        company_data: Optional[CompanyData],
+        cached_address: Optional[AddressData]
+    ) -> CEPLookupPlan:
+        if cached_address is not None:
+            return CEPLookupPlan(CEPLookupDecision.REUSE, cached_address, "endereço em cache")
+
+        if company_data is not None:
+            # A CEP outside the company's UF range can never pass the state check
+            cep_uf = cep_to_uf(cep)
+            company_uf = (company_data.uf or "").strip().upper()
+            if cep_uf and company_uf and cep_uf != company_uf:
+                return CEPLookupPlan(
+                    CEPLookupDecision.SKIP,
+                    reason=f"CEP pertence a {cep_uf}, empresa está em {company_uf}"
+                )
+
+        return CEPLookupPlan(CEPLookupDecision.FETCH)
+
+    def record(self, decision: CEPLookupDecision) -> None:
+        self.decisions[decision] += 1
+
+    def stats(self) -> Dict[str, object]:
+        total = sum(self.decisions.values())
+        avoided = self.decisions[CEPLookupDecision.REUSE] + self.decisions[CEPLookupDecision.SKIP]
+        return {
+            "total": total,
+            "decisions": {decision.value: count for decision, count in self.decisions.items()},
+            "upstream_calls_avoided": avoided,
+            "upstream_calls_avoided_ratio": round(avoided / total, 4) if total else 0.0,
+            "upstream_calls_cancelled": self.decisions[CEPLookupDecision.CANCEL]
+        }
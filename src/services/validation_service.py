@@ -1,19 +1,58 @@
-from typing import Optional
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union, TYPE_CHECKING
+)
 import re
 import asyncio
-from src.adapters.cnpj_adapters import BrasilAPICNPJAdapter
+from src.config.settings import Settings, get_settings
 from src.strategies.cep_strategy import CEPProviderStrategy
+from src.strategies.cnpj_strategy import CNPJProviderStrategy
 from src.strategies.resilience_simple import retry_simple as retry, SimpleCircuitBreaker as CircuitBreaker, with_simple_circuit_breaker as with_circuit_breaker
-from src.models.schemas import CompanyData, AddressData, ValidationResult
+from src.models.schemas import AddressMatch, CompanyData, AddressData, ValidationResult
+from src.services.cep_prefetcher import CEPPrefetcher
+from src.services.lookup_planner import CEPLookupDecision, CEPLookupPlanner
+from src.utils.cache import ThreadSafeCache
 from src.utils.logging import get_logger
+from src.utils.municipalities import MunicipalityIndex, get_municipality_index
+from src.utils.singleflight import SingleFlight
+from src.utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from src.services.audit_sink import AuditSink
+
+
+NON_DIGITS = re.compile(r'[^\d]')
+NON_WORD = re.compile(r'[^\w\s]')
 
 
 class AddressValidationService:
-    def __init__(self):
-        from src.config.settings import settings
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        cnpj_strategy: Optional[CNPJProviderStrategy] = None,
+        cep_strategy: Optional[CEPProviderStrategy] = None,
+        cache: Optional[ThreadSafeCache] = None,
+        municipalities: Optional[MunicipalityIndex] = None,
+        audit_sink: Optional["AuditSink"] = None
+    ):
+        settings = settings or get_settings()
+        self.settings = settings
         self.logger = get_logger("AddressValidationService")
-        self.cnpj_adapter = BrasilAPICNPJAdapter()
-        self.cep_strategy = CEPProviderStrategy()
+        self.cnpj_strategy = cnpj_strategy or CNPJProviderStrategy(settings=settings)
+        self.cep_strategy = cep_strategy or CEPProviderStrategy(settings=settings)
+        self.cache = cache or ThreadSafeCache(max_size=settings.CACHE_MAX_SIZE, ttl=settings.CACHE_TTL)
+        self.cep_planner = CEPLookupPlanner()
+        self.municipalities = municipalities or get_municipality_index()
+        # Every outcome of validate_customer_address is recorded when set
+        self.audit_sink = audit_sink
+        # Identical upstream lookups in flight at the same time are made only once
+        self.lookups = SingleFlight()
+        self.cep_prefetcher: Optional[CEPPrefetcher] = None
+        if settings.CEP_PREFETCH_ENABLED:
+            self.cep_prefetcher = CEPPrefetcher(
+                self,
+                max_concurrency=settings.CEP_PREFETCH_CONCURRENCY,
+                max_pending=settings.CEP_PREFETCH_MAX_PENDING
+            )
         self.cnpj_circuit_breaker = CircuitBreaker(
             failure_threshold=settings.FAILURE_THRESHOLD, 
             recovery_timeout=settings.RECOVERY_TIMEOUT
@@ -24,32 +63,141 @@ class AddressValidationService:
         )
 
     async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
-        from src.config.settings import settings
-        clean_cnpj = re.sub(r'[^\d]', '', cnpj)
-        return await self.cnpj_adapter.get_company_data(clean_cnpj)
+        clean_cnpj = NON_DIGITS.sub('', cnpj)
+        key = f"cnpj:{clean_cnpj}"
+        with tracer.span("cnpj.lookup") as span:
+            company_data = await self.cache.get(key)
+            span.set_attribute("cache.hit", company_data is not None)
+            if company_data is None:
+                company_data = await self.lookups.do(key, lambda: self._fetch_company_data(clean_cnpj, key))
+            span.set_attribute("found", company_data is not None)
+            return company_data
+
+    async def _fetch_company_data(self, cnpj: str, key: str) -> Optional[CompanyData]:
+        company_data = await self.cnpj_strategy.get_company_data(cnpj)
+        if company_data:
+            await self.cache.set(key, company_data)
+        return company_data
 
     async def get_address_data(self, cep: str) -> Optional[AddressData]:
-        from src.config.settings import settings
-        clean_cep = re.sub(r'[^\d]', '', cep)
-        return await self.cep_strategy.get_address_data(clean_cep)
+        clean_cep = NON_DIGITS.sub('', cep)
+        key = f"cep:{clean_cep}"
+        with tracer.span("cep.lookup") as span:
+            address_data = await self.cache.get(key)
+            span.set_attribute("cache.hit", address_data is not None)
+            if address_data is None:
+                address_data = await self.lookups.do(key, lambda: self._fetch_address_data(clean_cep, key))
+            span.set_attribute("found", address_data is not None)
+            return address_data
+
+    async def _fetch_address_data(self, cep: str, key: str) -> Optional[AddressData]:
+        address_data = await self.cep_strategy.get_address_data(cep)
+        if address_data:
+            await self.cache.set(key, address_data)
+        return address_data
+
+    async def refresh(self, key: str) -> bool:
+        """
+        Re-fetch a cached `cnpj:`/`cep:` entry from the providers, sharing the
+        call with any live lookup of the same key. The cached value is kept
+        when the providers fail or return nothing.
+        """
+        kind, _, value = key.partition(":")
+        fetch = self._fetch_company_data if kind == "cnpj" else self._fetch_address_data
+        with tracer.span("cache.refresh", key=key) as span:
+            try:
+                result = await self.lookups.do(key, lambda: fetch(value, key))
+            except Exception as e:
+                self.logger.warning(f"Falha ao atualizar {key} em segundo plano: {str(e)}")
+                return False
+            span.set_attribute("found", result is not None)
+            return result is not None
+
+    async def _resolve_lookups(
+        self, cnpj: str, cep: str
+    ) -> Tuple[Optional[CompanyData], Optional[AddressData], CEPLookupDecision]:
+        """Fetch company and address data, calling the CEP providers only when needed"""
+        company_data = await self.cache.get(f"cnpj:{cnpj}")
+        plan = self.cep_planner.plan(cep, company_data, await self.cache.get(f"cep:{cep}"))
+
+        if plan.decision == CEPLookupDecision.REUSE:
+            if company_data is None:
+                company_data = await self.get_company_data(cnpj)
+            return company_data, plan.address_data, plan.decision
+
+        if company_data is not None:
+            self._prefetch_company_cep(company_data, cep)
+            if plan.decision == CEPLookupDecision.SKIP:
+                self.logger.info(f"Consulta CEP evitada: {plan.reason}")
+                return company_data, None, plan.decision
+            return company_data, await self.get_address_data(cep), plan.decision
+
+        # Executar consultas em PARALELO, reavaliando o CEP assim que o CNPJ chegar
+        company_task = asyncio.ensure_future(self.get_company_data(cnpj))
+        address_task = asyncio.ensure_future(self.get_address_data(cep))
+        decision = CEPLookupDecision.FETCH
+
+        done, _ = await asyncio.wait({company_task, address_task}, return_when=asyncio.FIRST_COMPLETED)
+        if company_task in done and not address_task.done() and company_task.exception() is None:
+            replan = self.cep_planner.plan(cep, company_task.result(), None)
+            if replan.decision == CEPLookupDecision.SKIP:
+                self.logger.info(f"Consulta CEP cancelada: {replan.reason}")
+                address_task.cancel()
+                decision = CEPLookupDecision.CANCEL
+
+        company_data, address_data = await asyncio.gather(
+            company_task,
+            address_task,
+            return_exceptions=True
+        )
+
+        # Tratar exceções se houver
+        if isinstance(company_data, BaseException):
+            self.logger.error(f"Erro na consulta CNPJ: {str(company_data)}")
+            company_data = None
+        else:
+            # The one prefetch on this path, whichever lookup finished first
+            self._prefetch_company_cep(company_data, cep)
+
+        if isinstance(address_data, BaseException):
+            if decision != CEPLookupDecision.CANCEL:
+                self.logger.error(f"Erro na consulta CEP: {str(address_data)}")
+            address_data = None
+
+        return company_data, address_data, decision
+
+    def _prefetch_company_cep(self, company_data: Optional[CompanyData], cep: str) -> None:
+        """Warm the cache with the company's registered CEP when the request used another one"""
+        if self.cep_prefetcher is None or company_data is None or not company_data.cep:
+            return
+        company_cep = NON_DIGITS.sub('', company_data.cep)
+        if company_cep != cep:
+            self.cep_prefetcher.submit(company_cep)
 
     def _normalize_string(self, text: str) -> str:
         if not text:
             return ""
-        return re.sub(r'[^\w\s]', '', text.upper().strip())
+        return NON_WORD.sub('', text.upper().strip())
 
     def _validate_address_match(self, company_data: CompanyData, address_data: AddressData) -> bool:
-        company_state = self._normalize_string(company_data.uf)
-        address_state = self._normalize_string(address_data.state)
-        
-        company_city = self._normalize_string(company_data.municipio)
-        address_city = self._normalize_string(address_data.city)
-        
+        match = self._match_address(company_data, address_data)
+        return match.state and match.city and match.street
+
+    def _match_address(self, company_data: CompanyData, address_data: AddressData) -> AddressMatch:
         company_street = self._normalize_string(company_data.logradouro)
         address_street = self._normalize_string(address_data.street or "")
         
-        state_match = company_state == address_state
-        city_match = company_city == address_city
+        # O código IBGE identifica município e UF; nomes fora do índice caem
+        # na comparação textual
+        company_city = self.municipalities.lookup(company_data.uf, company_data.municipio)
+        address_city = self.municipalities.lookup(address_data.state, address_data.city)
+        if company_city is not None and address_city is not None:
+            city_match = company_city == address_city
+            # The first two digits of the IBGE code identify the UF
+            state_match = company_city // 100000 == address_city // 100000
+        else:
+            state_match = self._normalize_string(company_data.uf) == self._normalize_string(address_data.state)
+            city_match = self._normalize_string(company_data.municipio) == self._normalize_string(address_data.city)
         
         street_match = False
         if company_street and address_street:
@@ -58,30 +206,27 @@ class AddressValidationService:
                 address_street in company_street
             )
         
-        return state_match and city_match and street_match
+        return AddressMatch(state=state_match, city=city_match, street=street_match)
 
     async def validate_customer_address(self, cnpj: str, cep: str) -> ValidationResult:
+        with tracer.span("validate_customer_address", cnpj=cnpj, cep=cep) as span:
+            result = await self._validate_customer_address(cnpj, cep)
+            span.set_attribute("valid", result.valid)
+            span.set_attribute("message", result.message)
+        if self.audit_sink is not None:
+            await self.audit_sink.record(cnpj, cep, result)
+        return result
+
+    async def _validate_customer_address(self, cnpj: str, cep: str) -> ValidationResult:
         self.logger.info(f"Iniciando validação para CNPJ: {cnpj}, CEP: {cep}")
         
         try:
-            # Executar consultas em PARALELO
-            company_task = self.get_company_data(cnpj)
-            address_task = self.get_address_data(cep)
-            
-            company_data, address_data = await asyncio.gather(
-                company_task, 
-                address_task,
-                return_exceptions=True
+            company_data, address_data, decision = await self._resolve_lookups(
+                NON_DIGITS.sub('', cnpj),
+                NON_DIGITS.sub('', cep)
             )
-            
-            # Tratar exceções se houver
-            if isinstance(company_data, Exception):
-                self.logger.error(f"Erro na consulta CNPJ: {str(company_data)}")
-                company_data = None
-            
-            if isinstance(address_data, Exception):
-                self.logger.error(f"Erro na consulta CEP: {str(address_data)}")
-                address_data = None
+            self.cep_planner.record(decision)
+            tracer.current_span().set_attribute("cep.decision", decision.value)
             
             # Validar resultados
             if not company_data:
@@ -93,6 +238,15 @@ class AddressValidationService:
                     address_data=None
                 )
 
+            if decision in (CEPLookupDecision.SKIP, CEPLookupDecision.CANCEL):
+                self.logger.info("Endereço não corresponde ao da empresa")
+                return ValidationResult(
+                    valid=False,
+                    message="Endereço não corresponde ao da empresa",
+                    company_data=company_data,
+                    address_data=None
+                )
+
             if not address_data:
                 self.logger.warning(f"Endereço não encontrado para CEP: {cep}")
                 return ValidationResult(
@@ -102,15 +256,16 @@ class AddressValidationService:
                     address_data=None
                 )
 
-            is_valid = self._validate_address_match(company_data, address_data)
+            match = self._match_address(company_data, address_data)
             
-            if is_valid:
+            if match.state and match.city and match.street:
                 self.logger.info("Validação de endereço bem-sucedida")
                 return ValidationResult(
                     valid=True,
                     message="Endereço validado com sucesso",
                     company_data=company_data,
-                    address_data=address_data
+                    address_data=address_data,
+                    match=match
                 )
             else:
                 self.logger.info("Endereço não corresponde ao da empresa")
@@ -118,7 +273,8 @@ class AddressValidationService:
                     valid=False,
                     message="Endereço não corresponde ao da empresa",
                     company_data=company_data,
-                    address_data=address_data
+                    address_data=address_data,
+                    match=match
                 )
                 
         except Exception as e:
@@ -128,4 +284,94 @@ class AddressValidationService:
                 message=f"Erro na validação: {str(e)}",
                 company_data=None,
                 address_data=None
-            )
\ No newline at end of file
+            )
+
+    async def validate_many(
+        self,
+        items: Union[AsyncIterable[Any], Iterable[Any]],
+        ordered: bool = False,
+        max_in_flight: int = 32,
+        with_input: bool = False,
+        validate: Optional[Callable[[str, str], Awaitable[ValidationResult]]] = None
+    ) -> AsyncIterator[Union[ValidationResult, Tuple[Any, ValidationResult]]]:
+        """
+        Validate a stream of (cnpj, cep) pairs, yielding results as they complete.
+
+        Items are tuples or objects with `cnpj` and `cep` attributes (e.g.
+        ValidationRequest). At most `max_in_flight` items are being validated
+        or waiting to be yielded at any time; the next item is only pulled
+        from `items` when there is room, so a slow consumer slows the
+        producer down. With `ordered=True` results follow the input order.
+        Lookups are shared across items through the service cache and
+        in-flight deduplication. With `with_input=True` each result is
+        yielded as an `(item, result)` pair. `validate` replaces
+        `validate_customer_address` per item (e.g. to go through a result
+        cache).
+        """
+        validate = validate or self.validate_customer_address
+        iterator = _aiter(items)
+        pending: Dict[asyncio.Future, Tuple[int, Any]] = {}
+        completed: Dict[int, Tuple[Any, ValidationResult]] = {}
+        next_item: Optional[asyncio.Future] = None
+        exhausted = False
+        submitted = 0
+        next_to_yield = 0
+
+        try:
+            while True:
+                if next_item is None and not exhausted and len(pending) + len(completed) < max_in_flight:
+                    next_item = asyncio.ensure_future(iterator.__anext__())
+
+                waiting = set(pending)
+                if next_item is not None:
+                    waiting.add(next_item)
+                if not waiting:
+                    break
+
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if next_item in done:
+                    try:
+                        item = next_item.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        cnpj, cep = _as_pair(item)
+                        task = asyncio.ensure_future(validate(cnpj, cep))
+                        pending[task] = (submitted, item)
+                        submitted += 1
+                    next_item = None
+
+                for task in done:
+                    if task not in pending:
+                        continue
+                    index, item = pending.pop(task)
+                    if not ordered:
+                        yield (item, task.result()) if with_input else task.result()
+                        continue
+                    completed[index] = (item, task.result())
+
+                while next_to_yield in completed:
+                    item, result = completed.pop(next_to_yield)
+                    next_to_yield += 1
+                    yield (item, result) if with_input else result
+        finally:
+            for task in list(pending) + ([next_item] if next_item is not None else []):
+                task.cancel()
+
+
+def _as_pair(item: Any) -> Tuple[str, str]:
+    if isinstance(item, (tuple, list)):
+        return item[0], item[1]
+    return item.cnpj, item.cep
+
+
+async def _iterate(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+def _aiter(items: Union[AsyncIterable[Any], Iterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, "__aiter__"):
+        return items.__aiter__()
+    return _iterate(items)
@@ -1,34 +1,67 @@
+import time
 from typing import List, Optional
 from src.adapters.interfaces import CEPAdapterInterface
 from src.adapters.cep_adapters import BrasilAPICEPAdapter, ViaCEPAdapter
+from src.config.settings import Settings, get_settings
 from src.models.schemas import AddressData
+from src.utils.logging import get_logger
+from src.utils.provider_stats import provider_stats
+from src.utils.tracing import SPAN_KIND_CLIENT, STATUS_OK, tracer
 
 
 class CEPProviderStrategy:
-    def __init__(self, max_retries: Optional[int] = None):
-        from src.config.settings import settings
+    def __init__(self, max_retries: Optional[int] = None, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.logger = get_logger("CEPProviderStrategy")
         self.providers: List[CEPAdapterInterface] = [
-            BrasilAPICEPAdapter(),
-            ViaCEPAdapter()
+            BrasilAPICEPAdapter(settings=settings),
+            ViaCEPAdapter(settings=settings)
         ]
         self.max_retries = max_retries or settings.CEP_MAX_RETRIES
 
     async def get_address_data(self, cep: str) -> Optional[AddressData]:
+        started = time.perf_counter()
+        attempts = 0
         for provider_index, provider in enumerate(self.providers):
-            for attempt in range(self.max_retries):
-                try:
-                    result = await provider.get_address_data(cep)
-                    if result:
-                        return result
-                except Exception:
-                    if attempt == self.max_retries - 1:
-                        break
-                    continue
-            
+            provider_name = type(provider).__name__
+            with tracer.span("cep.provider", provider=provider_name, fallback=provider_index > 0) as provider_span:
+                for attempt in range(self.max_retries):
+                    with tracer.span(
+                        "cep.attempt", SPAN_KIND_CLIENT, provider=provider_name, attempt=attempt + 1
+                    ) as attempt_span:
+                        attempts += 1
+                        attempt_started = time.perf_counter()
+                        try:
+                            result = await provider.get_address_data(cep)
+                        except Exception as e:
+                            provider_stats.record("cep.attempt", provider_name, "error", time.perf_counter() - attempt_started)
+                            attempt_span.record_exception(e)
+                            self.logger.debug(f"{provider_name} falhou (tentativa {attempt + 1}): {str(e)}")
+                            if attempt == self.max_retries - 1:
+                                break
+                            continue
+
+                        outcome = "found" if result else "empty"
+                        provider_stats.record("cep.attempt", provider_name, outcome, time.perf_counter() - attempt_started)
+                        attempt_span.set_attribute("outcome", outcome)
+                        if result:
+                            provider_span.set_attribute("attempts", attempt + 1)
+                            provider_span.set_status(STATUS_OK)
+                            path = "fallback" if provider_index else ("retried" if attempts > 1 else "first_try")
+                            provider_stats.record(
+                                "cep.lookup", provider_name, path, time.perf_counter() - started, retries=attempts - 1
+                            )
+                            return result
+
+                provider_span.set_attribute("attempts", self.max_retries)
+                provider_span.set_attribute("outcome", "exhausted")
+
             if provider_index < len(self.providers) - 1:
+                self.logger.debug(f"Fallback de {provider_name} para o próximo provedor CEP")
                 continue
-                
+
+        provider_stats.record("cep.lookup", "none", "exhausted", time.perf_counter() - started, retries=attempts - 1)
         return None
 
     def set_providers(self, providers: List[CEPAdapterInterface]):
-        self.providers = providers
\ No newline at end of file
+        self.providers = providers
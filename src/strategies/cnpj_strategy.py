@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+from src.adapters.interfaces import CNPJAdapterInterface
+from src.adapters.cnpj_adapters import BrasilAPICNPJAdapter, ReceitaWSCNPJAdapter
+from src.adapters.cnpj_snapshot import SnapshotCNPJAdapter
+from src.config.settings import Settings, get_settings
+from src.models.schemas import CompanyData
+from src.utils.logging import get_logger
+from src.utils.provider_stats import provider_stats
+from src.utils.tracing import SPAN_KIND_CLIENT, tracer
+
+
+CNPJ_PROVIDER_FACTORIES: Dict[str, Callable[[Settings], CNPJAdapterInterface]] = {
+    "brasilapi": lambda settings: BrasilAPICNPJAdapter(settings=settings),
+    "receitaws": lambda settings: ReceitaWSCNPJAdapter(settings=settings),
+    "snapshot": lambda settings: SnapshotCNPJAdapter(settings=settings),
+}
+
+
+class CNPJProviderStrategy(CNPJAdapterInterface):
+    """
+    Hedged CNPJ provider chain.
+
+    Providers are tried in order. If the current provider has not answered
+    after `hedge_delay` seconds (or answered with nothing), the next one is
+    started without cancelling the previous; the first non-empty result wins
+    and the remaining in-flight lookups are cancelled.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[List[CNPJAdapterInterface]] = None,
+        hedge_delay: Optional[float] = None,
+        settings: Optional[Settings] = None
+    ):
+        settings = settings or get_settings()
+        self.logger = get_logger("CNPJProviderStrategy")
+        self.providers: List[CNPJAdapterInterface] = providers or [
+            CNPJ_PROVIDER_FACTORIES[name](settings) for name in settings.CNPJ_PROVIDERS
+        ]
+        self.hedge_delay = settings.CNPJ_HEDGE_DELAY if hedge_delay is None else hedge_delay
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        started = time.perf_counter()
+        remaining = iter(self.providers)
+        pending = set()
+        names: Dict[asyncio.Future, str] = {}
+
+        def launch_next() -> bool:
+            provider = next(remaining, None)
+            if provider is None:
+                return False
+            task = asyncio.ensure_future(self._call_provider(provider, cnpj, hedged=bool(pending)))
+            names[task] = type(provider).__name__
+            pending.add(task)
+            return True
+
+        def record_lookup(winner: str) -> None:
+            mode = "hedged" if len(names) > 1 else "direct"
+            provider_stats.record("cnpj.lookup", winner, mode, time.perf_counter() - started)
+
+        has_more = launch_next()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if has_more else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    self.logger.debug(f"Hedging CNPJ lookup after {self.hedge_delay}s")
+                    has_more = launch_next()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is not None:
+                        self.logger.warning(f"Provedor CNPJ falhou: {task.exception()}")
+                        continue
+                    if task.result():
+                        record_lookup(names[task])
+                        return task.result()
+
+                # Every provider that answered came back empty: fail over immediately
+                has_more = has_more and launch_next()
+
+            record_lookup("none")
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call_provider(self, provider: CNPJAdapterInterface, cnpj: str, hedged: bool) -> Optional[CompanyData]:
+        provider_name = type(provider).__name__
+        started = time.perf_counter()
+        with tracer.span("cnpj.provider", SPAN_KIND_CLIENT, provider=provider_name, hedged=hedged) as span:
+            try:
+                result = await provider.get_company_data(cnpj)
+            except asyncio.CancelledError:
+                # Lost the hedge race (or the caller gave up)
+                provider_stats.record("cnpj.provider", provider_name, "cancelled", time.perf_counter() - started)
+                raise
+            except Exception:
+                provider_stats.record("cnpj.provider", provider_name, "error", time.perf_counter() - started)
+                raise
+            outcome = "found" if result else "empty"
+            provider_stats.record("cnpj.provider", provider_name, outcome, time.perf_counter() - started)
+            span.set_attribute("outcome", outcome)
+            return result
+
+    def set_providers(self, providers: List[CNPJAdapterInterface]):
+        self.providers = providers
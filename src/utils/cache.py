@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+
+class ThreadSafeCache:
+    """
+    In-memory LRU cache with per-entry TTL.
+
+    Each entry also counts the reads it served since it was stored, so
+    background refreshers can find the hot entries about to expire.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> [expires_at, value, reads since stored]
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+        # Critical sections never await, so a plain lock is enough and is
+        # also safe when the cache is shared with worker threads.
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            entry[2] += 1
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = [expires_at, value, 0]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires, or None when it is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(0.0, entry[0] - time.monotonic())
+
+    def hot_keys(self, min_reads: int, expiring_within: float, prefixes: tuple = ("",)) -> List[str]:
+        """
+        Live keys starting with one of `prefixes`, read at least `min_reads`
+        times since stored and expiring within `expiring_within` seconds,
+        soonest first.
+        """
+        now = time.monotonic()
+        deadline = now + expiring_within
+        with self._lock:
+            due = [
+                (entry[0], key) for key, entry in self._entries.items()
+                if entry[2] >= min_reads and now < entry[0] <= deadline and key.startswith(prefixes)
+            ]
+        return [key for _, key in sorted(due)]
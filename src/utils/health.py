@@ -1,18 +1,42 @@
 import asyncio
+import time
 import httpx
-from typing import Dict, Any
-from src.config.settings import settings
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from src.config.settings import Settings, get_settings
 
+if TYPE_CHECKING:
+    from src.middleware.admission import AdaptiveConcurrencyLimiter
+    from src.services.validation_service import AddressValidationService
+    from src.middleware.response_cache import ValidationResponseCache
+    from src.services.cache_refresher import CacheRefresher
+    from src.utils.loop_monitor import EventLoopMonitor
+
+# Seconds after the last dropped audit entry during which /health reports degraded
+AUDIT_DROP_WINDOW = 60.0
 
 class HealthChecker:
-    def __init__(self):
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        validation_service: Optional["AddressValidationService"] = None,
+        loop_monitor: Optional["EventLoopMonitor"] = None,
+        response_cache: Optional["ValidationResponseCache"] = None,
+        admission_limiter: Optional["AdaptiveConcurrencyLimiter"] = None,
+        cache_refresher: Optional["CacheRefresher"] = None
+    ):
+        self.settings = settings or get_settings()
+        self.validation_service = validation_service
+        self.loop_monitor = loop_monitor
+        self.response_cache = response_cache
+        self.admission_limiter = admission_limiter
+        self.cache_refresher = cache_refresher
         self.timeout = 5.0  # Health check timeout
     
     async def check_brasilapi(self) -> Dict[str, Any]:
         """Check BrasilAPI health"""
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{settings.BRASILAPI_BASE_URL}/api/cnpj/v1/00000000000000")
+                response = await client.get(f"{self.settings.BRASILAPI_BASE_URL}/api/cnpj/v1/00000000000000")
                 return {
                     "status": "healthy" if response.status_code in [200, 404] else "unhealthy",
                     "response_time_ms": response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else None,
@@ -28,7 +52,7 @@ class HealthChecker:
         """Check ViaCEP health"""
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{settings.VIACEP_BASE_URL}/ws/00000000/json/")
+                response = await client.get(f"{self.settings.VIACEP_BASE_URL}/ws/00000000/json/")
                 return {
                     "status": "healthy" if response.status_code in [200, 400] else "unhealthy",
                     "response_time_ms": response.elapsed.total_seconds() * 1000 if hasattr(response, 'elapsed') else None,
@@ -43,13 +67,18 @@ class HealthChecker:
     async def check_cache(self) -> Dict[str, Any]:
         """Check cache functionality"""
         try:
-            from src.utils.cache import cache
-            cache_size = cache.size()
-            
+            service = self.validation_service
+            if service is None:
+                return {"status": "unknown", "message": "Validation service not attached"}
+
             return {
                 "status": "healthy",
-                "cache_size": cache_size,
-                "max_size": cache.max_size
+                "cache_size": service.cache.size(),
+                "max_size": service.cache.max_size,
+                "cep_lookups": service.cep_planner.stats(),
+                "responses": self.response_cache.stats() if self.response_cache else None,
+                "refresh": self.cache_refresher.stats() if self.cache_refresher else None,
+                "prefetch": service.cep_prefetcher.stats() if service.cep_prefetcher else None
             }
         except Exception as e:
             return {
@@ -60,9 +89,10 @@ class HealthChecker:
     async def check_circuit_breakers(self) -> Dict[str, Any]:
         """Check circuit breaker states"""
         try:
-            from src.services.validation_service import AddressValidationService
-            service = AddressValidationService()
-            
+            service = self.validation_service
+            if service is None:
+                return {"status": "unknown", "message": "Validation service not attached"}
+
             return {
                 "status": "healthy",
                 "cnpj_circuit_breaker": {
@@ -82,6 +112,36 @@ class HealthChecker:
                 "error": str(e)
             }
     
+    async def check_event_loop(self) -> Dict[str, Any]:
+        """Report event loop lag percentiles and slow callbacks"""
+        if self.loop_monitor is None or not self.loop_monitor.running:
+            return {"status": "unknown", "message": "Event loop monitor not running"}
+
+        stats = self.loop_monitor.stats()
+        p99 = stats["lag_ms"]["p99"]
+        return {
+            "status": "healthy",
+            "lagging": p99 is not None and p99 > self.loop_monitor.slow_callback_threshold * 1000,
+            "lag_ms": stats["lag_ms"],
+            "samples": stats["samples"],
+            "slow_callbacks": stats["slow_callbacks"]
+        }
+    
+    async def check_admission(self) -> Dict[str, Any]:
+        """Report the adaptive concurrency limit and shed counts"""
+        if self.admission_limiter is None:
+            return {"status": "unknown", "message": "Admission control disabled"}
+        return {"status": "healthy", **self.admission_limiter.stats()}
+    
+    async def check_audit(self) -> Dict[str, Any]:
+        """Report the audit log writer; recently dropped entries degrade the service"""
+        audit_sink = self.validation_service.audit_sink if self.validation_service else None
+        if audit_sink is None:
+            return {"status": "unknown", "message": "Audit log disabled"}
+        stats = audit_sink.stats()
+        dropping = stats["last_dropped_at"] is not None and time.time() - stats["last_dropped_at"] < AUDIT_DROP_WINDOW
+        return {"status": "healthy" if stats["running"] and not dropping else "unhealthy", "dropping": dropping, **stats}
+    
     async def comprehensive_health_check(self) -> Dict[str, Any]:
         """Run all health checks"""
         checks = {
@@ -89,7 +149,10 @@ class HealthChecker:
             "brasilapi": await self.check_brasilapi(),
             "viacep": await self.check_viacep(),
             "cache": await self.check_cache(),
-            "circuit_breakers": await self.check_circuit_breakers()
+            "circuit_breakers": await self.check_circuit_breakers(),
+            "event_loop": await self.check_event_loop(),
+            "admission": await self.check_admission(),
+            "audit": await self.check_audit()
         }
         
         # Determine overall health
@@ -108,7 +171,4 @@ class HealthChecker:
             "timestamp": asyncio.get_event_loop().time(),
             "checks": checks,
             "unhealthy_services": unhealthy_services
-        }
-
-
-health_checker = HealthChecker()
\ No newline at end of file
+        }
\ No newline at end of file
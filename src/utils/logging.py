@@ -1,19 +1,18 @@
 import logging
 import sys
 from typing import Optional
-from src.config.settings import settings
 
 
-def setup_logging() -> logging.Logger:
+def setup_logging(level: str = "INFO") -> logging.Logger:
     logger = logging.getLogger("address_validation")
     
     if logger.handlers:
         return logger
     
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+    logger.setLevel(getattr(logging, level))
     
     handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, settings.LOG_LEVEL))
+    handler.setLevel(getattr(logging, level))
     
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -0,0 +1,146 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+from src.utils.logging import get_logger
+
+
+class EventLoopMonitor:
+    """
+    Continuous event-loop lag measurement and slow-callback detection.
+
+    A heartbeat task sleeps for `interval` seconds and records how late it
+    wakes up. A watchdog thread checks the heartbeat; when the loop has not
+    ticked for longer than `slow_callback_threshold` it captures the stack of
+    the loop thread, i.e. the code that is blocking it.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        slow_callback_threshold: float = 0.1,
+        window: int = 1024,
+        max_reports: int = 20
+    ):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.logger = get_logger("EventLoopMonitor")
+        self.lag_samples: Deque[float] = deque(maxlen=window)
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self.slow_callback_count = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _measure_lag(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lag_samples.append(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        stall_limit = self.interval + self.slow_callback_threshold
+        while not self._stopped.wait(self.slow_callback_threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat
+            if stalled_for < stall_limit or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame else []
+            self.slow_callback_count += 1
+            self.slow_callbacks.append({
+                "detected_at": time.time(),
+                "blocked_ms": round(stalled_for * 1000, 1),
+                "stack": stack
+            })
+            self.logger.warning(
+                f"Event loop bloqueado há {stalled_for * 1000:.0f}ms:\n{''.join(stack[-8:])}"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self.lag_samples)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 3)
+
+        return {
+            "running": self.running,
+            "samples": len(samples),
+            "lag_ms": {
+                "p50": percentile(0.50),
+                "p90": percentile(0.90),
+                "p99": percentile(0.99),
+                "max": round(samples[-1] * 1000, 3) if samples else None
+            },
+            "slow_callbacks": self.slow_callback_count,
+            "recent_slow_callbacks": [
+                {**report, "stack": report["stack"][-8:]} for report in self.slow_callbacks
+            ]
+        }
+
+    def profile(self, seconds: float, sample_interval: float = 0.005, all_threads: bool = False) -> str:
+        """
+        Sample stacks for `seconds` and return them in collapsed
+        ("folded") format, ready for flamegraph.pl or speedscope.
+
+        Blocking: call it through `asyncio.to_thread` from async code.
+        """
+        stacks: Counter = Counter()
+        current_thread = threading.get_ident()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == current_thread:
+                    continue
+                if not all_threads and thread_id != self._loop_thread_id:
+                    continue
+                stacks[_fold(frame)] += 1
+            time.sleep(sample_interval)
+
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+def _fold(frame) -> str:
+    frames: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
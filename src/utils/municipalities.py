@@ -0,0 +1,185 @@
+"""
+Canonical IBGE codes for Brazilian municipality names.
+
+CNPJ and CEP providers spell municipalities differently: with or without
+accents, "D'OESTE" / "D OESTE" / "DOESTE", "MOGI-GUACU" / "MOGI GUACU",
+or an older official name ("EMBU" for Embu das Artes). The bundled index
+(`src/data/municipios_ibge.tsv`) maps the canonical key of every known
+spelling of each municipality to its 7-digit IBGE code, so comparing two
+names becomes comparing two integers. Each line holds a code followed by
+its keys, the official name first:
+
+    3515004\tEMBUDASARTES\tEMBU
+
+The first two digits of the code identify the UF, so the file needs no
+state column. Regenerate it from IBGE's municipality list (the
+`/api/v1/localidades/municipios` JSON) or a `{UF: {name: code}}` JSON:
+
+    python -m src.utils.municipalities build --source municipios.json
+"""
+import argparse
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "municipios_ibge.tsv"
+
+UF_BY_IBGE_PREFIX = {
+    "11": "RO", "12": "AC", "13": "AM", "14": "RR", "15": "PA", "16": "AP", "17": "TO",
+    "21": "MA", "22": "PI", "23": "CE", "24": "RN", "25": "PB", "26": "PE", "27": "AL",
+    "28": "SE", "29": "BA", "31": "MG", "32": "ES", "33": "RJ", "35": "SP", "41": "PR",
+    "42": "SC", "43": "RS", "50": "MS", "51": "MT", "52": "GO", "53": "DF",
+}
+
+# Abbreviations found in registry data, expanded before building the key
+ABBREVIATIONS = {"STA": "SANTA", "STO": "SANTO"}
+
+# Former official names and spellings still returned by the providers,
+# as (UF, variant, current name)
+ALIASES: Tuple[Tuple[str, str, str], ...] = (
+    ("BA", "MUQUEM DE SAO FRANCISCO", "MUQUEM DO SAO FRANCISCO"),
+    ("CE", "ITAPAGE", "ITAPAJE"),
+    ("GO", "BOM JESUS", "BOM JESUS DE GOIAS"),
+    ("MA", "PINDARE MIRIM", "PINDARE-MIRIM"),
+    ("MG", "BRASOPOLIS", "BRAZOPOLIS"),
+    ("MG", "DONA EUSEBIA", "DONA EUZEBIA"),
+    ("MG", "SAO JOAO DEL REY", "SAO JOAO DEL REI"),
+    ("MS", "BATAIPORA", "BATAYPORA"),
+    ("MT", "POXOREO", "POXOREU"),
+    ("PA", "SANTA ISABEL DO PARA", "SANTA IZABEL DO PARA"),
+    ("PB", "SANTAREM", "JOCA CLAUDINO"),
+    ("PE", "BELEM DE SAO FRANCISCO", "BELEM DO SAO FRANCISCO"),
+    ("PE", "LAGOA DO ITAENGA", "LAGOA DE ITAENGA"),
+    ("RJ", "ARMACAO DE BUZIOS", "ARMACAO DOS BUZIOS"),
+    ("RJ", "PARATI", "PARATY"),
+    ("RJ", "TRAJANO DE MORAIS", "TRAJANO DE MORAES"),
+    ("RN", "BOA SAUDE", "JANUARIO CICCO"),
+    ("RN", "PRESIDENTE JUSCELINO", "SERRA CAIADA"),
+    ("RS", "CHIAPETA", "CHIAPETTA"),
+    ("SC", "LAGEADO GRANDE", "LAJEADO GRANDE"),
+    ("SC", "PRESIDENTE CASTELO BRANCO", "PRESIDENTE CASTELLO BRANCO"),
+    ("SE", "AMPARO DE SAO FRANCISCO", "AMPARO DO SAO FRANCISCO"),
+    ("SP", "EMBU", "EMBU DAS ARTES"),
+    ("SP", "FLORINIA", "FLORINEA"),
+    ("SP", "MOJI DAS CRUZES", "MOGI DAS CRUZES"),
+    ("SP", "MOJI GUACU", "MOGI GUACU"),
+    ("SP", "MOJI MIRIM", "MOGI MIRIM"),
+    ("SP", "SAO LUIS DO PARAITINGA", "SAO LUIZ DO PARAITINGA"),
+    ("TO", "COUTO DE MAGALHAES", "COUTO MAGALHAES"),
+    ("TO", "SAO VALERIO DA NATIVIDADE", "SAO VALERIO"),
+    ("TO", "SAO VALERIO DO TOCANTINS", "SAO VALERIO"),
+)
+
+NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+
+
+@lru_cache(maxsize=8192)
+def municipality_key(name: str) -> str:
+    """Spelling-insensitive key: no accents, punctuation or spaces, abbreviations expanded"""
+    decomposed = unicodedata.normalize("NFKD", name.upper())
+    ascii_name = decomposed.encode("ascii", "ignore").decode("ascii")
+    return "".join(ABBREVIATIONS.get(word, word) for word in NON_ALNUM.split(ascii_name))
+
+
+class MunicipalityIndex:
+    """
+    Read-only `(UF, name) -> IBGE code` index, loaded on the first lookup.
+
+    Keys are stored as `UF + municipality_key(name)` strings in one dict;
+    about 5.6k municipalities plus their variants take well under 1 MB.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self._codes: Optional[Dict[str, int]] = None
+
+    def _load(self) -> Dict[str, int]:
+        codes: Dict[str, int] = {}
+        with open(self.path, encoding="ascii") as handle:
+            for line in handle:
+                code, *keys = line.rstrip("\n").split("\t")
+                uf = UF_BY_IBGE_PREFIX[code[:2]]
+                for key in keys:
+                    codes[uf + key] = int(code)
+        self._codes = codes
+        return codes
+
+    def lookup(self, uf: str, name: str) -> Optional[int]:
+        """IBGE code of municipality `name` in `uf`, or None when unknown"""
+        if not uf or not name:
+            return None
+        codes = self._codes if self._codes is not None else self._load()
+        return codes.get(uf.strip().upper() + municipality_key(name))
+
+    def __len__(self) -> int:
+        codes = self._codes if self._codes is not None else self._load()
+        return len(set(codes.values()))
+
+
+@lru_cache()
+def get_municipality_index() -> MunicipalityIndex:
+    return MunicipalityIndex()
+
+
+def _read_source(source: str) -> Iterable[Tuple[str, str]]:
+    """(IBGE code, name) pairs from an IBGE API dump or a `{UF: {name: code}}` JSON"""
+    with open(source, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if isinstance(data, list):
+        return [(str(item["id"]), item["nome"]) for item in data]
+    return [(str(code), name) for names in data.values() for name, code in names.items()]
+
+
+def build_index(source: str, output: Path = INDEX_PATH) -> Dict[str, int]:
+    keys: Dict[str, List[str]] = {}
+    seen: Dict[str, str] = {}
+    for code, name in sorted(_read_source(source)):
+        key = municipality_key(name)
+        uf_key = UF_BY_IBGE_PREFIX[code[:2]] + key
+        if uf_key in seen:
+            raise ValueError(f"{name} ({code}) colide com o município {seen[uf_key]}")
+        seen[uf_key] = code
+        keys[code] = [key]
+
+    aliases = 0
+    for uf, variant, name in ALIASES:
+        code = seen.get(uf + municipality_key(name))
+        if code is None:
+            raise ValueError(f"Município {name}/{uf} não encontrado na fonte")
+        if uf + municipality_key(variant) not in seen:
+            seen[uf + municipality_key(variant)] = code
+            keys[code].append(municipality_key(variant))
+            aliases += 1
+
+    with open(output, "w", encoding="ascii") as handle:
+        for code, code_keys in keys.items():
+            handle.write("\t".join([code, *code_keys]) + "\n")
+    return {"municipalities": len(keys), "aliases": aliases}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IBGE municipality index tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build the index from an IBGE municipality list")
+    build.add_argument("--source", required=True)
+    build.add_argument("--output", default=str(INDEX_PATH))
+
+    lookup = commands.add_parser("lookup", help="Look up a municipality")
+    lookup.add_argument("uf")
+    lookup.add_argument("name")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        print(json.dumps(build_index(args.source, Path(args.output))))
+    else:
+        code = get_municipality_index().lookup(args.uf, args.name)
+        print(code if code is not None else f"{args.name}/{args.uf}: não encontrado")
+
+
+if __name__ == "__main__":
+    main()
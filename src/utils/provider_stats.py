@@ -0,0 +1,247 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Log-linear buckets: 2**SUB_BUCKET_BITS buckets per power of two of
+# microseconds, so quantiles are exact to within ~3% relative error
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS >> 1
+MAX_MICROSECONDS = (1 << 36) - 1  # ~19h; larger values are clamped
+
+# (window name, span in seconds, number of slots)
+WINDOWS = (("1m", 60, 12), ("5m", 300, 10), ("1h", 3600, 12))
+QUANTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99))
+
+
+def bucket_index(microseconds: int) -> int:
+    if microseconds < SUB_BUCKETS:
+        return microseconds
+    shift = microseconds.bit_length() - SUB_BUCKET_BITS
+    return shift * HALF_SUB_BUCKETS + (microseconds >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """[lower, upper) in microseconds of the values counted in bucket `index`"""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // HALF_SUB_BUCKETS - 1
+    sub_bucket = index - shift * HALF_SUB_BUCKETS
+    return sub_bucket << shift, (sub_bucket + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies.
+
+    Buckets are sparse, and their number is bounded by the value range
+    (~500 for 1µs..19h), so memory stays constant however many values are
+    recorded.
+    """
+
+    __slots__ = ("counts", "count", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0
+
+    def record(self, seconds: float) -> None:
+        microseconds = min(MAX_MICROSECONDS, max(0, int(seconds * 1_000_000)))
+        index = bucket_index(microseconds)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if microseconds > self.max:
+            self.max = microseconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Value at `fraction`, in milliseconds (bucket midpoint)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lower, upper = bucket_bounds(index)
+                return round(min((lower + upper) / 2, self.max) / 1000, 3)
+        return round(self.max / 1000, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"count": self.count}
+        for name, fraction in QUANTILES:
+            summary[f"{name}_ms"] = self.quantile(fraction)
+        summary["max_ms"] = round(self.max / 1000, 3) if self.count else None
+        return summary
+
+
+# Series key: (group, name, outcome), e.g. ("cep.attempt", "ViaCEPAdapter", "error")
+SeriesKey = Tuple[str, str, str]
+
+
+class _Slot:
+    __slots__ = ("epoch", "latencies", "retries")
+
+    def __init__(self):
+        self.epoch = -1
+        self.latencies: Dict[SeriesKey, LatencyHistogram] = {}
+        self.retries: Dict[Tuple[str, str], int] = {}
+
+    def reset(self, epoch: int) -> None:
+        self.epoch = epoch
+        self.latencies.clear()
+        self.retries.clear()
+
+
+class RollingWindow:
+    """Last `span` seconds of series, kept in a ring of `slots` time slots"""
+
+    def __init__(self, span: float, slots: int, clock: Callable[[], float] = time.monotonic):
+        self.span = span
+        self.clock = clock
+        self.slot_width = span / slots
+        self.slots = [_Slot() for _ in range(slots)]
+
+    def _slot(self, now: float) -> _Slot:
+        epoch = int(now // self.slot_width)
+        slot = self.slots[epoch % len(self.slots)]
+        if slot.epoch != epoch:
+            slot.reset(epoch)
+        return slot
+
+    def record(self, key: SeriesKey, seconds: float, retries: int) -> None:
+        slot = self._slot(self.clock())
+        histogram = slot.latencies.get(key)
+        if histogram is None:
+            histogram = slot.latencies[key] = LatencyHistogram()
+        histogram.record(seconds)
+        if retries:
+            slot.retries[key[:2]] = slot.retries.get(key[:2], 0) + retries
+
+    def merged(self, now: float) -> Tuple[Dict[SeriesKey, LatencyHistogram], Dict[Tuple[str, str], int]]:
+        oldest = int(now // self.slot_width) - len(self.slots) + 1
+        latencies: Dict[SeriesKey, LatencyHistogram] = {}
+        retries: Dict[Tuple[str, str], int] = {}
+        for slot in self.slots:
+            if slot.epoch < oldest:
+                continue
+            for key, histogram in slot.latencies.items():
+                latencies.setdefault(key, LatencyHistogram()).merge(histogram)
+            for key, count in slot.retries.items():
+                retries[key] = retries.get(key, 0) + count
+        return latencies, retries
+
+
+def _merge_all(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged
+
+
+def _share(counts: Dict[str, int]) -> Dict[str, float]:
+    total = sum(counts.values())
+    return {name: round(count / total, 4) for name, count in counts.items()} if total else {}
+
+
+class ProviderStats:
+    """
+    Rolling per-provider outcome counts and latency quantiles.
+
+    Provider strategies record one series value per upstream attempt
+    (`cep.attempt`, `cnpj.provider`) and per strategy call (`cep.lookup`,
+    `cnpj.lookup`); `snapshot()` merges each window's slots into counts,
+    quantiles and derived figures (answer share per provider, retries per
+    success, fallback and hedge rates).
+    """
+
+    def __init__(self, enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.clock = clock
+        self.windows = {name: RollingWindow(span, slots, clock) for name, span, slots in WINDOWS}
+
+    def configure(self, enabled: bool) -> None:
+        self.enabled = enabled
+
+    def record(self, group: str, name: str, outcome: str, seconds: float, retries: int = 0) -> None:
+        if not self.enabled:
+            return
+        key = (group, name, outcome)
+        for window in self.windows.values():
+            window.record(key, seconds, retries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            "enabled": self.enabled,
+            "windows": {name: self._window_snapshot(window, now) for name, window in self.windows.items()}
+        }
+
+    def _window_snapshot(self, window: RollingWindow, now: float) -> Dict[str, Any]:
+        latencies, retries = window.merged(now)
+
+        groups: Dict[str, Dict[str, Dict[str, LatencyHistogram]]] = {}
+        for (group, name, outcome), histogram in latencies.items():
+            groups.setdefault(group, {}).setdefault(name, {})[outcome] = histogram
+
+        series: Dict[str, Any] = {}
+        for group, names in sorted(groups.items()):
+            series[group] = {}
+            for name, outcomes in sorted(names.items()):
+                series[group][name] = {
+                    "latency": _merge_all(outcomes.values()).summary(),
+                    "outcomes": {outcome: histogram.summary() for outcome, histogram in sorted(outcomes.items())},
+                    "retries": retries.get((group, name), 0)
+                }
+
+        return {
+            "span_seconds": window.span,
+            "series": series,
+            "cep": self._cep_summary(groups.get("cep.lookup", {}), retries),
+            "cnpj": self._cnpj_summary(groups.get("cnpj.lookup", {}))
+        }
+
+    def _cep_summary(
+        self,
+        lookups: Dict[str, Dict[str, LatencyHistogram]],
+        retries: Dict[Tuple[str, str], int]
+    ) -> Dict[str, Any]:
+        # cep.lookup series: name = provider that answered (or "none"), outcome = path taken
+        answered = {name: sum(h.count for h in paths.values()) for name, paths in lookups.items() if name != "none"}
+        by_path: Dict[str, List[LatencyHistogram]] = {}
+        for paths in lookups.values():
+            for path, histogram in paths.items():
+                by_path.setdefault(path, []).append(histogram)
+        total = sum(h.count for paths in lookups.values() for h in paths.values())
+        successes = sum(answered.values())
+        retries_for_successes = sum(retries.get(("cep.lookup", name), 0) for name in answered)
+        fallbacks = sum(h.count for h in by_path.get("fallback", []))
+
+        return {
+            "lookups": total,
+            "answered_share": _share(answered),
+            "retries_per_success": round(retries_for_successes / successes, 3) if successes else None,
+            "fallback_rate": round(fallbacks / total, 4) if total else None,
+            "latency_by_path": {path: _merge_all(histograms).summary() for path, histograms in sorted(by_path.items())},
+            "latency": _merge_all(h for paths in lookups.values() for h in paths.values()).summary()
+        }
+
+    def _cnpj_summary(self, lookups: Dict[str, Dict[str, LatencyHistogram]]) -> Dict[str, Any]:
+        # cnpj.lookup series: name = provider that answered (or "none"), outcome = "direct" or "hedged"
+        answered = {name: sum(h.count for h in modes.values()) for name, modes in lookups.items() if name != "none"}
+        total = sum(h.count for modes in lookups.values() for h in modes.values())
+        hedged = sum(modes["hedged"].count for modes in lookups.values() if "hedged" in modes)
+        return {
+            "lookups": total,
+            "answered_share": _share(answered),
+            "hedge_rate": round(hedged / total, 4) if total else None,
+            "latency": _merge_all(h for modes in lookups.values() for h in modes.values()).summary()
+        }
+
+
+provider_stats = ProviderStats()
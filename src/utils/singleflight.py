@@ -0,0 +1,40 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls sharing a key into a single execution.
+
+    The shared task is shielded from individual callers being cancelled and
+    is only cancelled when its last waiter goes away.
+    """
+
+    def __init__(self):
+        # key -> [task, number of waiters]
+        self._calls: Dict[Hashable, List[Any]] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._calls.get(key)
+        if entry is None:
+            entry = [asyncio.ensure_future(func()), 0]
+            self._calls[key] = entry
+            entry[0].add_done_callback(lambda _: self._forget(key, entry))
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _forget(self, key: Hashable, entry: List[Any]) -> None:
+        if self._calls.get(key) is entry:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
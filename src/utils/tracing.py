@@ -0,0 +1,258 @@
+import asyncio
+import json
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import httpx
+from src.utils.logging import get_logger
+
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def set_status(self, code: int, message: str = "") -> None:
+        self.status = code
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event("exception", **{
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc)
+        })
+        self.set_status(STATUS_ERROR, str(exc))
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message} if self.status else {}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(event["time_ns"]),
+                    "attributes": _otlp_attributes(event["attributes"])
+                }
+                for event in self.events
+            ]
+        return span
+
+
+class _NoopSpan:
+    """Stand-in for unsampled traces: every operation is a no-op"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def set_status(self, code: int, message: str = "") -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Any] = ContextVar("current_span", default=None)
+
+
+class OTLPJsonExporter:
+    """
+    Buffers finished spans and writes them as OTLP/JSON ExportTraceServiceRequest
+    documents, one per line to a file and/or POSTed to an OTLP/HTTP collector
+    (e.g. http://localhost:4318/v1/traces).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        service_name: str = "address-validation-service",
+        batch_size: int = 512,
+        flush_interval: float = 5.0,
+        max_buffer: int = 10000
+    ):
+        self.path = path
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.logger = get_logger("OTLPJsonExporter")
+        self._buffer: List[Span] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def export(self, span: Span) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self._buffer.append(span)
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        payload = json.dumps(self._request(spans), separators=(",", ":"))
+
+        try:
+            if self.path:
+                await asyncio.to_thread(self._append, payload)
+            if self.endpoint:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.post(
+                        self.endpoint,
+                        content=payload,
+                        headers={"Content-Type": "application/json"}
+                    )
+                    response.raise_for_status()
+        except Exception as e:
+            self.logger.warning(f"Falha ao exportar {len(spans)} spans: {str(e)}")
+
+    def _append(self, payload: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+
+    def _request(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "src.utils.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+
+class Tracer:
+    """
+    Minimal tracer producing OpenTelemetry-compatible spans.
+
+    The sampling decision is taken once per trace, at the root span; spans of
+    unsampled traces cost one context variable lookup and set.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[OTLPJsonExporter] = None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def configure(self, sample_rate: float, exporter: Optional[OTLPJsonExporter]) -> None:
+        self.sample_rate = sample_rate if exporter else 0.0
+        self.exporter = exporter
+
+    def current_span(self) -> Any:
+        return _current_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+        parent = _current_span.get()
+        if parent is NOOP_SPAN or (parent is None and (
+            not self.sample_rate or random.random() >= self.sample_rate
+        )):
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        if parent is None:
+            span = Span(name, f"{random.getrandbits(128):032x}", None, kind, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.set_attribute("cancelled", True)
+            raise
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if self.exporter:
+                self.exporter.export(span)
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded_value = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded_value = {"doubleValue": value}
+        else:
+            encoded_value = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": encoded_value})
+    return encoded
+
+
+tracer = Tracer()
@@ -109,4 +109,39 @@ def format_cep(cep: str) -> str:
     if len(cep_clean) != 8:
         return cep
     
-    return f"{cep_clean[:5]}-{cep_clean[5:]}"
\ No newline at end of file
+    return f"{cep_clean[:5]}-{cep_clean[5:]}"
+
+# Faixas de CEP por UF (prefixo de 5 dígitos, inclusivo), conforme os Correios
+CEP_UF_RANGES = (
+    (1000, 19999, "SP"), (20000, 28999, "RJ"), (29000, 29999, "ES"),
+    (30000, 39999, "MG"), (40000, 48999, "BA"), (49000, 49999, "SE"),
+    (50000, 56999, "PE"), (57000, 57999, "AL"), (58000, 58999, "PB"),
+    (59000, 59999, "RN"), (60000, 63999, "CE"), (64000, 64999, "PI"),
+    (65000, 65999, "MA"), (66000, 68899, "PA"), (68900, 68999, "AP"),
+    (69000, 69299, "AM"), (69300, 69399, "RR"), (69400, 69899, "AM"),
+    (69900, 69999, "AC"), (70000, 72799, "DF"), (72800, 72999, "GO"),
+    (73000, 73699, "DF"), (73700, 76799, "GO"), (76800, 76999, "RO"),
+    (77000, 77999, "TO"), (78000, 78899, "MT"), (79000, 79999, "MS"),
+    (80000, 87999, "PR"), (88000, 89999, "SC"), (90000, 99999, "RS"),
+)
+
+
+def cep_to_uf(cep: str) -> Optional[str]:
+    """
+    Retorna a UF correspondente à faixa do CEP
+    
+    Args:
+        cep: CEP com 8 dígitos (pode conter pontuação)
+    
+    Returns:
+        Optional[str]: sigla da UF ou None se o CEP estiver fora das faixas conhecidas
+    """
+    cep_clean = re.sub(r'[^\d]', '', cep)
+    if len(cep_clean) != 8:
+        return None
+    
+    prefix = int(cep_clean[:5])
+    for start, end, uf in CEP_UF_RANGES:
+        if start <= prefix <= end:
+            return uf
+    return None
@@ -0,0 +1,157 @@
+"""
+Offline mock of the upstream providers (BrasilAPI, ReceitaWS and ViaCEP).
+
+Every provider is served by the same app, so pointing BRASILAPI_BASE_URL,
+RECEITAWS_BASE_URL and VIACEP_BASE_URL at it is enough to run the service
+without network access. Latency and failure rate can be set per provider:
+
+    python -m tests.fixtures.mock_servers --port 9000 \\
+        --latency brasilapi=2.0 --latency receitaws=0.05 --fail viacep=0.5
+"""
+import argparse
+import asyncio
+import random
+from typing import Dict, Optional
+from fastapi import FastAPI, HTTPException
+
+
+COMPANIES = {
+    "00924432000199": {
+        "cnpj": "00924432000199",
+        "razao_social": "Test Company",
+        "nome_fantasia": "Test Co.",
+        "uf": "SP",
+        "municipio": "Test City",
+        "logradouro": "Test Street",
+        "bairro": "Test Neighborhood",
+        "cep": "13288390",
+        "numero": "123",
+        "complemento": None
+    },
+    "17322527000135": {
+        "cnpj": "17322527000135",
+        "razao_social": "S D ALFAIA TURISMO",
+        "nome_fantasia": None,
+        "uf": "PA",
+        "municipio": "ANANINDEUA",
+        "logradouro": "URIBOCA VELHA",
+        "bairro": "ICUI-GUAJARA",
+        "cep": "67105070",
+        "numero": "10",
+        "complemento": None
+    },
+}
+
+ADDRESSES = {
+    "13288390": {
+        "cep": "13288390",
+        "state": "SP",
+        "city": "Test City",
+        "neighborhood": "Test Neighborhood",
+        "street": "Test Street"
+    },
+    "67105070": {
+        "cep": "67105070",
+        "state": "PA",
+        "city": "Ananindeua",
+        "neighborhood": "Icuí-Guajará",
+        "street": "Rua Uriboca Velha"
+    },
+}
+
+PROVIDERS = ("brasilapi", "receitaws", "viacep")
+
+
+def create_mock_app(
+    latency: Optional[Dict[str, float]] = None,
+    failure_rate: Optional[Dict[str, float]] = None
+) -> FastAPI:
+    latency = latency or {}
+    failure_rate = failure_rate or {}
+    app = FastAPI(title="Mock upstream providers")
+
+    async def simulate(provider: str):
+        delay = latency.get(provider, 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if random.random() < failure_rate.get(provider, 0.0):
+            raise HTTPException(status_code=503, detail=f"{provider} unavailable")
+
+    @app.get("/api/cnpj/v1/{cnpj}")
+    async def brasilapi_cnpj(cnpj: str):
+        await simulate("brasilapi")
+        if cnpj not in COMPANIES:
+            raise HTTPException(status_code=404, detail="CNPJ não encontrado")
+        return COMPANIES[cnpj]
+
+    @app.get("/api/cep/v2/{cep}")
+    async def brasilapi_cep(cep: str):
+        await simulate("brasilapi")
+        if cep not in ADDRESSES:
+            raise HTTPException(status_code=404, detail="CEP não encontrado")
+        return {**ADDRESSES[cep], "service": "mock"}
+
+    @app.get("/v1/cnpj/{cnpj}")
+    async def receitaws_cnpj(cnpj: str):
+        await simulate("receitaws")
+        company = COMPANIES.get(cnpj)
+        if company is None:
+            return {"status": "ERROR", "message": "CNPJ inválido"}
+        cep = company["cep"]
+        return {
+            "status": "OK",
+            "cnpj": f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}",
+            "nome": company["razao_social"],
+            "fantasia": company["nome_fantasia"] or "",
+            "uf": company["uf"],
+            "municipio": company["municipio"],
+            "logradouro": company["logradouro"],
+            "numero": company["numero"] or "",
+            "complemento": company["complemento"] or "",
+            "bairro": company["bairro"] or "",
+            "cep": f"{cep[:2]}.{cep[2:5]}-{cep[5:]}"
+        }
+
+    @app.get("/ws/{cep}/json/")
+    async def viacep(cep: str):
+        await simulate("viacep")
+        address = ADDRESSES.get(cep)
+        if address is None:
+            return {"erro": True}
+        return {
+            "cep": f"{cep[:5]}-{cep[5:]}",
+            "logradouro": address["street"],
+            "bairro": address["neighborhood"],
+            "localidade": address["city"],
+            "uf": address["state"]
+        }
+
+    return app
+
+
+def _parse_pairs(values) -> Dict[str, float]:
+    pairs = {}
+    for value in values or []:
+        provider, _, amount = value.partition("=")
+        if provider not in PROVIDERS:
+            raise argparse.ArgumentTypeError(f"Unknown provider: {provider}")
+        pairs[provider] = float(amount)
+    return pairs
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock upstream providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", action="append", help="provider=seconds")
+    parser.add_argument("--fail", action="append", help="provider=failure_rate")
+    args = parser.parse_args()
+
+    app = create_mock_app(_parse_pairs(args.latency), _parse_pairs(args.fail))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
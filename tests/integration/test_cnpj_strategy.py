@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Dict, Optional
+import httpx
+import pytest
+from src.adapters.cnpj_adapters import BrasilAPICNPJAdapter, ReceitaWSCNPJAdapter
+from src.adapters.interfaces import CNPJAdapterInterface
+from src.models.schemas import CompanyData
+from src.strategies.cnpj_strategy import CNPJProviderStrategy
+from tests.fixtures.mock_servers import create_mock_app
+
+pytestmark = pytest.mark.integration
+
+MOCK_URL = "http://mock"
+KNOWN_CNPJ = "17322527000135"
+UNKNOWN_CNPJ = "11222333000181"
+
+
+class TrackedAdapter(CNPJAdapterInterface):
+    """Wraps an adapter and records whether its lookup was cancelled"""
+
+    def __init__(self, inner: CNPJAdapterInterface):
+        self.inner = inner
+        self.calls = 0
+        self.started_at: Optional[float] = None
+        self.cancelled = False
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        self.calls += 1
+        self.started_at = time.perf_counter()
+        try:
+            return await self.inner.get_company_data(cnpj)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def mock_providers(
+    latency: Optional[Dict[str, float]] = None,
+    failure_rate: Optional[Dict[str, float]] = None
+):
+    transport = httpx.ASGITransport(app=create_mock_app(latency, failure_rate))
+    brasilapi = TrackedAdapter(BrasilAPICNPJAdapter(base_url=MOCK_URL, transport=transport))
+    receitaws = TrackedAdapter(ReceitaWSCNPJAdapter(base_url=MOCK_URL, transport=transport))
+    return brasilapi, receitaws
+
+
+async def test_first_provider_answers_without_hedging():
+    brasilapi, receitaws = mock_providers()
+    strategy = CNPJProviderStrategy(providers=[brasilapi, receitaws], hedge_delay=0.5)
+
+    company = await strategy.get_company_data(KNOWN_CNPJ)
+
+    assert company is not None and company.cnpj == KNOWN_CNPJ
+    assert receitaws.calls == 0
+
+
+async def test_hedge_fires_after_delay_and_cancels_loser():
+    brasilapi, receitaws = mock_providers(latency={"brasilapi": 1.0})
+    strategy = CNPJProviderStrategy(providers=[brasilapi, receitaws], hedge_delay=0.05)
+
+    started = time.perf_counter()
+    company = await strategy.get_company_data(KNOWN_CNPJ)
+    elapsed = time.perf_counter() - started
+
+    assert company is not None and company.cnpj == KNOWN_CNPJ
+    assert receitaws.calls == 1
+    assert receitaws.started_at - brasilapi.started_at >= 0.05
+    assert elapsed < 0.5
+    # Losers are cancelled, not awaited: let the cancellation land
+    await asyncio.sleep(0.05)
+    assert brasilapi.cancelled
+
+
+async def test_fails_over_immediately_on_5xx():
+    brasilapi, receitaws = mock_providers(failure_rate={"brasilapi": 1.0})
+    strategy = CNPJProviderStrategy(providers=[brasilapi, receitaws], hedge_delay=5.0)
+
+    started = time.perf_counter()
+    company = await strategy.get_company_data(KNOWN_CNPJ)
+
+    assert company is not None and company.cnpj == KNOWN_CNPJ
+    assert receitaws.calls == 1
+    assert time.perf_counter() - started < 1.0
+
+
+async def test_fails_over_immediately_on_empty_answer():
+    # Second provider knows a CNPJ the first one answers 404 for
+    transport = httpx.ASGITransport(app=create_mock_app())
+    empty = TrackedAdapter(BrasilAPICNPJAdapter(base_url=f"{MOCK_URL}/missing", transport=transport))
+    receitaws = TrackedAdapter(ReceitaWSCNPJAdapter(base_url=MOCK_URL, transport=transport))
+    strategy = CNPJProviderStrategy(providers=[empty, receitaws], hedge_delay=5.0)
+
+    started = time.perf_counter()
+    company = await strategy.get_company_data(KNOWN_CNPJ)
+
+    assert company is not None and company.cnpj == KNOWN_CNPJ
+    assert empty.calls == 1 and receitaws.calls == 1
+    assert time.perf_counter() - started < 1.0
+
+
+async def test_fails_over_immediately_on_receitaws_error_status():
+    brasilapi, receitaws = mock_providers()
+    # ReceitaWS answers 200 {"status": "ERROR"} for unknown CNPJs
+    strategy = CNPJProviderStrategy(providers=[receitaws, brasilapi], hedge_delay=5.0)
+
+    started = time.perf_counter()
+    company = await strategy.get_company_data(UNKNOWN_CNPJ)
+
+    assert company is None
+    assert receitaws.calls == 1 and brasilapi.calls == 1
+    assert time.perf_counter() - started < 1.0
+
+
+async def test_all_providers_empty_returns_none():
+    brasilapi, receitaws = mock_providers()
+    strategy = CNPJProviderStrategy(providers=[brasilapi, receitaws], hedge_delay=5.0)
+
+    started = time.perf_counter()
+    company = await strategy.get_company_data(UNKNOWN_CNPJ)
+
+    assert company is None
+    assert brasilapi.calls == 1 and receitaws.calls == 1
+    assert time.perf_counter() - started < 1.0
+
+
+async def test_all_providers_failing_returns_none():
+    brasilapi, receitaws = mock_providers(failure_rate={"brasilapi": 1.0, "receitaws": 1.0})
+    strategy = CNPJProviderStrategy(providers=[brasilapi, receitaws], hedge_delay=5.0)
+
+    assert await strategy.get_company_data(KNOWN_CNPJ) is None
+    assert brasilapi.calls == 1 and receitaws.calls == 1
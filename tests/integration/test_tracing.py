@@ -0,0 +1,94 @@
+import json
+import re
+import httpx
+import pytest
+from src.adapters.cep_adapters import BrasilAPICEPAdapter, ViaCEPAdapter
+from src.adapters.cnpj_adapters import BrasilAPICNPJAdapter
+from src.config.settings import Settings
+from src.services.validation_service import AddressValidationService
+from src.strategies.cep_strategy import CEPProviderStrategy
+from src.strategies.cnpj_strategy import CNPJProviderStrategy
+from src.utils.cache import ThreadSafeCache
+from src.utils.tracing import SPAN_KIND_CLIENT, OTLPJsonExporter, tracer
+from tests.fixtures.mock_servers import create_mock_app
+
+pytestmark = pytest.mark.integration
+
+MOCK_URL = "http://mock"
+CNPJ = "17322527000135"
+CEP = "67105070"
+NANOS = re.compile(r"^\d{19}$")
+
+
+@pytest.fixture
+def traced_settings(tmp_path):
+    settings = Settings({"TRACE_SAMPLE_RATE": "1", "TRACE_EXPORT_PATH": str(tmp_path / "spans.jsonl")})
+    exporter = OTLPJsonExporter(path=settings.TRACE_EXPORT_PATH, service_name=settings.SERVICE_NAME)
+    tracer.configure(settings.TRACE_SAMPLE_RATE, exporter)
+    yield settings, exporter
+    tracer.configure(0.0, None)
+
+
+def make_service(settings: Settings) -> AddressValidationService:
+    transport = httpx.ASGITransport(app=create_mock_app())
+    cep_strategy = CEPProviderStrategy(settings=settings)
+    cep_strategy.set_providers([
+        BrasilAPICEPAdapter(base_url=MOCK_URL, settings=settings, transport=transport),
+        ViaCEPAdapter(base_url=MOCK_URL, settings=settings, transport=transport),
+    ])
+    return AddressValidationService(
+        settings=settings,
+        cnpj_strategy=CNPJProviderStrategy(
+            providers=[BrasilAPICNPJAdapter(base_url=MOCK_URL, transport=transport)], hedge_delay=5.0
+        ),
+        cep_strategy=cep_strategy,
+        cache=ThreadSafeCache(max_size=100, ttl=60)
+    )
+
+
+def attributes(span) -> dict:
+    return {item["key"]: next(iter(item["value"].values())) for item in span["attributes"]}
+
+
+async def test_validation_exports_one_otlp_span_tree(traced_settings):
+    settings, exporter = traced_settings
+
+    result = await make_service(settings).validate_customer_address(CNPJ, CEP)
+    await exporter.flush()
+
+    with open(settings.TRACE_EXPORT_PATH, encoding="utf-8") as handle:
+        requests = [json.loads(line) for line in handle]
+    assert len(requests) == 1
+    (resource_spans,) = requests[0]["resourceSpans"]
+    assert attributes(resource_spans["resource"]) == {"service.name": settings.SERVICE_NAME}
+    spans = resource_spans["scopeSpans"][0]["spans"]
+
+    by_name = {span["name"]: span for span in spans}
+    assert sorted(by_name) == [
+        "cep.attempt", "cep.lookup", "cep.provider", "cnpj.lookup", "cnpj.provider", "validate_customer_address"
+    ]
+    assert len(spans) == len(by_name)
+
+    root = by_name["validate_customer_address"]
+    assert "parentSpanId" not in root
+    assert attributes(root)["valid"] is result.valid is True
+    for child, parent in (
+        ("cnpj.lookup", "validate_customer_address"),
+        ("cep.lookup", "validate_customer_address"),
+        ("cnpj.provider", "cnpj.lookup"),
+        ("cep.provider", "cep.lookup"),
+        ("cep.attempt", "cep.provider"),
+    ):
+        assert by_name[child]["parentSpanId"] == by_name[parent]["spanId"]
+        assert int(by_name[parent]["startTimeUnixNano"]) <= int(by_name[child]["startTimeUnixNano"])
+        assert int(by_name[child]["endTimeUnixNano"]) <= int(by_name[parent]["endTimeUnixNano"])
+
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+    assert re.fullmatch(r"[0-9a-f]{32}", root["traceId"]) and int(root["traceId"], 16)
+    assert len({span["spanId"] for span in spans}) == len(spans)
+    for span in spans:
+        assert re.fullmatch(r"[0-9a-f]{16}", span["spanId"])
+        assert NANOS.match(span["startTimeUnixNano"]) and NANOS.match(span["endTimeUnixNano"])
+        assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+    assert by_name["cnpj.provider"]["kind"] == SPAN_KIND_CLIENT
+    assert by_name["cep.attempt"]["kind"] == SPAN_KIND_CLIENT
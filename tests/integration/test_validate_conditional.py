@@ -0,0 +1,71 @@
+import httpx
+import pytest
+import main
+from src.models.schemas import AddressMatch, CompanyData, ValidationResult
+
+pytestmark = pytest.mark.integration
+
+CNPJ = "17322527000135"
+CEP = "67105070"
+QUERY = {"cnpj": CNPJ, "cep": CEP}
+
+
+def result(valid: bool) -> ValidationResult:
+    return ValidationResult(
+        valid=valid,
+        message="Endereço validado com sucesso" if valid else "Endereço não corresponde ao da empresa",
+        company_data=CompanyData(
+            cnpj=CNPJ, razao_social="EMPRESA LTDA", uf="PA", municipio="ANANINDEUA",
+            logradouro="RODOVIA BR 316", cep=CEP
+        ),
+        address_data=None,
+        match=AddressMatch(state=True, city=True, street=valid)
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    outcome = {"valid": True}
+
+    async def validate(cnpj, cep):
+        return result(outcome["valid"])
+
+    monkeypatch.setattr(main.validation_service, "validate_customer_address", validate)
+    monkeypatch.setattr(main, "response_cache", main.ValidationResponseCache())
+    transport = httpx.ASGITransport(app=main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test"), outcome
+
+
+async def test_get_revalidates_a_200_with_a_304(client):
+    client, _ = client
+    async with client:
+        first = await client.get("/validate", params=QUERY)
+        second = await client.get("/validate", params=QUERY, headers={"If-None-Match": first.headers["etag"]})
+        post = await client.post("/validate", json=QUERY, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert post.status_code == 412
+
+
+async def test_a_cached_404_is_sent_again(client):
+    client, outcome = client
+    outcome["valid"] = False
+    async with client:
+        first = await client.get("/validate", params=QUERY)
+        second = await client.get("/validate", params=QUERY, headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == second.status_code == 404
+    assert second.json()["detail"] == "Endereço não corresponde ao da empresa"
+
+
+async def test_no_cache_skips_the_cached_response(client):
+    client, outcome = client
+    async with client:
+        first = await client.get("/validate", params=QUERY)
+        outcome["valid"] = False
+        cached = await client.get("/validate", params=QUERY)
+        recomputed = await client.get("/validate", params=QUERY, headers={"Cache-Control": "no-cache"})
+
+    assert first.status_code == cached.status_code == 200
+    assert recomputed.status_code == 404
@@ -0,0 +1,78 @@
+import random
+import pytest
+from src.middleware.admission import (
+    INTERACTIVE,
+    AdaptiveConcurrencyLimiter,
+    AdmissionControlMiddleware,
+    record_admission_sample,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def replay(limiter: AdaptiveConcurrencyLimiter, samples) -> None:
+    """Release each sample with the limiter saturated, as under full concurrency"""
+    for rtt in samples:
+        limiter.in_flight = int(limiter.limit) - 1
+        assert limiter.try_acquire(INTERACTIVE)
+        limiter.release(rtt)
+    limiter.in_flight = 0
+
+
+@pytest.mark.parametrize("hit_ratio", [0.0, 0.5, 0.9])
+def test_cache_hits_do_not_shrink_the_limit(hit_ratio):
+    rng = random.Random(7)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=50)
+    # Steady 300 ms upstream, no overload; cache hits carry no latency sample
+    samples = [None if rng.random() < hit_ratio else rng.uniform(0.28, 0.32) for _ in range(5000)]
+
+    replay(limiter, samples)
+
+    assert limiter.limit >= 50
+    assert limiter.long_rtt == pytest.approx(0.3, rel=0.1)
+
+
+def test_rising_upstream_latency_shrinks_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=200)
+    replay(limiter, [0.3] * 1000)
+    grown = limiter.limit
+
+    replay(limiter, [None, 3.0] * 200)
+
+    assert limiter.limit < grown
+
+
+async def run_middleware(limiter: AdaptiveConcurrencyLimiter, ran_service: bool, status: int = 200) -> int:
+    async def app(scope, receive, send):
+        if ran_service:
+            record_admission_sample(scope)
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/validate", "headers": []}
+    await AdmissionControlMiddleware(app, limiter)(scope, None, send)
+    return sent[0]["status"]
+
+
+async def test_middleware_samples_only_requests_that_ran_the_service():
+    limiter = AdaptiveConcurrencyLimiter()
+
+    assert await run_middleware(limiter, ran_service=False, status=304) == 304
+    assert await run_middleware(limiter, ran_service=False, status=422) == 422
+    assert limiter.long_rtt == 0.0 and limiter.in_flight == 0
+
+    await run_middleware(limiter, ran_service=True)
+    assert limiter.long_rtt > 0.0 and limiter.in_flight == 0
+
+
+async def test_middleware_sheds_with_503_when_full():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1)
+    limiter.in_flight = 1
+
+    assert await run_middleware(limiter, ran_service=True) == 503
+    assert limiter.shed[INTERACTIVE] == 1
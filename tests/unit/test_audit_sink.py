@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+from types import SimpleNamespace
+import pytest
+from src.config.settings import Settings
+from src.models.schemas import ValidationResult
+from src.services.audit_sink import AuditSink
+from src.utils.health import HealthChecker
+
+pytestmark = pytest.mark.unit
+
+CNPJ = "17.322.527/0001-35"
+CEP = "01310-100"
+
+
+def result(valid: bool = True) -> ValidationResult:
+    return ValidationResult(valid=valid, message="ok", company_data=None, address_data=None)
+
+
+async def test_rotation_counts_segments_in_memory(tmp_path):
+    sink = AuditSink(str(tmp_path), batch_size=1, segment_max_rows=2, flush_interval=0.01)
+    await sink.start()
+    for _ in range(5):
+        assert await sink.record(CNPJ, CEP, result())
+    await sink.stop()
+
+    assert sink.stats()["written"] == 5
+    assert sink.stats()["segments"] == 3
+    assert sorted(os.listdir(tmp_path)) == [f"audit-00000{n}.sqlite3" for n in (1, 2, 3)]
+
+
+async def test_restart_counts_existing_segments_once_and_appends_to_the_last(tmp_path):
+    sink = AuditSink(str(tmp_path), batch_size=1, segment_max_rows=2, flush_interval=0.01)
+    await sink.start()
+    for _ in range(3):
+        await sink.record(CNPJ, CEP, result())
+    await sink.stop()
+
+    restarted = AuditSink(str(tmp_path), segment_max_rows=2, flush_interval=0.01)
+    await restarted.start()
+    assert restarted.stats()["segments"] == 2
+    await restarted.record(CNPJ, CEP, result(valid=False))
+    await restarted.stop()
+
+    assert restarted.stats()["segments"] == 2
+    rows = await restarted.query(CNPJ)
+    assert [row["valid"] for row in rows] == [False, True, True, True]
+    assert rows[0]["cnpj"] == "17322527000135"
+
+
+async def test_segments_sync_fully_unless_configured(tmp_path):
+    sink = AuditSink(str(tmp_path / "full"))
+    relaxed = AuditSink(str(tmp_path / "normal"), synchronous="normal")
+    await sink.start()
+    await relaxed.start()
+
+    # PRAGMA synchronous: 1 = NORMAL, 2 = FULL
+    assert sink._connection.execute("PRAGMA synchronous").fetchone()[0] == 2
+    assert relaxed._connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+    await sink.stop()
+    await relaxed.stop()
+
+    with pytest.raises(ValueError):
+        AuditSink(str(tmp_path), synchronous="OFF")
+
+
+async def test_dropped_entries_are_logged_and_degrade_health(tmp_path, monkeypatch, caplog):
+    sink = AuditSink(str(tmp_path), max_queue=1, flush_interval=0.01, enqueue_timeout=0.01)
+    await sink.start()
+    write = sink._write
+    # Hold the writer on its first batch so the queue stays full
+    monkeypatch.setattr(sink, "_write", lambda batch: (time.sleep(0.2), write(batch)))
+    health = HealthChecker(settings=Settings({}), validation_service=SimpleNamespace(audit_sink=sink))
+    assert (await health.check_audit())["status"] == "healthy"
+
+    with caplog.at_level(logging.ERROR, logger="address_validation.AuditSink"):
+        recorded = [await sink.record(CNPJ, CEP, result()) for _ in range(6)]
+    await sink.stop()
+
+    assert recorded[0] and not recorded[-1]
+    assert sink.stats()["dropped"] == recorded.count(False)
+    assert sink.stats()["written"] == recorded.count(True)
+    # One report per interval, not one per entry
+    assert len(caplog.records) == 1
+    check = await health.check_audit()
+    assert check["status"] == "unhealthy" and check["dropping"]
@@ -0,0 +1,155 @@
+import time
+from typing import Optional
+import pytest
+from src.config.settings import Settings
+from src.middleware.admission import BATCH, AdaptiveConcurrencyLimiter
+from src.models.schemas import CompanyData
+from src.services.cache_refresher import CacheRefresher
+from src.services.validation_service import AddressValidationService
+from src.utils.cache import ThreadSafeCache
+
+pytestmark = pytest.mark.unit
+
+CNPJ = "17322527000135"
+
+
+def company(razao_social: str = "Empresa") -> CompanyData:
+    return CompanyData(
+        cnpj=CNPJ, razao_social=razao_social, uf="SP", municipio="SAO PAULO",
+        logradouro="AVENIDA PAULISTA", cep="01310100"
+    )
+
+
+class FakeCNPJStrategy:
+    def __init__(self, company_data: Optional[CompanyData] = None, error: Optional[Exception] = None):
+        self.company_data = company_data
+        self.error = error
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        if self.error:
+            raise self.error
+        return self.company_data
+
+
+class RecordingService:
+    """Stands in for the validation service: records refreshed keys in order"""
+
+    def __init__(self, cache: ThreadSafeCache, fail: tuple = ()):
+        self.cache = cache
+        self.fail = set(fail)
+        self.refreshed = []
+
+    async def refresh(self, key: str) -> bool:
+        self.refreshed.append(key)
+        return key not in self.fail
+
+
+async def read(cache: ThreadSafeCache, key: str, times: int) -> None:
+    for _ in range(times):
+        await cache.get(key)
+
+
+async def test_hot_keys_are_read_enough_expiring_soon_and_soonest_first():
+    cache = ThreadSafeCache(max_size=100, ttl=600)
+    await cache.set("cnpj:late", 1, ttl=50)
+    await cache.set("cep:soon", 1, ttl=10)
+    await cache.set("cnpj:cold", 1, ttl=5)
+    await cache.set("cnpj:far", 1, ttl=500)
+    await cache.set("other:soon", 1, ttl=5)
+    for key in ("cnpj:late", "cep:soon", "cnpj:far", "other:soon"):
+        await read(cache, key, 3)
+    await read(cache, "cnpj:cold", 2)
+
+    assert cache.hot_keys(3, 60, prefixes=("cnpj:", "cep:")) == ["cep:soon", "cnpj:late"]
+    assert 0 < cache.expires_in("cep:soon") <= 10
+    assert cache.expires_in("cnpj:missing") is None
+
+
+async def test_storing_again_resets_the_read_count():
+    cache = ThreadSafeCache(max_size=100, ttl=10)
+    await cache.set("cnpj:a", 1)
+    await read(cache, "cnpj:a", 3)
+    await cache.set("cnpj:a", 2)
+
+    assert cache.hot_keys(3, 60) == []
+
+
+async def test_pass_refreshes_soonest_first_within_the_budget():
+    cache = ThreadSafeCache(max_size=100, ttl=600)
+    for index, ttl in enumerate((30, 10, 20, 40)):
+        await cache.set(f"cnpj:{index}", index, ttl=ttl)
+        await read(cache, f"cnpj:{index}", 3)
+    service = RecordingService(cache, fail=("cnpj:2",))
+    # rate * interval = 3 refreshes per pass
+    refresher = CacheRefresher(service, interval=0.3, min_reads=3, rate=10)
+
+    assert await refresher.refresh_due() == 2
+
+    assert service.refreshed == ["cnpj:1", "cnpj:2", "cnpj:0"]
+    assert refresher.stats()["refreshed"] == 2
+    assert refresher.stats()["failed"] == 1
+
+
+async def test_pass_does_not_sleep_after_the_last_refresh():
+    cache = ThreadSafeCache(max_size=100, ttl=10)
+    await cache.set("cnpj:a", 1)
+    await read(cache, "cnpj:a", 3)
+    refresher = CacheRefresher(RecordingService(cache), interval=5, min_reads=3, rate=2)
+
+    started = time.monotonic()
+    await refresher.refresh_due()
+
+    assert time.monotonic() - started < 0.25
+
+
+async def test_pass_is_deferred_while_live_traffic_fills_the_batch_share():
+    cache = ThreadSafeCache(max_size=100, ttl=10)
+    for key in ("cnpj:a", "cnpj:b"):
+        await cache.set(key, 1)
+        await read(cache, key, 3)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+    for _ in range(limiter.capacity(BATCH)):
+        assert limiter.try_acquire(BATCH)
+    service = RecordingService(cache)
+    refresher = CacheRefresher(service, min_reads=3, rate=1000, admission_limiter=limiter)
+
+    assert await refresher.refresh_due() == 0
+    assert service.refreshed == []
+    assert refresher.stats()["deferred"] == 2
+
+    limiter.release()
+    assert await refresher.refresh_due() == 2
+
+
+@pytest.mark.parametrize("strategy", [
+    FakeCNPJStrategy(error=RuntimeError("provedor fora do ar")),
+    FakeCNPJStrategy(company_data=None),
+])
+async def test_failed_refresh_keeps_the_cached_value(strategy):
+    cache = ThreadSafeCache(max_size=100, ttl=60)
+    service = AddressValidationService(cnpj_strategy=strategy, cache=cache)
+    cached = company()
+    await cache.set(f"cnpj:{CNPJ}", cached)
+
+    assert await service.refresh(f"cnpj:{CNPJ}") is False
+    assert await cache.get(f"cnpj:{CNPJ}") is cached
+
+
+async def test_successful_refresh_replaces_the_cached_value():
+    cache = ThreadSafeCache(max_size=100, ttl=60)
+    service = AddressValidationService(cnpj_strategy=FakeCNPJStrategy(company("Nova Razão")), cache=cache)
+    await cache.set(f"cnpj:{CNPJ}", company())
+
+    assert await service.refresh(f"cnpj:{CNPJ}") is True
+    assert (await cache.get(f"cnpj:{CNPJ}")).razao_social == "Nova Razão"
+
+
+@pytest.mark.parametrize("name", ["CACHE_REFRESH_RATE", "CACHE_REFRESH_INTERVAL"])
+def test_settings_reject_a_non_positive_refresh_timing(name):
+    with pytest.raises(ValueError, match=name):
+        Settings({name: "0"})
+
+
+def test_refresher_rejects_a_zero_rate():
+    with pytest.raises(ValueError):
+        CacheRefresher(RecordingService(ThreadSafeCache()), rate=0)
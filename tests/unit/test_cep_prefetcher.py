@@ -0,0 +1,157 @@
+import asyncio
+from typing import Optional
+import pytest
+from src.models.schemas import AddressData, CompanyData
+from src.services.cep_prefetcher import CEPPrefetcher
+from src.services.lookup_planner import CEPLookupDecision
+from src.services.validation_service import AddressValidationService
+from src.utils.cache import ThreadSafeCache
+
+pytestmark = pytest.mark.unit
+
+CNPJ = "17322527000135"
+COMPANY_CEP = "01310100"
+OTHER_SP_CEP = "01310200"
+
+
+def company() -> CompanyData:
+    return CompanyData(
+        cnpj=CNPJ, razao_social="Empresa", uf="SP", municipio="SAO PAULO",
+        logradouro="AVENIDA PAULISTA", cep="01310-100"
+    )
+
+
+def address(cep: str) -> AddressData:
+    return AddressData(
+        cep=cep, state="SP", city="São Paulo", neighborhood="Bela Vista",
+        street="Avenida Paulista", service="fake"
+    )
+
+
+class FakeCNPJStrategy:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        await asyncio.sleep(self.delay)
+        return company()
+
+
+class FakeCEPStrategy:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def get_address_data(self, cep: str) -> Optional[AddressData]:
+        self.calls.append(cep)
+        await asyncio.sleep(self.delay)
+        return address(cep)
+
+
+class BlockedService:
+    """Stands in for the validation service: CEP lookups never finish"""
+
+    def __init__(self):
+        self.cache = ThreadSafeCache(max_size=100, ttl=60)
+        self.started = 0
+        self.cancelled = 0
+
+    async def get_address_data(self, cep: str) -> Optional[AddressData]:
+        self.started += 1
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def make_service(cnpj_delay: float = 0.0, cep_delay: float = 0.0) -> AddressValidationService:
+    return AddressValidationService(
+        cnpj_strategy=FakeCNPJStrategy(cnpj_delay),
+        cep_strategy=FakeCEPStrategy(cep_delay),
+        cache=ThreadSafeCache(max_size=100, ttl=60)
+    )
+
+
+async def settle(prefetcher: CEPPrefetcher) -> None:
+    await asyncio.gather(*prefetcher._tasks)
+
+
+async def test_submit_fetches_into_the_cep_cache():
+    service = make_service()
+    prefetcher = CEPPrefetcher(service)
+
+    assert prefetcher.submit("01310-100")
+    await settle(prefetcher)
+
+    assert await service.cache.get(f"cep:{COMPANY_CEP}") is not None
+    assert prefetcher.stats() == {
+        "in_flight": 0, "submitted": 1, "fetched": 1, "skipped": 0, "dropped": 0, "failed": 0
+    }
+
+
+async def test_submit_skips_cached_queued_and_malformed_ceps():
+    service = BlockedService()
+    await service.cache.set(f"cep:{COMPANY_CEP}", address(COMPANY_CEP))
+    prefetcher = CEPPrefetcher(service)
+
+    assert not prefetcher.submit(COMPANY_CEP)
+    assert prefetcher.submit(OTHER_SP_CEP)
+    assert not prefetcher.submit(OTHER_SP_CEP)
+    assert not prefetcher.submit("0131")
+
+    stats = prefetcher.stats()
+    assert stats["skipped"] == 1
+    assert stats["submitted"] == 1
+    assert stats["in_flight"] == 1
+    await prefetcher.stop()
+
+
+async def test_submissions_beyond_max_pending_are_dropped():
+    service = BlockedService()
+    prefetcher = CEPPrefetcher(service, max_concurrency=1, max_pending=2)
+
+    accepted = [prefetcher.submit(f"0131010{digit}") for digit in range(4)]
+
+    assert accepted == [True, True, False, False]
+    assert prefetcher.stats()["dropped"] == 2
+    await prefetcher.stop()
+
+
+async def test_stop_cancels_prefetches_in_flight():
+    service = BlockedService()
+    prefetcher = CEPPrefetcher(service, max_concurrency=1)
+    prefetcher.submit(COMPANY_CEP)
+    prefetcher.submit(OTHER_SP_CEP)
+    await asyncio.sleep(0)
+
+    await prefetcher.stop()
+
+    # One was running, the other still waiting for a slot
+    assert service.started == service.cancelled == 1
+    assert prefetcher._tasks == set()
+    assert prefetcher.stats()["in_flight"] == 0
+
+
+async def test_follow_up_with_the_registered_cep_is_planned_as_reuse():
+    service = make_service()
+
+    first = await service.validate_customer_address(CNPJ, OTHER_SP_CEP)
+    await settle(service.cep_prefetcher)
+    second = await service.validate_customer_address(CNPJ, COMPANY_CEP)
+
+    assert first.valid and second.valid
+    # The registered CEP was fetched once, by the prefetch
+    assert service.cep_strategy.calls == [OTHER_SP_CEP, COMPANY_CEP]
+    assert service.cep_planner.decisions[CEPLookupDecision.REUSE] == 1
+
+
+async def test_parallel_lookups_submit_the_registered_cep_once():
+    # The company arrives while the CEP lookup is still in flight
+    service = make_service(cep_delay=0.05)
+    await service.cache.set(f"cep:{COMPANY_CEP}", address(COMPANY_CEP))
+
+    await service.validate_customer_address(CNPJ, OTHER_SP_CEP)
+
+    assert service.cep_prefetcher.stats()["skipped"] == 1
+    assert service.cep_prefetcher.stats()["submitted"] == 0
@@ -0,0 +1,45 @@
+import pytest
+from src.utils.validators import CEP_UF_RANGES, cep_to_uf
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("cep, uf", [
+    ("00999999", None),
+    ("01000000", "SP"),
+    ("01000-000", "SP"),
+    ("19999999", "SP"),
+    ("20000000", "RJ"),
+    ("68899999", "PA"),
+    ("68900000", "AP"),
+    ("69299999", "AM"),
+    ("69300000", "RR"),
+    ("69400000", "AM"),
+    ("69999999", "AC"),
+    # DF and GO share interleaved ranges
+    ("70000000", "DF"),
+    ("72799999", "DF"),
+    ("72800000", "GO"),
+    ("72999999", "GO"),
+    ("73000000", "DF"),
+    ("73699999", "DF"),
+    ("73700000", "GO"),
+    ("76799999", "GO"),
+    ("76800000", "RO"),
+    ("78899999", "MT"),
+    ("79000000", "MS"),
+    ("99999999", "RS"),
+    ("99999-999", "RS"),
+])
+def test_range_edges(cep, uf):
+    assert cep_to_uf(cep) == uf
+
+
+@pytest.mark.parametrize("cep", ["", "0131010", "013101000", "abc"])
+def test_malformed_cep_has_no_uf(cep):
+    assert cep_to_uf(cep) is None
+
+
+def test_ranges_are_sorted_and_disjoint():
+    for (_, end, _), (start, _, _) in zip(CEP_UF_RANGES, CEP_UF_RANGES[1:]):
+        assert end < start
@@ -0,0 +1,106 @@
+import random
+from array import array
+import pytest
+from src.adapters import cnpj_snapshot
+from src.adapters.cnpj_snapshot import CNPJSnapshot, _unique_sorted_order, build_snapshot
+
+pytestmark = pytest.mark.unit
+
+LOWEST = "00000000000191"
+HIGHEST = "99999999000191"
+HEAD_OFFICE = "17322527000135"
+BRANCH = "17322527000216"
+
+
+def estabelecimento(cnpj, fantasia="", logradouro="RUA A", numero="1", complemento="", bairro="CENTRO",
+                    cep="01310100", uf="SP", municipio="7107"):
+    fields = [""] * 30
+    fields[0], fields[1], fields[2] = cnpj[:8], cnpj[8:12], cnpj[12:]
+    fields[4] = fantasia
+    fields[14:21] = [logradouro, numero, complemento, bairro, cep, uf, municipio]
+    return ";".join(f'"{field}"' for field in fields)
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    # Tiny chunks so the chunked column writes cross several boundaries
+    monkeypatch.setattr(cnpj_snapshot, "WRITE_CHUNK_ROWS", 2)
+    municipios = tmp_path / "MUNICCSV"
+    municipios.write_text('"7107";"SAO PAULO"\n"6001";"RIO DE JANEIRO"\n', encoding="latin-1")
+    empresas = tmp_path / "EMPRECSV"
+    empresas.write_text(
+        '"17322527";"EMPRESA ÁGUA LTDA"\n"99999999";"ÚLTIMA SA"\n"00000000";"PRIMEIRA SA"\n',
+        encoding="latin-1"
+    )
+    estabelecimentos = tmp_path / "ESTABELE"
+    estabelecimentos.write_text("\n".join([
+        estabelecimento(BRANCH, logradouro="RUA FILIAL", uf="RJ", municipio="6001", cep="20040002"),
+        estabelecimento(HIGHEST, fantasia="FIM"),
+        estabelecimento(HEAD_OFFICE, logradouro="RUA ANTIGA"),
+        estabelecimento(LOWEST, cep=""),
+        # A later row for the same CNPJ replaces the earlier one
+        estabelecimento(HEAD_OFFICE, fantasia="MATRIZ", logradouro="AVENIDA PAULISTA", numero="1000",
+                        complemento="ANDAR 5"),
+        estabelecimento("1234"),
+    ]) + "\n", encoding="latin-1")
+
+    path = str(tmp_path / "cnpj.snapshot")
+    stats = build_snapshot(path, [str(estabelecimentos)], [str(empresas)], [str(municipios)])
+    assert stats["rows"] == 4 and stats["companies"] == 3
+    snapshot = CNPJSnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_round_trip_of_a_present_cnpj(snapshot):
+    company = snapshot.lookup(HEAD_OFFICE)
+
+    assert company.model_dump() == {
+        "cnpj": HEAD_OFFICE,
+        "razao_social": "EMPRESA ÁGUA LTDA",
+        "nome_fantasia": "MATRIZ",
+        "uf": "SP",
+        "municipio": "SAO PAULO",
+        "logradouro": "AVENIDA PAULISTA",
+        "bairro": "CENTRO",
+        "cep": "01310100",
+        "numero": "1000",
+        "complemento": "ANDAR 5",
+    }
+
+
+def test_branches_share_the_company_name(snapshot):
+    branch = snapshot.lookup(BRANCH)
+
+    assert branch.razao_social == snapshot.lookup(HEAD_OFFICE).razao_social
+    assert (branch.uf, branch.municipio, branch.logradouro, branch.cep) == ("RJ", "RIO DE JANEIRO", "RUA FILIAL", "20040002")
+    assert branch.nome_fantasia is None and branch.complemento is None
+
+
+def test_edge_keys_at_both_ends_of_the_sorted_column(snapshot):
+    lowest, highest = snapshot.lookup(LOWEST), snapshot.lookup(HIGHEST)
+
+    assert lowest.razao_social == "PRIMEIRA SA" and lowest.cep == ""
+    assert highest.razao_social == "ÚLTIMA SA" and highest.nome_fantasia == "FIM"
+
+
+@pytest.mark.parametrize("cnpj", [
+    "00000000000000",  # below the first key
+    "99999999999999",  # above the last key
+    "17322527000299",  # between keys, same company base
+    "1732252700013",
+    "1732252700013X",
+])
+def test_absent_or_malformed_cnpj(snapshot, cnpj):
+    assert snapshot.lookup(cnpj) is None
+
+
+@pytest.mark.parametrize("run_rows", [1, 3, 7, 1 << 17])
+def test_unique_sorted_order_matches_a_full_sort(run_rows):
+    rng = random.Random(7)
+    keys = array("Q", (rng.randrange(50) for _ in range(200)))
+
+    order = _unique_sorted_order(keys, run_rows)
+
+    last_row = {key: index for index, key in enumerate(keys)}
+    assert list(order) == [last_row[key] for key in sorted(last_row)]
@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+from src.middleware.admission import BATCH, INTERACTIVE, AdaptiveConcurrencyLimiter
+from src.middleware.response_cache import ValidationResponseCache
+from src.models.schemas import CompanyData, ValidationResult
+from src.rpc.codec import ValidateCall, decode_validate_response
+from src.services.validation_service import AddressValidationService
+
+grpc = pytest.importorskip("grpc")
+from src.rpc.server import AddressValidationServicer  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+CNPJ = "17322527000135"
+CEP = "01310100"
+
+
+class Aborted(Exception):
+    pass
+
+
+class FakeContext:
+    def __init__(self, metadata=()):
+        self.metadata = tuple(metadata)
+        self.code = None
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    async def abort(self, code, details):
+        self.code = code
+        raise Aborted(details)
+
+
+class FakeService:
+    """Answers at once, except for CNPJs in `blocked`, which never finish"""
+
+    def __init__(self, blocked=()):
+        self.blocked = set(blocked)
+        self.calls = 0
+        self.active = 0
+        self.cancelled = 0
+
+    async def validate_customer_address(self, cnpj, cep):
+        self.calls += 1
+        self.active += 1
+        try:
+            if cnpj in self.blocked:
+                await asyncio.Event().wait()
+            else:
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        return ValidationResult(
+            valid=True, message="ok", company_data=CompanyData(
+                cnpj=cnpj, razao_social="EMPRESA", uf="SP", municipio="SAO PAULO", logradouro="RUA", cep=cep
+            ), address_data=None
+        )
+
+    validate_many = AddressValidationService.validate_many
+
+
+class FakeAuditSink:
+    def __init__(self):
+        self.recorded = []
+
+    async def record(self, cnpj, cep, result):
+        self.recorded.append((cnpj, cep))
+        return True
+
+
+def call(cnpj: str = CNPJ) -> ValidateCall:
+    return ValidateCall(cnpj=cnpj, cep=CEP, minimal=False)
+
+
+async def test_unary_call_takes_a_slot_and_feeds_the_baseline():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+    servicer = AddressValidationServicer(FakeService(), admission_limiter=limiter)
+
+    await servicer.validate(call(), FakeContext())
+
+    assert limiter.admitted == {INTERACTIVE: 1, BATCH: 0}
+    assert limiter.in_flight == 0
+    assert limiter.long_rtt > 0
+
+
+async def test_calls_over_capacity_fail_fast_with_resource_exhausted():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, batch_share=0.5)
+    limiter.in_flight = 1  # batch capacity is 1
+    service = FakeService()
+    servicer = AddressValidationServicer(service, admission_limiter=limiter)
+
+    context = FakeContext([("x-priority", "batch")])
+    with pytest.raises(Aborted):
+        await servicer.validate(call(), context)
+    assert context.code == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    context = FakeContext()
+    with pytest.raises(Aborted):
+        await servicer.validate_batch([call()], context)
+    assert context.code == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    assert service.calls == 0
+    assert limiter.shed == {INTERACTIVE: 0, BATCH: 2}
+    assert limiter.in_flight == 1
+
+
+async def test_stream_holds_one_batch_slot_without_sampling_latency():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    servicer = AddressValidationServicer(FakeService(), admission_limiter=limiter)
+
+    async def calls():
+        for _ in range(3):
+            yield call()
+            await asyncio.sleep(0)
+
+    responses = []
+    async for response in servicer.validate_stream(calls(), FakeContext()):
+        assert limiter.in_flight == 1
+        responses.append(response)
+
+    assert len(responses) == 3
+    assert limiter.admitted == {INTERACTIVE: 0, BATCH: 1}
+    assert limiter.in_flight == 0
+    assert limiter.long_rtt == 0.0
+
+
+async def test_unary_calls_share_the_result_cache_and_its_audit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    service = FakeService()
+    audit_sink = FakeAuditSink()
+    servicer = AddressValidationServicer(
+        service, admission_limiter=limiter, response_cache=ValidationResponseCache(audit_sink=audit_sink)
+    )
+
+    await servicer.validate(call(), FakeContext())
+    last_rtt = limiter.last_rtt
+    await servicer.validate(call(), FakeContext())
+
+    assert service.calls == 1
+    # The service audits what it computes; the cache audits the hit
+    assert audit_sink.recorded == [(CNPJ, CEP)]
+    # A cache hit is not a latency sample
+    assert limiter.last_rtt == last_rtt
+    assert limiter.in_flight == 0
+
+
+async def test_batch_goes_through_the_result_cache():
+    service = FakeService()
+    servicer = AddressValidationServicer(service, response_cache=ValidationResponseCache())
+    await servicer.validate(call(), FakeContext())
+
+    await servicer.validate_batch([call(), call("11222333000181"), call()], FakeContext())
+
+    assert service.calls == 2
+
+
+async def test_stream_closed_mid_flight_cancels_the_pump_and_its_validations():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    blocked = "11222333000181"
+    service = FakeService(blocked=[blocked])
+    servicer = AddressValidationServicer(service, max_in_flight=2, admission_limiter=limiter)
+    tasks_before = asyncio.all_tasks()
+
+    async def calls():
+        yield call(blocked)
+        for _ in range(10):
+            yield call()
+
+    stream = servicer.validate_stream(calls(), FakeContext())
+    first = decode_validate_response(await stream.__anext__())
+    # Let the pump fill the outbox and block on it while the client stops reading
+    await asyncio.sleep(0.05)
+    await stream.aclose()
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert first["index"] > 0
+    assert asyncio.all_tasks() == tasks_before
+    assert service.active == 0 and service.cancelled >= 1
+    assert limiter.in_flight == 0
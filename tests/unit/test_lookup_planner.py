@@ -0,0 +1,139 @@
+import asyncio
+from typing import Optional
+import pytest
+from src.models.schemas import AddressData, CompanyData
+from src.services.lookup_planner import CEPLookupDecision, CEPLookupPlanner
+from src.services.validation_service import AddressValidationService
+from src.utils.cache import ThreadSafeCache
+
+pytestmark = pytest.mark.unit
+
+CNPJ = "17322527000135"
+SP_CEP = "01310100"
+RJ_CEP = "20040002"
+
+
+def company(uf: str = "SP", cep: str = SP_CEP) -> CompanyData:
+    return CompanyData(
+        cnpj=CNPJ, razao_social="Empresa", uf=uf, municipio="SAO PAULO",
+        logradouro="AVENIDA PAULISTA", cep=cep
+    )
+
+
+def address(cep: str = SP_CEP) -> AddressData:
+    return AddressData(
+        cep=cep, state="SP", city="São Paulo", neighborhood="Bela Vista",
+        street="Avenida Paulista", service="fake"
+    )
+
+
+@pytest.mark.parametrize("cep, company_data, cached, decision", [
+    (SP_CEP, None, address(), CEPLookupDecision.REUSE),
+    (RJ_CEP, company(), address(RJ_CEP), CEPLookupDecision.REUSE),
+    (RJ_CEP, company(), None, CEPLookupDecision.SKIP),
+    (RJ_CEP, company(uf=" sp "), None, CEPLookupDecision.SKIP),
+    (SP_CEP, company(), None, CEPLookupDecision.FETCH),
+    (SP_CEP, None, None, CEPLookupDecision.FETCH),
+    # Outside every known range or no UF on record: nothing to decide from
+    ("00000000", company(), None, CEPLookupDecision.FETCH),
+    (RJ_CEP, company(uf=""), None, CEPLookupDecision.FETCH),
+])
+def test_plan(cep, company_data, cached, decision):
+    plan = CEPLookupPlanner().plan(cep, company_data, cached)
+    assert plan.decision == decision
+    assert plan.address_data is cached
+
+
+def test_stats_count_avoided_and_cancelled_calls():
+    planner = CEPLookupPlanner()
+    for decision in (CEPLookupDecision.REUSE, CEPLookupDecision.SKIP, CEPLookupDecision.CANCEL, CEPLookupDecision.FETCH):
+        planner.record(decision)
+
+    stats = planner.stats()
+    assert stats["total"] == 4
+    assert stats["upstream_calls_avoided"] == 2
+    assert stats["upstream_calls_avoided_ratio"] == 0.5
+    assert stats["upstream_calls_cancelled"] == 1
+
+
+class FakeCNPJStrategy:
+    def __init__(self, company_data: Optional[CompanyData], delay: float = 0.0):
+        self.company_data = company_data
+        self.delay = delay
+
+    async def get_company_data(self, cnpj: str) -> Optional[CompanyData]:
+        await asyncio.sleep(self.delay)
+        return self.company_data
+
+
+class FakeCEPStrategy:
+    """Knows only SP_CEP; other CEPs do not exist"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_address_data(self, cep: str) -> Optional[AddressData]:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return address(cep) if cep == SP_CEP else None
+
+
+def make_service(cnpj_strategy: FakeCNPJStrategy, cep_strategy: FakeCEPStrategy) -> AddressValidationService:
+    return AddressValidationService(
+        cnpj_strategy=cnpj_strategy,
+        cep_strategy=cep_strategy,
+        cache=ThreadSafeCache(max_size=100, ttl=60)
+    )
+
+
+async def test_service_fetches_then_reuses_the_cached_address():
+    cep_strategy = FakeCEPStrategy()
+    service = make_service(FakeCNPJStrategy(company()), cep_strategy)
+
+    first = await service.validate_customer_address(CNPJ, SP_CEP)
+    second = await service.validate_customer_address(CNPJ, SP_CEP)
+
+    assert first.valid and second.valid
+    assert cep_strategy.calls == 1
+    assert service.cep_planner.decisions[CEPLookupDecision.FETCH] == 1
+    assert service.cep_planner.decisions[CEPLookupDecision.REUSE] == 1
+
+
+async def test_service_skips_a_cep_from_another_uf_once_the_company_is_cached():
+    cep_strategy = FakeCEPStrategy()
+    service = make_service(FakeCNPJStrategy(company()), cep_strategy)
+    await service.get_company_data(CNPJ)
+
+    result = await service.validate_customer_address(CNPJ, RJ_CEP)
+
+    assert cep_strategy.calls == 0
+    assert service.cep_planner.decisions[CEPLookupDecision.SKIP] == 1
+    # Never fetched, so even a CEP that does not exist is reported as a mismatch
+    assert result.message == "Endereço não corresponde ao da empresa"
+
+
+async def test_service_cancels_an_in_flight_cep_lookup_from_another_uf():
+    cep_strategy = FakeCEPStrategy(delay=1.0)
+    service = make_service(FakeCNPJStrategy(company()), cep_strategy)
+
+    result = await asyncio.wait_for(service.validate_customer_address(CNPJ, RJ_CEP), timeout=0.5)
+
+    assert service.cep_planner.decisions[CEPLookupDecision.CANCEL] == 1
+    assert result.message == "Endereço não corresponde ao da empresa"
+    await asyncio.sleep(0)
+    assert cep_strategy.cancelled == 1
+
+
+async def test_service_reports_a_missing_cep_in_the_company_uf_as_not_found():
+    service = make_service(FakeCNPJStrategy(company()), FakeCEPStrategy())
+
+    result = await service.validate_customer_address(CNPJ, "01310999")
+
+    assert service.cep_planner.decisions[CEPLookupDecision.FETCH] == 1
+    assert result.message == "Endereço não encontrado"
@@ -0,0 +1,80 @@
+import asyncio
+import re
+import sys
+import time
+import pytest
+from src.config.settings import Settings
+from src.utils.loop_monitor import EventLoopMonitor, _fold
+
+pytestmark = pytest.mark.unit
+
+FOLDED_FRAME = r"[^;]+ \([^;]+:\d+\)"
+FOLDED_LINE = re.compile(rf"^{FOLDED_FRAME}(;{FOLDED_FRAME})* \d+$")
+
+
+@pytest.mark.parametrize("name", ["LOOP_MONITOR_INTERVAL", "SLOW_CALLBACK_THRESHOLD"])
+@pytest.mark.parametrize("value", ["0", "-0.1"])
+def test_settings_reject_non_positive_monitor_timings(name, value):
+    with pytest.raises(ValueError, match=name):
+        Settings({name: value})
+
+
+def block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_blocked_loop_is_measured_and_its_stack_reported():
+    monitor = EventLoopMonitor(interval=0.01, slow_callback_threshold=0.05)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["running"] is False
+    assert stats["samples"] >= 3
+    assert stats["lag_ms"]["max"] >= 200
+    assert stats["lag_ms"]["p50"] <= stats["lag_ms"]["p90"] <= stats["lag_ms"]["p99"] <= stats["lag_ms"]["max"]
+    # One stall is reported once, however long it lasts
+    assert stats["slow_callbacks"] == 1
+    report = stats["recent_slow_callbacks"][0]
+    assert report["blocked_ms"] >= 50
+    assert len(report["stack"]) <= 8
+    assert any("block_the_loop" in line for line in report["stack"])
+
+
+def test_idle_monitor_reports_no_samples():
+    stats = EventLoopMonitor().stats()
+    assert stats["samples"] == 0
+    assert stats["lag_ms"] == {"p50": None, "p90": None, "p99": None, "max": None}
+
+
+def test_fold_lists_frames_outermost_first():
+    def inner():
+        return _fold(sys._getframe())
+
+    folded = inner()
+    assert FOLDED_LINE.match(f"{folded} 1")
+    assert folded.split(";")[-1].startswith("inner (")
+    assert folded.split(";")[-2].startswith("test_fold_lists_frames_outermost_first (")
+
+
+async def test_profile_returns_collapsed_stacks_of_the_loop_thread():
+    monitor = EventLoopMonitor()
+    await monitor.start()
+    try:
+        profiled = asyncio.ensure_future(asyncio.to_thread(monitor.profile, 0.1, 0.005))
+        await asyncio.sleep(0.02)
+        block_the_loop(0.05)
+        output = await profiled
+    finally:
+        await monitor.stop()
+
+    lines = output.splitlines()
+    assert lines and all(FOLDED_LINE.match(line) for line in lines)
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert counts == sorted(counts, reverse=True)
+    assert any("block_the_loop" in line for line in lines)
@@ -0,0 +1,39 @@
+import pytest
+from src.models.schemas import AddressData, CompanyData
+from src.services.validation_service import AddressValidationService
+
+pytestmark = pytest.mark.unit
+
+
+def company(uf: str, municipio: str) -> CompanyData:
+    return CompanyData(
+        cnpj="00924432000199", razao_social="Test Company", uf=uf, municipio=municipio,
+        logradouro="AVENIDA PAULISTA", cep="01310100"
+    )
+
+
+def address(state: str, city: str) -> AddressData:
+    return AddressData(
+        cep="01310100", state=state, city=city, neighborhood="Bela Vista",
+        street="Avenida Paulista", service="test"
+    )
+
+
+@pytest.fixture
+def service():
+    return AddressValidationService()
+
+
+def test_same_municipality_with_different_spelling(service):
+    match = service._match_address(company("SP", "SAO PAULO"), address("SP", "São Paulo"))
+    assert (match.state, match.city, match.street) == (True, True, True)
+
+
+def test_different_municipalities_in_the_same_uf(service):
+    match = service._match_address(company("SP", "SAO PAULO"), address("SP", "Campinas"))
+    assert (match.state, match.city) == (True, False)
+
+
+def test_different_ufs(service):
+    match = service._match_address(company("SP", "SAO PAULO"), address("RJ", "Rio de Janeiro"))
+    assert (match.state, match.city) == (False, False)
@@ -0,0 +1,145 @@
+import pytest
+from src.utils.provider_stats import (
+    MAX_MICROSECONDS, SUB_BUCKETS, LatencyHistogram, ProviderStats, RollingWindow, bucket_bounds, bucket_index
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def power_of_two_edges():
+    for exponent in range(37):
+        for value in ((1 << exponent) - 1, 1 << exponent, (1 << exponent) + 1):
+            if value <= MAX_MICROSECONDS:
+                yield value
+
+
+@pytest.mark.parametrize("microseconds", sorted(set(power_of_two_edges())))
+def test_bucket_round_trips_at_power_of_two_edges(microseconds):
+    lower, upper = bucket_bounds(bucket_index(microseconds))
+    assert lower <= microseconds < upper
+    if microseconds >= SUB_BUCKETS:
+        # 16 buckets per power of two past the exact range
+        assert (upper - lower) / lower <= 1 / 16
+
+
+def test_buckets_are_contiguous_and_ordered():
+    previous_upper = 0
+    for index in range(bucket_index(1 << 20) + 1):
+        lower, upper = bucket_bounds(index)
+        assert lower == previous_upper
+        assert bucket_index(lower) == bucket_index(upper - 1) == index
+        previous_upper = upper
+
+
+def test_quantiles_of_a_uniform_distribution():
+    histogram = LatencyHistogram()
+    for milliseconds in range(1, 1001):
+        histogram.record(milliseconds / 1000)
+
+    summary = histogram.summary()
+    assert summary["count"] == 1000
+    assert summary["max_ms"] == 1000.0
+    for name, expected in (("p50_ms", 500), ("p90_ms", 900), ("p99_ms", 990)):
+        assert summary[name] == pytest.approx(expected, rel=1 / 32)
+
+
+def test_quantiles_never_exceed_the_max_and_clamp_out_of_range_values():
+    histogram = LatencyHistogram()
+    histogram.record(0.0011)
+    assert histogram.quantile(0.99) == 1.1
+
+    histogram.record(-1)
+    histogram.record(10 ** 9)
+    assert histogram.count == 3
+    assert histogram.counts[0] == 1
+    assert histogram.max == MAX_MICROSECONDS
+
+
+def test_empty_histogram_has_no_quantiles():
+    assert LatencyHistogram().summary() == {"count": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+
+
+def test_window_expires_slots_older_than_its_span():
+    clock = FakeClock(0.0)
+    # 12 slots of 5 s
+    window = RollingWindow(60, 12, clock)
+    key = ("cep.attempt", "ViaCEPAdapter", "found")
+    window.record(key, 0.01, retries=1)
+    clock.now = 30.0
+    window.record(key, 0.02, retries=0)
+
+    latencies, retries = window.merged(59.9)
+    assert latencies[key].count == 2
+    assert retries == {("cep.attempt", "ViaCEPAdapter"): 1}
+
+    latencies, retries = window.merged(60.0)
+    assert latencies[key].count == 1
+    assert retries == {}
+
+    assert window.merged(95.0) == ({}, {})
+
+
+def test_window_reuses_a_slot_for_a_later_epoch():
+    clock = FakeClock(2.0)
+    window = RollingWindow(60, 12, clock)
+    key = ("cnpj.provider", "BrasilAPIAdapter", "found")
+    window.record(key, 0.01, retries=0)
+    # Same ring position, one full span later
+    clock.now = 62.0
+    window.record(key, 0.03, retries=0)
+
+    latencies, _ = window.merged(clock.now)
+    assert latencies[key].count == 1
+    assert latencies[key].max == 30000
+
+
+def test_disabled_stats_record_nothing():
+    stats = ProviderStats(enabled=False, clock=FakeClock())
+    stats.record("cep.lookup", "ViaCEPAdapter", "first_try", 0.01)
+    assert stats.snapshot()["windows"]["1m"]["cep"]["lookups"] == 0
+
+
+def test_cep_and_cnpj_summaries():
+    clock = FakeClock()
+    stats = ProviderStats(clock=clock)
+    for _ in range(5):
+        stats.record("cep.lookup", "ViaCEPAdapter", "first_try", 0.010)
+    stats.record("cep.lookup", "ViaCEPAdapter", "retried", 0.050, retries=2)
+    stats.record("cep.lookup", "BrasilAPICEPAdapter", "fallback", 0.100, retries=3)
+    stats.record("cep.lookup", "none", "exhausted", 0.200, retries=4)
+    for _ in range(3):
+        stats.record("cnpj.lookup", "BrasilAPIAdapter", "direct", 0.020)
+    stats.record("cnpj.lookup", "ReceitaWSAdapter", "hedged", 0.600)
+
+    window = stats.snapshot()["windows"]["1m"]
+    cep = window["cep"]
+    assert cep["lookups"] == 8
+    # Shares of the lookups some provider answered
+    assert cep["answered_share"] == {"ViaCEPAdapter": 0.8571, "BrasilAPICEPAdapter": 0.1429}
+    # The exhausted lookup's retries do not count against successes
+    assert cep["retries_per_success"] == round(5 / 7, 3)
+    assert cep["fallback_rate"] == 0.125
+    assert sorted(cep["latency_by_path"]) == ["exhausted", "fallback", "first_try", "retried"]
+    assert cep["latency_by_path"]["first_try"]["count"] == 5
+    assert cep["latency"]["max_ms"] == 200.0
+
+    cnpj = window["cnpj"]
+    assert cnpj["lookups"] == 4
+    assert cnpj["answered_share"] == {"BrasilAPIAdapter": 0.75, "ReceitaWSAdapter": 0.25}
+    assert cnpj["hedge_rate"] == 0.25
+    assert window["series"]["cep.lookup"]["ViaCEPAdapter"]["retries"] == 2
+
+    # Past the 1m span the figures come only from the longer windows
+    clock.now += 120
+    windows = stats.snapshot()["windows"]
+    assert windows["1m"]["cep"]["lookups"] == 0
+    assert windows["1m"]["cep"]["fallback_rate"] is None
+    assert windows["5m"]["cep"]["lookups"] == 8
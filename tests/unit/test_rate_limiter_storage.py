@@ -0,0 +1,72 @@
+import time
+import pytest
+from src.middleware.rate_limiter import InMemoryStorage
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+async def storage():
+    # One shard keeps LRU order and the heap deterministic; the background
+    # sweeper never fires, so tests drive sweep(now=...) directly
+    storage = InMemoryStorage(max_keys=2, shards=1, sweep_interval=3600)
+    yield storage
+    if storage._sweeper is not None:
+        storage._sweeper.cancel()
+
+
+async def test_update_reschedules_expiry_instead_of_expiring_early(storage):
+    now = time.monotonic()
+    await storage.set("a", 1, expire=10)
+    await storage.set("a", 2, expire=30)
+
+    assert storage.sweep(now=now + 20) == 0
+    assert await storage.get("a") == 2
+    assert storage.stats()["scheduled"] == 1
+
+    assert storage.sweep(now=now + 40) == 1
+    assert len(storage) == 0
+
+
+async def test_expired_keys_are_hidden_before_the_sweep(storage):
+    await storage.set("a", 1, expire=0)
+    assert await storage.get("a") is None
+    assert len(storage) == 1
+
+
+async def test_lru_eviction_leaves_stale_heap_entries_harmless(storage):
+    now = time.monotonic()
+    await storage.set("a", 1, expire=10)
+    await storage.set("b", 1, expire=10)
+    await storage.set("a", 2, expire=10)  # a becomes most recently used
+    await storage.set("c", 1, expire=10)  # evicts b
+
+    assert storage.evictions == 1
+    assert await storage.get("b") is None
+
+    # b comes back (evicting a) with a later deadline: its stale entry must not expire it
+    await storage.set("b", 3, expire=100)
+    assert storage.sweep(now=now + 50) == 1  # only c
+    assert await storage.get("b") == 3
+    assert storage.expirations == 1
+
+
+async def test_heap_is_rebuilt_when_stale_entries_dominate(storage):
+    now = time.monotonic()
+    for index in range(100):
+        await storage.set(f"key-{index}", index, expire=10 + index)
+        assert storage.stats()["scheduled"] <= 2 * storage.shard_size
+
+    assert storage.evictions == 98
+    assert sorted(key for key in storage._shards[0]) == ["key-98", "key-99"]
+    assert storage.sweep(now=now + 1000) == 2
+    assert storage.stats() == {"keys": 0, "scheduled": 0, "evictions": 98, "expirations": 2}
+
+
+async def test_delete_leaves_no_expiry_behind(storage):
+    now = time.monotonic()
+    await storage.set("a", 1, expire=10)
+    await storage.delete("a")
+
+    assert storage.sweep(now=now + 20) == 0
+    assert storage.stats()["scheduled"] == 0
@@ -0,0 +1,259 @@
+import gzip
+import json
+import pytest
+from src.middleware import response_cache
+from src.middleware.response_cache import CachedResponse, ValidationResponseCache, _negotiate_encoding, parse_fields
+from src.models.schemas import AddressData, AddressMatch, CompanyData, ValidationResult
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+pytestmark = pytest.mark.unit
+requires_brotli = pytest.mark.skipif(brotli is None, reason="pacote opcional brotli ausente")
+
+CNPJ = "17.322.527/0001-35"
+CEP = "67105-070"
+
+
+def company() -> CompanyData:
+    return CompanyData(
+        cnpj="17322527000135", razao_social="EMPRESA LTDA", uf="PA", municipio="ANANINDEUA",
+        logradouro="RODOVIA BR 316", cep="67105070"
+    )
+
+
+def valid_result() -> ValidationResult:
+    return ValidationResult(
+        valid=True,
+        message="Endereço validado com sucesso",
+        company_data=company(),
+        address_data=AddressData(cep="67105070", state="PA", city="Ananindeua", street="Rodovia BR-316"),
+        match=AddressMatch(state=True, city=True, street=True)
+    )
+
+
+def mismatch_result() -> ValidationResult:
+    return ValidationResult(
+        valid=False,
+        message="Endereço não corresponde ao da empresa",
+        company_data=company(),
+        address_data=None,
+        match=AddressMatch(state=True, city=False, street=False)
+    )
+
+
+def not_found_result() -> ValidationResult:
+    return ValidationResult(valid=False, message="Endereço não encontrado", company_data=company(), address_data=None)
+
+
+class Service:
+    def __init__(self, result: ValidationResult):
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self, cnpj: str, cep: str) -> ValidationResult:
+        self.calls += 1
+        return self.result
+
+
+async def test_repeat_get_with_the_etag_gets_a_304():
+    cache = ValidationResponseCache(ttl=60)
+    service = Service(valid_result())
+
+    first = cache.render(await cache.resolve(CNPJ, CEP, service))
+    entry = await cache.resolve("17322527000135", "67105070", service)
+    second = cache.render(entry, first.headers["etag"])
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("max-age=")
+    assert second.status_code == 304 and second.body == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    assert service.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("if_none_match", ['W/{etag}', '"other", {etag}', "*"])
+def test_weak_listed_and_wildcard_etags_match(if_none_match):
+    cache = ValidationResponseCache()
+    entry = CachedResponse(valid_result(), cacheable=True)
+
+    response = cache.render(entry, if_none_match.format(etag=entry.etag))
+
+    assert response.status_code == 304
+
+
+async def test_matching_post_fails_the_precondition():
+    cache = ValidationResponseCache()
+    entry = await cache.resolve(CNPJ, CEP, Service(valid_result()))
+
+    response = cache.render(entry, entry.etag, method="POST")
+
+    assert response.status_code == 412
+    assert response.headers["etag"] == entry.etag
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+async def test_cached_404_is_never_answered_with_a_304(method):
+    cache = ValidationResponseCache()
+    service = Service(mismatch_result())
+    first = cache.render(await cache.resolve(CNPJ, CEP, service), method=method)
+
+    second = cache.render(await cache.resolve(CNPJ, CEP, service), first.headers["etag"], method=method)
+
+    assert first.status_code == second.status_code == 404
+    assert second.body == first.body
+    assert service.calls == 1
+
+
+async def test_no_cache_recomputes_and_refreshes_the_entry():
+    cache = ValidationResponseCache()
+    service = Service(valid_result())
+    await cache.resolve(CNPJ, CEP, service)
+
+    service.result = mismatch_result()
+    refreshed = await cache.resolve(CNPJ, CEP, service, bypass=True)
+    cached = await cache.resolve(CNPJ, CEP, service)
+
+    assert service.calls == 2
+    assert refreshed.status_code == cached.status_code == 404
+    assert cache.misses == 2
+
+
+@pytest.mark.parametrize("result", [
+    not_found_result(),
+    ValidationResult(valid=False, message="Empresa não encontrada", company_data=None, address_data=None),
+])
+async def test_non_definitive_outcomes_are_not_stored(result):
+    cache = ValidationResponseCache()
+    service = Service(result)
+
+    entry = await cache.resolve(CNPJ, CEP, service)
+    response = cache.render(entry, entry.etag)
+    await cache.resolve(CNPJ, CEP, service)
+
+    assert response.status_code == 404
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+    assert service.calls == 2
+
+
+# Response shaping (?fields / ?minimal)
+
+def test_parse_fields():
+    assert parse_fields() is None
+    assert parse_fields(minimal=True) == {"valid", "message"}
+    assert parse_fields(" match , ") == {"valid", "message", "match"}
+    with pytest.raises(ValueError, match="Campos desconhecidos: cnpj"):
+        parse_fields("match,cnpj")
+
+
+@pytest.mark.parametrize("fields, keys", [
+    (parse_fields(minimal=True), {"valid", "message"}),
+    (parse_fields("match"), {"valid", "message", "match"}),
+    (parse_fields("company_data,address_data,match"), set(ValidationResult.model_fields)),
+])
+def test_valid_result_projection(fields, keys):
+    cache = ValidationResponseCache(compression_min_size=10_000)
+    entry = CachedResponse(valid_result(), cacheable=True)
+
+    response = cache.render(entry, fields=fields)
+
+    assert set(json.loads(response.body)) == keys
+    assert (response.headers["etag"] == entry.etag) == (keys == set(ValidationResult.model_fields))
+
+
+@pytest.mark.parametrize("fields", [
+    None,
+    parse_fields(minimal=True),
+    parse_fields("match"),
+    parse_fields("company_data"),
+])
+def test_error_projection_is_never_larger_than_the_full_404(fields):
+    entry = CachedResponse(mismatch_result(), cacheable=True)
+    full = json.loads(entry.body)
+
+    body, _ = entry.representation(fields, None)
+
+    assert full == {
+        "detail": "Endereço não corresponde ao da empresa",
+        "match": {"state": True, "city": False, "street": False}
+    }
+    assert len(body) <= len(entry.body)
+    projected = json.loads(body)
+    assert projected["detail"] == full["detail"]
+    assert ("match" in projected) == (fields is None or "match" in fields)
+
+
+def test_404_without_a_comparison_has_only_detail():
+    entry = CachedResponse(not_found_result(), cacheable=False)
+    assert json.loads(entry.body) == {"detail": "Endereço não encontrado"}
+    assert entry.representation(parse_fields("match"), None)[0] == entry.body
+
+
+# Content encoding
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.3, br;q=0", "gzip"),
+    ("gzip;q=bogus", None),
+    ("GZIP; q=0.8", "gzip"),
+])
+def test_encoding_negotiation(monkeypatch, accept_encoding, expected):
+    # Only the module's availability check matters here
+    monkeypatch.setattr(response_cache, "brotli", object())
+    assert _negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [("br, gzip", "gzip"), ("*", "gzip"), ("br", None)])
+def test_without_brotli_only_gzip_is_offered(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr(response_cache, "brotli", None)
+    assert _negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("encoding", ["gzip", pytest.param("br", marks=requires_brotli)])
+def test_large_bodies_are_compressed_with_a_per_encoding_etag(encoding):
+    decompress = gzip.decompress if encoding == "gzip" else brotli.decompress
+    cache = ValidationResponseCache(compression_min_size=64)
+    entry = CachedResponse(valid_result(), cacheable=True)
+
+    response = cache.render(entry, accept_encoding=encoding)
+    identity = cache.render(entry)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == identity.headers["vary"] == "Accept-Encoding"
+    assert decompress(response.body) == identity.body == entry.body
+    assert response.headers["etag"] == f'{entry.etag[:-1]}-{encoding}"'
+    assert "content-encoding" not in identity.headers
+    # Rendered once and replayed from the entry
+    assert entry.representation(None, encoding)[0] is entry.representation(None, encoding)[0]
+
+
+def test_small_bodies_are_sent_as_is_without_vary():
+    cache = ValidationResponseCache(compression_min_size=64)
+    entry = CachedResponse(valid_result(), cacheable=True)
+
+    response = cache.render(entry, fields=parse_fields(minimal=True), accept_encoding="gzip, br")
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_304_for_a_compressed_etag_carries_no_content_encoding():
+    cache = ValidationResponseCache(compression_min_size=64)
+    entry = CachedResponse(valid_result(), cacheable=True)
+    etag = cache.render(entry, accept_encoding="gzip").headers["etag"]
+
+    response = cache.render(entry, etag, accept_encoding="gzip")
+    mismatched = cache.render(entry, etag, accept_encoding="identity")
+
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert mismatched.status_code == 200
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from src.utils.singleflight import SingleFlight
+
+pytestmark = pytest.mark.unit
+
+
+class Call:
+    """Shared work that blocks until released and records how it ended"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.runs = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "result"
+
+
+async def test_concurrent_callers_share_one_execution():
+    flight, call = SingleFlight(), Call()
+    waiters = [asyncio.ensure_future(flight.do("key", call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 1
+
+    call.release.set()
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert call.runs == 1
+    assert flight.in_flight() == 0
+
+
+async def test_cancelling_one_waiter_keeps_the_shared_call():
+    flight, call = SingleFlight(), Call()
+    first = asyncio.ensure_future(flight.do("key", call))
+    second = asyncio.ensure_future(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not call.cancelled
+
+    call.release.set()
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_last_waiter_leaving_cancels_the_call():
+    flight, call = SingleFlight(), Call()
+    waiters = [asyncio.ensure_future(flight.do("key", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    for waiter in waiters:
+        waiter.cancel()
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert call.cancelled
+    assert flight.in_flight() == 0
+
+
+async def test_errors_reach_every_waiter_and_the_key_is_retried():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+    call = Call()
+    call.release.set()
+    assert await flight.do("key", call) == "result"
+    assert call.runs == 1
@@ -0,0 +1,59 @@
+import pytest
+from src.utils import tracing
+from src.utils.tracing import NOOP_SPAN, STATUS_ERROR, OTLPJsonExporter, Tracer
+
+pytestmark = pytest.mark.unit
+
+
+def test_unsampled_root_makes_the_whole_trace_a_noop(monkeypatch):
+    exporter = OTLPJsonExporter()
+    tracer = Tracer(sample_rate=0.5, exporter=exporter)
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.5)
+
+    with tracer.span("root") as root:
+        # The decision is taken once: children never re-sample
+        monkeypatch.setattr(tracing.random, "random", lambda: 0.0)
+        with tracer.span("child") as child:
+            assert tracer.current_span() is child
+    assert root is child is NOOP_SPAN
+    assert exporter._buffer == []
+
+
+def test_sampled_root_links_children_and_exports_them_first(monkeypatch):
+    exporter = OTLPJsonExporter()
+    tracer = Tracer(sample_rate=0.5, exporter=exporter)
+    monkeypatch.setattr(tracing.random, "random", lambda: 0.49)
+
+    with tracer.span("root") as root:
+        with tracer.span("child") as child:
+            pass
+        assert tracer.current_span() is root
+    assert tracer.current_span() is NOOP_SPAN
+
+    assert exporter._buffer == [child, root]
+    assert child.trace_id == root.trace_id and child.parent_id == root.span_id
+    assert root.parent_id is None
+
+
+def test_configure_without_exporter_disables_sampling():
+    tracer = Tracer()
+    tracer.configure(1.0, None)
+    with tracer.span("root") as span:
+        assert span is NOOP_SPAN
+
+
+def test_exceptions_are_recorded_on_the_span():
+    exporter = OTLPJsonExporter()
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+    with pytest.raises(ValueError):
+        with tracer.span("failing", attempt=2, ratio=0.5, skipped=None):
+            raise ValueError("boom")
+
+    otlp = exporter._buffer[0].to_otlp()
+    assert otlp["status"] == {"code": STATUS_ERROR, "message": "boom"}
+    assert otlp["events"][0]["name"] == "exception"
+    assert otlp["attributes"] == [
+        {"key": "attempt", "value": {"intValue": "2"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
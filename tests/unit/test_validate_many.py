@@ -0,0 +1,119 @@
+import asyncio
+from typing import Dict, Optional
+import pytest
+from src.models.schemas import AddressData, CompanyData
+from src.services.validation_service import AddressValidationService
+from src.utils.cache import ThreadSafeCache
+
+pytestmark = pytest.mark.unit
+
+CEP = "01310100"
+
+
+class FakeCNPJStrategy:
+    """Companies on CEP with a per-CNPJ delay, optionally held until released"""
+
+    def __init__(self, delays: Optional[Dict[str, float]] = None):
+        self.delays = delays or {}
+        self.release: Optional[asyncio.Event] = None
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+
+    async def get_company_data(self, cnpj: str) -> CompanyData:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(cnpj, 0.0))
+            if self.release is not None:
+                await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        return CompanyData(
+            cnpj=cnpj, razao_social=f"Empresa {cnpj}", uf="SP", municipio="SAO PAULO",
+            logradouro="AVENIDA PAULISTA", cep=CEP
+        )
+
+
+class FakeCEPStrategy:
+    async def get_address_data(self, cep: str) -> AddressData:
+        return AddressData(
+            cep=cep, state="SP", city="São Paulo", neighborhood="Bela Vista",
+            street="Avenida Paulista", service="fake"
+        )
+
+
+def make_service(cnpj_strategy: FakeCNPJStrategy) -> AddressValidationService:
+    return AddressValidationService(
+        cnpj_strategy=cnpj_strategy,
+        cep_strategy=FakeCEPStrategy(),
+        cache=ThreadSafeCache(max_size=100, ttl=60)
+    )
+
+
+def cnpj(index: int) -> str:
+    return f"{index:014d}"
+
+
+async def test_ordered_output_waits_for_a_slow_head_item():
+    strategy = FakeCNPJStrategy({cnpj(0): 0.1})
+    service = make_service(strategy)
+    items = [(cnpj(index), CEP) for index in range(5)]
+
+    ordered = [item async for item, _ in service.validate_many(items, ordered=True, with_input=True)]
+    unordered = [item async for item, _ in make_service(FakeCNPJStrategy({cnpj(0): 0.1})).validate_many(
+        items, with_input=True
+    )]
+
+    assert ordered == items
+    assert unordered[-1] == items[0]
+    assert sorted(unordered) == items
+
+
+async def test_producer_is_not_pulled_past_max_in_flight():
+    strategy = FakeCNPJStrategy()
+    strategy.release = asyncio.Event()
+    service = make_service(strategy)
+    pulled = 0
+
+    async def producer():
+        nonlocal pulled
+        for index in range(100):
+            pulled += 1
+            yield cnpj(index), CEP
+
+    results = service.validate_many(producer(), max_in_flight=4)
+    first = asyncio.ensure_future(results.__anext__())
+    await asyncio.sleep(0.05)
+
+    assert pulled == 4
+    assert strategy.max_active == 4
+
+    strategy.release.set()
+    assert (await first).valid
+    remaining = [result async for result in results]
+    assert len(remaining) == 99
+    assert strategy.max_active <= 4
+
+
+async def test_closing_the_generator_cancels_in_flight_validations():
+    strategy = FakeCNPJStrategy({cnpj(0): 0.0})
+    service = make_service(strategy)
+    items = [(cnpj(index), CEP) for index in range(10)]
+    for index in range(1, 10):
+        strategy.delays[cnpj(index)] = 10.0
+
+    results = service.validate_many(items, max_in_flight=4)
+    assert (await results.__anext__()).valid
+    # Suspended at the yield, the generator pulls nothing more
+    await asyncio.sleep(0.01)
+    assert strategy.active == 3
+
+    await results.aclose()
+    await asyncio.sleep(0.01)
+
+    assert strategy.active == 0
+    assert strategy.cancelled == 3